@@ -0,0 +1,107 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Measure the throughput of scheduled tasks and the input latency.
+
+A burst of tasks is scheduled on an application with a simulated event
+loop, in which every cycle handles one input event and then the calls
+posted before the cycle. For several task budgets, this reports the
+number of event loop cycles and the time to drain the burst, and the
+mean and max latency of the input events while the burst is running.
+
+Usage: python benchmarks/bench_application_tasks.py [tasks] [work_us]
+
+"""
+from collections import deque
+import sys
+import time
+
+from enaml.application import Application
+
+
+class LoopApplication(Application):
+    """ An application with a simulated event loop.
+
+    """
+    def __init__(self):
+        super(LoopApplication, self).__init__([])
+        self.calls = deque()
+
+    def socket(self, session_id):
+        raise NotImplementedError
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def deferred_call(self, callback, *args, **kwargs):
+        self.calls.append((callback, args, kwargs))
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        self.calls.append((callback, args, kwargs))
+
+    def is_main_thread(self):
+        return True
+
+    def run(self):
+        """ Run the event loop until there are no more posted calls.
+
+        Returns
+        -------
+        result : tuple
+            The number of cycles and the list of input latencies.
+
+        """
+        calls = self.calls
+        latencies = []
+        cycles = 0
+        while calls:
+            cycles += 1
+            # An input event which arrives at the start of the cycle
+            # is handled after the calls posted before it.
+            posted = time.time()
+            for idx in xrange(len(calls)):
+                callback, args, kwargs = calls.popleft()
+                callback(*args, **kwargs)
+            latencies.append(time.time() - posted)
+        return cycles, latencies
+
+
+def make_task(work):
+    def task():
+        end = time.time() + work
+        while time.time() < end:
+            pass
+    return task
+
+
+def bench(app, budget, count, work):
+    app.task_budget = budget
+    task = make_task(work)
+    start = time.time()
+    for idx in xrange(count):
+        app.schedule(task, priority=idx % 3)
+    cycles, latencies = app.run()
+    elapsed = time.time() - start
+    print '%-8s %8d cycles %10.1f ms %10.1f tasks/ms %8.2f ms mean %8.2f ms max' % (
+        'None' if budget is None else '%gms' % (budget * 1e3),
+        cycles, elapsed * 1e3, count / (elapsed * 1e3),
+        sum(latencies) / len(latencies) * 1e3, max(latencies) * 1e3,
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    work = float(sys.argv[2]) * 1e-6 if len(sys.argv) > 2 else 20e-6
+    app = LoopApplication()
+    print '%d tasks of %g us' % (count, work * 1e6)
+    for budget in (None, 0.002, 0.01, 0.05):
+        bench(app, budget, count, work)
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Compare the nested dict and flat encodings of layout constraints.
+
+For a Form and a grid of widgets, this reports the number of JSON bytes
+of the constraints in a relayout message, the time to encode them on
+the server, and the time to decode them into casuarius constraints on
+the client. The nested dict decoder is the one which was used by the
+Qt and Wx containers before the flat encoding.
+
+Usage: python benchmarks/bench_constraint_encoding.py [rows]
+
+"""
+import json
+import sys
+import timeit
+
+from casuarius import ConstraintVariable
+
+from enaml.layout.constraint_encoding import (
+    encode_constraints, decode_constraints
+)
+from enaml.layout.layout_helpers import expand_constraints, grid
+from enaml.widgets.api import Container, Field, Form, Label
+
+
+def _convert_cn_info(info, owners):
+    cn_type = info['type']
+    if cn_type == 'linear_expression':
+        const = info['constant']
+        terms = info['terms']
+        convert = _convert_cn_info
+        res = sum(convert(t, owners) for t in terms) + const
+    elif cn_type == 'term':
+        coeff = info['coeff']
+        var = info['var']
+        res = coeff * _convert_cn_info(var, owners)
+    elif cn_type == 'linear_symbolic':
+        res = owners(info['owner'], info['name'])
+    else:
+        msg = 'Unhandled constraint info type `%s`' % cn_type
+        raise ValueError(msg)
+    return res
+
+
+def legacy_decode(infos, owners):
+    """ The nested dict decoder, with the owner lookup as a callable.
+
+    """
+    cns = []
+    convert = _convert_cn_info
+    for info in infos:
+        lhs = convert(info['lhs'], owners)
+        rhs = convert(info['rhs'], owners)
+        op = info['op']
+        if op == '==':
+            cn = lhs == rhs
+        elif op == '<=':
+            cn = lhs <= rhs
+        else:
+            cn = lhs >= rhs
+        cns.append(cn | info['strength'] | info['weight'])
+    return cns
+
+
+def variable_table():
+    variables = {}
+    def variable(owner_id, name):
+        key = (owner_id, name)
+        var = variables.get(key)
+        if var is None:
+            label = '{0}|{1}'.format(owner_id, name)
+            var = variables[key] = ConstraintVariable(label)
+        return var
+    return variable
+
+
+def build_form(rows):
+    form = Form()
+    for i in xrange(rows):
+        Label(form, text='Label %d' % i)
+        Field(form, text='value %d' % i)
+    return form
+
+
+def build_grid(rows):
+    container = Container()
+    cells = []
+    for i in xrange(rows):
+        cells.append([
+            Label(container, text='Label %d' % i),
+            Field(container, text='value %d' % i),
+            Field(container, text='other %d' % i),
+        ])
+    container.constraints = [grid(*cells)]
+    return container
+
+
+def bench(widget, number):
+    cns = list(expand_constraints(widget, widget._collect_constraints()))
+    legacy = [cn.as_dict() for cn in cns]
+    flat = encode_constraints(cns)
+    legacy_bytes = len(json.dumps(legacy))
+    flat_bytes = len(json.dumps(flat))
+    legacy_enc = timeit.timeit(
+        lambda: [cn.as_dict() for cn in cns], number=number,
+    ) / number
+    flat_enc = timeit.timeit(
+        lambda: encode_constraints(cns), number=number,
+    ) / number
+    legacy = json.loads(json.dumps(legacy))
+    flat = json.loads(json.dumps(flat))
+    legacy_dec = timeit.timeit(
+        lambda: legacy_decode(legacy, variable_table()), number=number,
+    ) / number
+    flat_dec = timeit.timeit(
+        lambda: decode_constraints(flat, variable_table()), number=number,
+    ) / number
+    print '  %d constraints' % len(cns)
+    for name, nbytes, enc, dec in (
+        ('nested dicts', legacy_bytes, legacy_enc, legacy_dec),
+        ('flat', flat_bytes, flat_enc, flat_dec)):
+        print '  %-14s %10d bytes %10.3f ms enc %10.3f ms dec' % (
+            name, nbytes, enc * 1e3, dec * 1e3,
+        )
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    for title, builder in (('form', build_form), ('grid', build_grid)):
+        print '%s, %d rows' % (title, rows)
+        bench(builder(rows), 10)
+
+
+if __name__ == '__main__':
+    main()
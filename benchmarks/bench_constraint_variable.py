@@ -0,0 +1,51 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Measure the construction of symbolic constraints by layout helpers.
+
+For a grid of widgets and for nested vbox/hbox helpers, this reports
+the number of constraints and the time to generate them. New helpers
+are created for every run, so the helper constraint cache is not used.
+
+Usage: python benchmarks/bench_constraint_variable.py [cells]
+
+"""
+import sys
+import timeit
+
+from enaml.layout.layout_helpers import expand_constraints, grid, hbox, vbox
+from enaml.widgets.api import Container, Field
+
+
+def make_grid(container, widgets):
+    rows = [widgets[i:i + 5] for i in xrange(0, len(widgets), 5)]
+    return [grid(*rows)]
+
+
+def make_boxes(container, widgets):
+    rows = [hbox(*widgets[i:i + 5]) for i in xrange(0, len(widgets), 5)]
+    return [vbox(*rows)]
+
+
+def bench(title, container, widgets, factory, number):
+    def run():
+        return list(expand_constraints(container, factory(container, widgets)))
+    cns = run()
+    elapsed = timeit.timeit(run, number=number) / number
+    print '%-6s %6d constraints %10.2f ms' % (
+        title, len(cns), elapsed * 1e3,
+    )
+
+
+def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    container = Container()
+    widgets = [Field(container) for i in xrange(cells)]
+    print '%d cells' % cells
+    bench('grid', container, widgets, make_grid, 5)
+    bench('boxes', container, widgets, make_boxes, 5)
+
+
+if __name__ == '__main__':
+    main()
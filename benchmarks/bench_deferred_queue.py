@@ -0,0 +1,83 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Measure the throughput of deferred calls from a worker thread.
+
+A worker thread posts deferred calls to a simulated event loop, which
+runs on the main thread and handles one event at a time from a
+thread-safe event queue. The per call strategy posts one event for
+every call, like the previous QDeferredCaller. The batched strategy
+posts calls to a DeferredQueue, which posts one wake-up event when it
+becomes non-empty and runs all queued calls from that event. This
+reports the number of events and the calls per second for each.
+
+Usage: python benchmarks/bench_deferred_queue.py [calls]
+
+"""
+from Queue import Queue
+import sys
+from threading import Thread
+import time
+
+from enaml.deferred_queue import DeferredQueue
+
+
+class EventLoop(object):
+    """ A simulated toolkit event loop with a thread-safe event queue.
+
+    """
+    def __init__(self):
+        self.events = Queue()
+        self.count = 0
+
+    def post(self, callback):
+        self.events.put(callback)
+
+    def run(self, done):
+        events = self.events
+        while not done():
+            events.get()()
+            self.count += 1
+
+
+def bench(title, count, make_post):
+    loop = EventLoop()
+    post = make_post(loop)
+    calls = [0]
+    def callback(value):
+        calls[0] += 1
+    def worker():
+        for value in xrange(count):
+            post(callback, (value,), {})
+    start = time.time()
+    thread = Thread(target=worker)
+    thread.start()
+    loop.run(lambda: calls[0] == count)
+    elapsed = time.time() - start
+    thread.join()
+    print '%-8s %8d events %10.1f ms %12.0f calls/s' % (
+        title, loop.count, elapsed * 1e3, count / elapsed,
+    )
+
+
+def per_call(loop):
+    def post(callback, args, kwargs):
+        loop.post(lambda: callback(*args, **kwargs))
+    return post
+
+
+def batched(loop):
+    queue = DeferredQueue(lambda: loop.post(queue.drain))
+    return queue.post
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print '%d deferred calls from a worker thread' % count
+    bench('per call', count, per_call)
+    bench('batched', count, batched)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Measure how expression evaluation cost scales with tree depth.
+
+A `<<` expression on a leaf object reads an attribute defined on the
+root of a chain of objects, plus a builtin. Without the scope cache,
+each name is resolved by walking every ancestor of the leaf, and the
+builtin is only found after the walk falls off the root. With the
+cache, the depth of the resolving ancestor is remembered between
+evaluations.
+
+Usage: python benchmarks/bench_dynamic_scope.py [number]
+
+"""
+import sys
+import timeit
+import types
+
+from enaml.core.declarative import Declarative
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+
+
+SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Root(Declarative):
+    attr scale = 2
+    attr offset = 1
+
+enamldef Leaf(Declarative):
+    attr value << abs(scale) * offset + len(name)
+"""
+
+
+def compile_source(source):
+    module = types.ModuleType('__bench__')
+    code = EnamlCompiler.compile(parse(source), '__enaml_bench__')
+    exec code in module.__dict__
+    return module
+
+
+def build_chain(module, depth):
+    """ Build a chain of `depth` objects between a Root and a Leaf.
+
+    """
+    root = module.Root()
+    parent = root
+    for i in xrange(depth):
+        parent = Declarative(parent)
+    leaf = module.Leaf(parent)
+    return root, leaf
+
+
+def bench(leaf, cached, number):
+    expr = leaf._expressions['value']
+    cache = expr._scope_cache
+    if not cached:
+        expr._scope_cache = None
+    try:
+        expr.eval(leaf, 'value')
+        return timeit.timeit(
+            lambda: expr.eval(leaf, 'value'), number=number,
+        ) / number
+    finally:
+        expr._scope_cache = cache
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    module = compile_source(SOURCE)
+    print '%6s %14s %14s %8s' % ('depth', 'uncached us', 'cached us', 'speedup')
+    for depth in (0, 1, 2, 4, 8, 16, 32, 64):
+        root, leaf = build_chain(module, depth)
+        uncached = bench(leaf, False, number)
+        cached = bench(leaf, True, number)
+        print '%6d %14.2f %14.2f %7.1fx' % (
+            depth, uncached * 1e6, cached * 1e6, uncached / cached,
+        )
+        root.destroy()
+
+
+if __name__ == '__main__':
+    main()
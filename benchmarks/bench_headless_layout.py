@@ -0,0 +1,57 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Measure the headless layout of a Form snapshot.
+
+This reports the time to build the solver for the snapshot, and the
+time per layout for a batch of window sizes, first when each size is
+solved and then when each size is replayed from the layout cache.
+
+Usage: python benchmarks/bench_headless_layout.py [rows]
+
+"""
+import sys
+import time
+
+from enaml.layout.headless_layout import HeadlessLayout, SizeHintTable
+from enaml.layout.layout_manager import LayoutManager
+from enaml.widgets.api import Window, Form, Label, Field
+
+
+HINTS = SizeHintTable({'Label': (60, 20), 'Field': (120, 25)})
+
+
+def build_form(rows):
+    window = Window()
+    form = Form(window)
+    for i in xrange(rows):
+        Label(form, text='Label %d' % i)
+        Field(form, text='value %d' % i)
+    window.initialize()
+    return window.snapshot()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    snap = build_form(rows)
+    start = time.time()
+    engine = HeadlessLayout(snap, HINTS)
+    build = time.time() - start
+    width, height = engine.min_size()
+    sizes = [(width + i, height + i) for i in xrange(100)]
+    start = time.time()
+    engine.layout_batch(sizes)
+    solved = (time.time() - start) / len(sizes)
+    # The most recent sizes are still in the layout cache.
+    recent = sizes[-LayoutManager.cache_size:]
+    start = time.time()
+    engine.layout_batch(recent)
+    cached = (time.time() - start) / len(recent)
+    print '%d rows: %.1f ms build, %.3f ms per solved layout, ' \
+          '%.3f ms per cached layout' % (
+              rows, build * 1e3, solved * 1e3, cached * 1e3)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Measure many sessions served by a HeadlessApplication.
+
+This starts a number of sessions, each with a window containing a few
+fields, and reports the time to start them, the time for a round of
+updates in which every field of every session changes its text, and
+the time for a round of client messages sent to every field.
+
+Usage: python benchmarks/bench_headless_sessions.py [sessions] [fields]
+
+"""
+import sys
+import time
+
+from enaml.headless.headless_application import HeadlessApplication
+from enaml.session import Session
+from enaml.session_factory import SessionFactory
+from enaml.widgets.api import Window, Container, Field
+
+
+class FieldsSession(Session):
+
+    def __init__(self, count):
+        super(FieldsSession, self).__init__()
+        self.count = count
+
+    def on_open(self):
+        window = Window()
+        container = Container(window)
+        self.fields = [Field(container) for i in xrange(self.count)]
+        self.objects = [window]
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    fields = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    factory = SessionFactory('fields', 'Fields', FieldsSession, fields)
+    app = HeadlessApplication([factory])
+    received = [0]
+    def on_message(object_id, action, content):
+        received[0] += 1
+
+    start = time.time()
+    ids = []
+    for idx in xrange(sessions):
+        session_id = app.start_session('fields')
+        app.client_socket(session_id).on_message(on_message)
+        ids.append(session_id)
+    app.run_until_idle()
+    elapsed = time.time() - start
+    print '%d sessions of %d fields' % (sessions, fields)
+    print 'start    %10.1f ms %10.3f ms/session' % (
+        elapsed * 1e3, elapsed * 1e3 / sessions,
+    )
+
+    received[0] = 0
+    start = time.time()
+    for session_id in ids:
+        for field in app.session(session_id).fields:
+            field.text = 'update'
+    app.run_until_idle()
+    elapsed = time.time() - start
+    print 'update   %10.1f ms %10d messages' % (elapsed * 1e3, received[0])
+
+    start = time.time()
+    count = 0
+    for session_id in ids:
+        client = app.client_socket(session_id)
+        for field in app.session(session_id).fields:
+            client.send(field.object_id, 'submit_text', {'text': 'client'})
+            count += 1
+    app.run_until_idle()
+    elapsed = time.time() - start
+    print 'receive  %10.1f ms %10d messages' % (elapsed * 1e3, count)
+
+    for session_id in ids:
+        app.end_session(session_id)
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
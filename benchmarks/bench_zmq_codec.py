@@ -0,0 +1,124 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Compare the wire codecs of the zmq server on real session messages.
+
+The messages are the snapshot of a form, and the message_batch which
+a session sends when the layout of every widget of the form changes.
+The batch is captured from a HeadlessApplication session. For each
+message, this reports the number of bytes on the wire and the encode
+and decode time of each available codec. The msgpack codec is only
+available when the msgpack package is installed.
+
+Usage: python benchmarks/bench_zmq_codec.py [widget_count]
+
+"""
+import sys
+import timeit
+
+from enaml.headless.headless_application import HeadlessApplication
+from enaml.session import Session
+from enaml.session_factory import SessionFactory
+from enaml.widgets.api import (
+    Window, Container, Label, Field, PushButton, CheckBox, SpinBox,
+)
+from enaml.zeromq.zmq_codec import CODECS
+
+
+def build_form(count):
+    """ Build and snapshot a form with `count` rows of widgets.
+
+    """
+    window = Window(title='Benchmark')
+    container = Container(window)
+    for i in xrange(count):
+        Label(container, text='Label %d' % i)
+        Field(container, text='value %d' % i)
+        CheckBox(container, text='check %d' % i, checked=bool(i % 2))
+        SpinBox(container, value=i % 100)
+    PushButton(container, text='OK')
+    window.initialize()
+    return window.snapshot()
+
+
+class FormSession(Session):
+
+    def __init__(self, count):
+        super(FormSession, self).__init__()
+        self.count = count
+
+    def on_open(self):
+        window = Window(title='Benchmark')
+        self.container = Container(window)
+        for i in xrange(self.count):
+            Label(self.container, text='Label %d' % i)
+            Field(self.container, text='value %d' % i)
+        self.objects = [window]
+
+
+def capture_batch(count):
+    """ Capture the message_batch content sent by a live session when
+    the layout of every widget in a form changes.
+
+    """
+    factory = SessionFactory('form', 'Form', FormSession, count)
+    app = HeadlessApplication([factory])
+    try:
+        session_id = app.start_session('form')
+        sent = []
+        def on_message(object_id, action, content):
+            if action == 'message_batch':
+                sent.append(content)
+        app.client_socket(session_id).on_message(on_message)
+        app.run_until_idle()
+        del sent[:]
+        for child in app.session(session_id).container.children:
+            child.hug_width = 'weak'
+        app.run_until_idle()
+        return sent[0]
+    finally:
+        app.destroy()
+
+
+def message(msg_type, content):
+    """ Wrap a content dict into the frames of a wire message.
+
+    """
+    header = {'msg_type': msg_type, 'session_id': 'abc123'}
+    return [header, {}, {}, content]
+
+
+def bench(name, frames, codec, number):
+    encoded = [codec.encode(part) for part in frames]
+    nbytes = sum(len(part) for part in encoded)
+    enc = timeit.timeit(
+        lambda: [codec.encode(part) for part in frames], number=number,
+    ) / number
+    dec = timeit.timeit(
+        lambda: [codec.decode(part) for part in encoded], number=number,
+    ) / number
+    print '  %-14s %10d bytes %10.3f ms enc %10.3f ms dec' % (
+        name, nbytes, enc * 1e3, dec * 1e3,
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    messages = {
+        'small snapshot': message(
+            'snapshot_response', {'snapshot': build_form(10)},
+        ),
+        'large snapshot': message(
+            'snapshot_response', {'snapshot': build_form(count)},
+        ),
+        'message batch': message('message', capture_batch(count)),
+    }
+    for title, frames in sorted(messages.items()):
+        print title
+        for name, codec_cls in sorted(CODECS.items()):
+            bench(name, frames, codec_cls(), 20)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ from heapq import heappush, heappop
 from itertools import count
 import logging
 from threading import Lock
+import time
 import uuid
 
 
@@ -43,6 +44,8 @@ class ScheduledTask(object):
         self._valid = True
         self._pending = True
         self._notify = None
+        self._key = None
+        self._entry = None
 
     #--------------------------------------------------------------------------
     # Private API
@@ -110,6 +113,13 @@ class Application(object):
     #: Private storage for the singleton application instance.
     _instance = None
 
+    #: The time budget, in seconds, for running scheduled tasks in a
+    #: single cycle of the event loop. Pending tasks are run in order
+    #: of priority until the budget is spent, and the remaining tasks
+    #: are run on the next cycle. At least one task is run per cycle,
+    #: so a budget of zero or None runs one task per cycle.
+    task_budget = 0.01
+
     @staticmethod
     def instance():
         """ Get the global Application instance.
@@ -153,30 +163,59 @@ class Application(object):
         self._task_heap = []
         self._counter = count()
         self._heap_lock = Lock()
+        self._tasks_posted = False
+        self._task_keys = {}
+        self._stale_entries = 0
         self.add_factories(factories)
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
-    def _process_task(self, task):
-        """ Processes the given task, then dispatches the next task.
-
-        """
-        try:
-            task._execute()
-        finally:
-            self._next_task()
+    def _process_tasks(self):
+        """ Run pending tasks from the heap on the main gui thread.
 
-    def _next_task(self):
-        """ Pulls the next task off the heap and processes it on the
-        main gui thread.
+        Tasks are popped from the heap one at a time, so that a task
+        scheduled while the batch is running is still run in order of
+        priority. When the task budget is spent, the remaining tasks
+        are deferred to the next cycle of the event loop. A keyed task
+        is removed from the key index when it is popped, so scheduling
+        the same key while it runs queues a new task.
 
         """
         heap = self._task_heap
-        with self._heap_lock:
-            if heap:
-                priority, ignored, task = heappop(heap)
-                self.deferred_call(self._process_task, task)
+        keys = self._task_keys
+        lock = self._heap_lock
+        budget = self.task_budget or 0.0
+        deadline = time.time() + budget
+        finished = False
+        executed = False
+        try:
+            while True:
+                with lock:
+                    if not heap:
+                        self._tasks_posted = False
+                        finished = True
+                        return
+                    if executed and time.time() >= deadline:
+                        return
+                    entry = heappop(heap)
+                    task = entry[2]
+                    if task._entry is not entry:
+                        # A stale entry for a task whose priority
+                        # was raised after it was scheduled.
+                        self._stale_entries -= 1
+                        continue
+                    task._entry = None
+                    key = task._key
+                    if key is not None and keys.get(key) is task:
+                        del keys[key]
+                executed = True
+                task._execute()
+        finally:
+            # The finally clause also reposts the batch when a task
+            # raises, so that one failing task does not stall the rest.
+            if not finished:
+                self.deferred_call(self._process_tasks)
 
     #--------------------------------------------------------------------------
     # Abstract API
@@ -267,10 +306,12 @@ class Application(object):
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
-    def schedule(self, callback, args=None, kwargs=None, priority=0):
+    def schedule(self, callback, args=None, kwargs=None, priority=0,
+                 key=None, merge=None):
         """ Schedule a callable to be executed on the event loop thread.
 
-        This call is thread-safe.
+        This call is thread-safe. Pending tasks are run in batches which
+        are limited by the `task_budget` of the application.
 
         Parameters
         ----------
@@ -288,6 +329,20 @@ class Application(object):
             lower priority, larger values indicate higher priority. The
             default priority is zero.
 
+        key : hashable, optional
+            A key which identifies equivalent tasks. If a task with the
+            same key is pending, no new task is queued. Instead, the
+            callback and arguments of the pending task are replaced,
+            and its priority is raised to the given priority if that
+            is higher. The pending task is returned.
+
+        merge : callable, optional
+            A callable used instead of replacing the arguments of a
+            pending task with the same key. It is invoked with the old
+            args and kwargs and the new args and kwargs, and returns
+            the (args, kwargs) for the pending task. It is called with
+            the scheduler lock held, and must not schedule tasks.
+
         Returns
         -------
         result : ScheduledTask
@@ -300,17 +355,37 @@ class Application(object):
             args = ()
         if kwargs is None:
             kwargs = {}
-        task = ScheduledTask(callback, args, kwargs)
         heap = self._task_heap
         with self._heap_lock:
-            needs_start = len(heap) == 0
+            if key is not None:
+                task = self._task_keys.get(key)
+                if task is not None and task._valid:
+                    if merge is not None:
+                        args, kwargs = merge(
+                            task._args, task._kwargs, args, kwargs
+                        )
+                    task._callback = callback
+                    task._args = args
+                    task._kwargs = kwargs
+                    if -priority < task._entry[0]:
+                        # The old entry is left in the heap, and is
+                        # skipped when it is popped.
+                        item = (-priority, self._counter.next(), task)
+                        task._entry = item
+                        heappush(heap, item)
+                        self._stale_entries += 1
+                    return task
+            task = ScheduledTask(callback, args, kwargs)
             item = (-priority, self._counter.next(), task)
+            task._entry = item
             heappush(heap, item)
+            if key is not None:
+                task._key = key
+                self._task_keys[key] = task
+            needs_start = not self._tasks_posted
+            self._tasks_posted = True
         if needs_start:
-            if self.is_main_thread():
-                self._next_task()
-            else:
-                self.deferred_call(self._next_task)
+            self.deferred_call(self._process_tasks)
         return task
 
     def has_pending_tasks(self):
@@ -323,7 +398,7 @@ class Application(object):
 
         """
         with self._heap_lock:
-            has_pending = len(self._heap) > 0
+            has_pending = len(self._task_heap) > self._stale_entries
         return has_pending
 
     def add_factories(self, factories):
@@ -533,7 +608,8 @@ def is_main_thread():
     return app.is_main_thread()
 
 
-def schedule(self, callback, args=None, kwargs=None, priority=0):
+def schedule(callback, args=None, kwargs=None, priority=0, key=None,
+             merge=None):
     """ Schedule a callable to be executed on the event loop thread.
 
     This call is thread-safe.
@@ -558,6 +634,14 @@ def schedule(self, callback, args=None, kwargs=None, priority=0):
         lower priority, larger values indicate higher priority. The
         default priority is zero.
 
+    key : hashable, optional
+        A key which identifies equivalent tasks. See the `schedule`
+        method of Application.
+
+    merge : callable, optional
+        A callable which merges the arguments of equivalent tasks. See
+        the `schedule` method of Application.
+
     Returns
     -------
     result : ScheduledTask
@@ -569,5 +653,5 @@ def schedule(self, callback, args=None, kwargs=None, priority=0):
     app = Application.instance()
     if app is None:
         raise RuntimeError('Application instance does not exist')
-    return app.schedule(callback, args, kwargs, priority)
+    return app.schedule(callback, args, kwargs, priority, key, merge)
 
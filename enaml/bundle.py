@@ -0,0 +1,105 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Command-line tool to build an Enaml bundle file.
+
+The arguments are package directories, .enaml files, or the names of
+importable packages. All .enaml files found beneath them are compiled
+and written into a single bundle file. A bundle on sys.path is imported
+from by enaml.core.archive_import_hooks.BundleEnamlImporter.
+
+"""
+import optparse
+import os
+import sys
+
+from enaml.compileall import find_enaml_files
+from enaml.core.archive_import_hooks import BUNDLE_EXT, write_bundle
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.import_hooks import read_source
+from enaml.core.parser import parse
+
+
+def module_name(src_path):
+    """ Compute the fully qualified module name of an .enaml file.
+
+    The name is built by walking up the directories of the file for as
+    long as they are Python packages.
+
+    Parameters
+    ----------
+    src_path : str
+        The absolute path to the .enaml file.
+
+    Returns
+    -------
+    result : tuple
+        The fully qualified module name, and the path of the file
+        relative to the directory which contains its top-level package.
+
+    """
+    dirname, filename = os.path.split(src_path)
+    parts = [os.path.splitext(filename)[0]]
+    rel_parts = [filename]
+    init = '__init__' + os.path.extsep + 'py'
+    while os.path.isfile(os.path.join(dirname, init)):
+        dirname, package = os.path.split(dirname)
+        parts.append(package)
+        rel_parts.append(package)
+    parts.reverse()
+    rel_parts.reverse()
+    return ('.'.join(parts), os.path.join(*rel_parts))
+
+
+def compile_modules(files):
+    """ A generator which compiles .enaml files for a bundle.
+
+    Parameters
+    ----------
+    files : list
+        The absolute paths of the .enaml files.
+
+    Yields
+    ------
+    result : tuple
+        The (fullname, filename, code) tuple for each file.
+
+    """
+    for src_path in files:
+        fullname, filename = module_name(src_path)
+        src = read_source(src_path)
+        ast = parse(src, filename=src_path)
+        code = EnamlCompiler.compile(ast, filename)
+        yield (fullname, filename, code)
+
+
+def main():
+    usage = 'usage: %prog [options] target [target ...]'
+    parser = optparse.OptionParser(usage=usage, description=__doc__)
+    parser.add_option('-o', '--output', default='app' + BUNDLE_EXT,
+                      help='The bundle file to write')
+
+    options, args = parser.parse_args()
+    if len(args) == 0:
+        parser.error('No target specified')
+
+    files = []
+    for target in args:
+        files.extend(find_enaml_files(target))
+    files = sorted(set(files))
+
+    names = {}
+    for src_path in files:
+        fullname, filename = module_name(src_path)
+        if fullname in names:
+            msg = 'Module %s is provided by both %s and %s'
+            parser.error(msg % (fullname, names[fullname], src_path))
+        names[fullname] = src_path
+
+    write_bundle(options.output, compile_modules(files))
+    print 'Wrote %d modules to %s' % (len(files), options.output)
+
+
+if __name__ == '__main__':
+    main()
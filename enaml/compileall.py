@@ -0,0 +1,212 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Command-line tool to precompile .enaml files into __enamlcache__.
+
+The arguments are directories, .enaml files, or the names of importable
+packages. All .enaml files found beneath them are parsed and compiled on
+a pool of worker processes and the cache files are written atomically,
+so that an application can be deployed with a warm cache.
+
+"""
+import multiprocessing
+import optparse
+import os
+import sys
+import time
+import traceback
+
+from enaml.core.import_hooks import (
+    CACHEDIR, VALIDATION_MODES, EnamlImporter, make_file_info
+)
+
+
+def find_enaml_files(target):
+    """ Find the .enaml files for the given target.
+
+    Parameters
+    ----------
+    target : str
+        The path to a directory or .enaml file, or the dotted name of
+        an importable package.
+
+    Returns
+    -------
+    result : list
+        The sorted list of absolute paths to the .enaml files.
+
+    """
+    if not os.path.exists(target):
+        __import__(target)
+        module = sys.modules[target]
+        paths = getattr(module, '__path__', None)
+        if paths is None:
+            paths = [os.path.dirname(module.__file__)]
+        files = []
+        for path in paths:
+            files.extend(find_enaml_files(path))
+        return sorted(set(files))
+    target = os.path.abspath(target)
+    if os.path.isfile(target):
+        return [target]
+    files = []
+    ext = os.path.extsep + 'enaml'
+    for dirpath, dirnames, filenames in os.walk(target):
+        if CACHEDIR in dirnames:
+            dirnames.remove(CACHEDIR)
+        for filename in filenames:
+            if filename.endswith(ext):
+                files.append(os.path.join(dirpath, filename))
+    return sorted(files)
+
+
+def compile_file(src_path, force=False, mode=None):
+    """ Compile an .enaml file and write its cache file.
+
+    This function is run on the worker processes, so errors are
+    returned as a formatted traceback rather than raised.
+
+    Parameters
+    ----------
+    src_path : str
+        The path to the .enaml file.
+
+    force : bool, optional
+        Whether to compile the file even if its cache file is current.
+        The default is False.
+
+    mode : str or None, optional
+        The validation mode of the cache file. If None, the default
+        mode of the EnamlImporter is used. A current cache file with a
+        different mode is recompiled.
+
+    Returns
+    -------
+    result : tuple
+        A 4-tuple of the source path, whether the file was compiled,
+        the compile time in seconds, and the error traceback or None.
+
+    """
+    start = time.time()
+    try:
+        importer = EnamlImporter(make_file_info(src_path))
+        if not force and importer.is_cache_current(mode):
+            return (src_path, False, time.time() - start, None)
+        importer.compile_source(mode)
+    except Exception:
+        return (src_path, False, time.time() - start, traceback.format_exc())
+    return (src_path, True, time.time() - start, None)
+
+
+def _compile_task(args):
+    """ A picklable wrapper which unpacks the arguments for a worker.
+
+    """
+    return compile_file(*args)
+
+
+def compile_all(files, force=False, jobs=None, callback=None, mode=None):
+    """ Compile the given .enaml files on a pool of processes.
+
+    Parameters
+    ----------
+    files : list
+        The paths to the .enaml files to compile.
+
+    force : bool, optional
+        Whether to compile the files even if their cache files are
+        current. The default is False.
+
+    jobs : int or None, optional
+        The number of worker processes. If None, the number of CPUs
+        is used. If 1, the files are compiled in this process.
+
+    callback : callable or None, optional
+        A callable invoked with the result tuple of `compile_file` as
+        each file completes.
+
+    mode : str or None, optional
+        The validation mode of the cache files. See `compile_file`.
+
+    Returns
+    -------
+    result : list
+        The list of result tuples of `compile_file`, in the order the
+        files completed.
+
+    """
+    tasks = [(path, force, mode) for path in files]
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    jobs = min(jobs, len(tasks))
+    results = []
+    if jobs <= 1:
+        for task in tasks:
+            result = _compile_task(task)
+            results.append(result)
+            if callback is not None:
+                callback(result)
+        return results
+    pool = multiprocessing.Pool(jobs)
+    try:
+        for result in pool.imap_unordered(_compile_task, tasks):
+            results.append(result)
+            if callback is not None:
+                callback(result)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def main():
+    usage = 'usage: %prog [options] target [target ...]'
+    parser = optparse.OptionParser(usage=usage, description=__doc__)
+    parser.add_option('-f', '--force', action='store_true', default=False,
+                      help='Compile files even if their cache is current')
+    parser.add_option('-j', '--jobs', type='int', default=None,
+                      help='The number of worker processes')
+    parser.add_option('-q', '--quiet', action='store_true', default=False,
+                      help='Only report errors')
+    parser.add_option('--invalidation-mode', type='choice',
+                      choices=VALIDATION_MODES, default=None,
+                      help='How the cache files are validated against '
+                           'their sources: %s' % ', '.join(VALIDATION_MODES))
+
+    options, args = parser.parse_args()
+    if len(args) == 0:
+        parser.error('No target specified')
+
+    files = []
+    for target in args:
+        files.extend(find_enaml_files(target))
+
+    def report(result):
+        path, compiled, elapsed, error = result
+        if error is not None:
+            print 'Error compiling %s' % path
+            print error
+        elif not options.quiet:
+            status = 'compiled' if compiled else 'current'
+            print '%10.1f ms  %-8s  %s' % (elapsed * 1e3, status, path)
+
+    start = time.time()
+    results = compile_all(
+        files, options.force, options.jobs, report, options.invalidation_mode,
+    )
+    wall = time.time() - start
+
+    errors = sum(1 for result in results if result[3] is not None)
+    compiled = sum(1 for result in results if result[1])
+    if not options.quiet:
+        total = sum(result[2] for result in results)
+        print ('%d files, %d compiled, %d errors: %.1f ms total compile '
+               'time, %.1f ms wall time' % (
+                   len(results), compiled, errors, total * 1e3, wall * 1e3))
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
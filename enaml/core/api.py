@@ -0,0 +1,8 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from .declarative import Declarative
+from .invalidation_batch import InvalidationBatch
+from .object import Object
+
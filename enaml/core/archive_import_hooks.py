@@ -0,0 +1,578 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Enaml importers for modules stored in zip archives and bundles.
+
+These importers are not installed by default. They are enabled by
+adding them to the framework importers:
+
+    from enaml.core.import_hooks import imports
+    from enaml.core.archive_import_hooks import (
+        ZipEnamlImporter, BundleEnamlImporter
+    )
+    imports.add_importer(ZipEnamlImporter)
+    imports.add_importer(BundleEnamlImporter)
+
+"""
+import logging
+import marshal
+import os
+import struct
+import sys
+import time
+import zipfile
+
+from .enaml_compiler import EnamlCompiler
+from .import_hooks import (
+    AbstractEnamlImporter, CACHEDIR, CACHE_HEADER, CHECKED_HASH, ENAML_EXT,
+    MAGIC, MAGIC_TAG, UNCHECKED_HASH, cache_header_mode, source_hash,
+)
+from .parser import parse
+
+
+logger = logging.getLogger(__name__)
+
+
+#------------------------------------------------------------------------------
+# Zip Archives
+#------------------------------------------------------------------------------
+def normalize_newlines(source):
+    """ Convert the line endings of a source to universal newlines.
+
+    This matches the source returned by `import_hooks.read_source`, so
+    that hash based cache files are valid for both.
+
+    """
+    return source.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class ZipArchive(object):
+    """ An open zip archive with a cached table of contents.
+
+    The central directory of the archive is read once when the archive
+    is opened, and the archive file is kept open for reading entries.
+
+    """
+    def __init__(self, path):
+        """ Initialize a ZipArchive.
+
+        Parameters
+        ----------
+        path : str
+            The path to the zip file.
+
+        """
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        self._zip_file = zipfile.ZipFile(path)
+        self._infos = dict(
+            (info.filename, info) for info in self._zip_file.infolist()
+        )
+
+    def close(self):
+        """ Close the underlying zip file.
+
+        """
+        self._zip_file.close()
+
+    def get_info(self, name):
+        """ Get the ZipInfo for an entry in the archive.
+
+        Parameters
+        ----------
+        name : str
+            The '/' separated name of the entry.
+
+        Returns
+        -------
+        result : ZipInfo or None
+            The info for the entry, or None if it does not exist.
+
+        """
+        return self._infos.get(name)
+
+    def read(self, name):
+        """ Read the data for an entry in the archive.
+
+        Parameters
+        ----------
+        name : str
+            The '/' separated name of the entry.
+
+        Returns
+        -------
+        result : str
+            The uncompressed data of the entry.
+
+        """
+        return self._zip_file.read(name)
+
+
+def zip_header_is_current(header, source, info):
+    """ Returns whether a cache file header is current with respect to
+    a source stored in a zip archive.
+
+    Parameters
+    ----------
+    header : str
+        The header bytes of the cache file.
+
+    source : str
+        The raw source stored in the archive.
+
+    info : ZipInfo
+        The info for the source entry in the archive.
+
+    Returns
+    -------
+    result : bool
+        True if the cache file can be used in place of the source.
+
+    """
+    mode = cache_header_mode(header)
+    if mode is None:
+        return False
+    magic, flags, first, second = CACHE_HEADER.unpack(header)
+    if mode == UNCHECKED_HASH:
+        return True
+    if mode == CHECKED_HASH:
+        source = normalize_newlines(source)
+        size = len(source) & 0xFFFFFFFF
+        return first == size and second == source_hash(source)
+    # Zip archives store local times with a two second resolution.
+    mtime = int(time.mktime(info.date_time + (0, 0, -1))) & 0xFFFFFFFF
+    size = info.file_size & 0xFFFFFFFF
+    return abs(first - mtime) <= 1 and second == size
+
+
+class ZipEnamlImporter(AbstractEnamlImporter):
+    """ An Enaml importer which imports modules from zip archives on
+    the python path.
+
+    An archive may contain .enaml files, their __enamlcache__ files,
+    or both. A cache file in the archive is used if it is current with
+    respect to the source in the archive or if there is no source. The
+    importer never writes to the archive, so a module without a
+    current cache file is compiled in memory on every import.
+
+    """
+    #: The cache of opened archives keyed on the archive path.
+    _archives = {}
+
+    #: The cache of split path entries. This maps a path entry to a
+    #: tuple of (archive_path, prefix), or None if the path entry does
+    #: not refer to a zip archive.
+    _path_entries = {}
+
+    @classmethod
+    def invalidate_caches(cls):
+        """ Close the opened archives and clear the cached path entries.
+
+        This must be called if a zip archive is created at a location
+        on the path after a module has been looked up on that path.
+
+        """
+        for archive in cls._archives.itervalues():
+            archive.close()
+        cls._archives.clear()
+        cls._path_entries.clear()
+
+    @classmethod
+    def _split_path_entry(cls, entry):
+        """ Split a path entry into an archive path and a prefix.
+
+        Parameters
+        ----------
+        entry : str
+            The sys.path or package __path__ entry. An entry inside an
+            archive, such as 'app.zip/pkg', is supported.
+
+        Returns
+        -------
+        result : tuple or None
+            The path to the zip file and the '/' separated prefix of
+            the entries within the archive, or None if the path entry
+            does not refer to a zip archive.
+
+        """
+        entries = cls._path_entries
+        if entry in entries:
+            return entries[entry]
+        result = None
+        path = entry
+        parts = []
+        while path:
+            if os.path.isfile(path):
+                if zipfile.is_zipfile(path):
+                    prefix = ''.join(part + '/' for part in reversed(parts))
+                    result = (path, prefix)
+                break
+            head, tail = os.path.split(path)
+            if not tail or head == path:
+                break
+            parts.append(tail)
+            path = head
+        entries[entry] = result
+        return result
+
+    @classmethod
+    def _get_archive(cls, path):
+        """ Get the opened archive for a zip file.
+
+        The archive is reopened if the zip file has been modified.
+
+        Parameters
+        ----------
+        path : str
+            The path to the zip file.
+
+        Returns
+        -------
+        result : ZipArchive or None
+            The opened archive, or None if it could not be opened.
+
+        """
+        archives = cls._archives
+        archive = archives.get(path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        if archive is not None:
+            if archive.mtime == mtime:
+                return archive
+            archive.close()
+            del archives[path]
+        if mtime is None:
+            return None
+        try:
+            archive = archives[path] = ZipArchive(path)
+        except (IOError, OSError, zipfile.BadZipfile):
+            return None
+        return archive
+
+    @classmethod
+    def locate_module(cls, fullname, path=None):
+        """ Searches for the given Enaml module in the zip archives on
+        the path and returns an instance of this class on success.
+
+        Paramters
+        ---------
+        fullname : string
+            The fully qualified name of the module.
+
+        path : list or None
+            The subpackage __path__ for submodules and subpackages
+            or None if a top-level module.
+
+        Returns
+        -------
+        results : Instance(AbstractEnamlImporter) or None
+            If the Enaml module is located an instance of the importer
+            that will perform the rest of the operations is returned.
+            Otherwise, returns None.
+
+        """
+        if path is not None:
+            modname = fullname.rsplit('.', 1)[-1]
+            entries = path
+        elif '.' in fullname:
+            return
+        else:
+            modname = fullname
+            entries = sys.path
+
+        src_leaf = modname + ENAML_EXT
+        cache_leaf = '%s.%s%senamlc' % (modname, MAGIC_TAG, os.path.extsep)
+        for entry in entries:
+            split = cls._split_path_entry(entry)
+            if split is None:
+                continue
+            archive = cls._get_archive(split[0])
+            if archive is None:
+                continue
+            prefix = split[1]
+            src_name = prefix + src_leaf
+            cache_name = prefix + CACHEDIR + '/' + cache_leaf
+            has_src = archive.get_info(src_name) is not None
+            has_cache = archive.get_info(cache_name) is not None
+            if has_cache:
+                return cls(archive, src_name, cache_name)
+            if has_src:
+                return cls(archive, src_name, None)
+
+    def __init__(self, archive, src_name, cache_name):
+        """ Initialize a ZipEnamlImporter.
+
+        Parameters
+        ----------
+        archive : ZipArchive
+            The archive which contains the module.
+
+        src_name : str
+            The name of the .enaml entry in the archive. The entry need
+            not exist if the cache entry exists.
+
+        cache_name : str or None
+            The name of the .enamlc entry in the archive, or None if
+            the archive does not contain a cache file for the module.
+
+        """
+        self.archive = archive
+        self.src_name = src_name
+        self.cache_name = cache_name
+
+    def get_code(self):
+        """ Loads and returns the code object for the Enaml module and
+        the full path to the module for use as the __file__ attribute
+        of the module.
+
+        Returns
+        -------
+        result : (code, path)
+            The Python code object for the .enaml module, and the full
+            path to the module as a string.
+
+        Raises
+        ------
+        ImportError
+            The archive has no source for the module and no cache file
+            with a valid header.
+
+        """
+        archive = self.archive
+        path = os.path.join(archive.path, *self.src_name.split('/'))
+        info = archive.get_info(self.src_name)
+        source = archive.read(self.src_name) if info is not None else None
+        if self.cache_name is not None:
+            data = archive.read(self.cache_name)
+            header = data[:CACHE_HEADER.size]
+            if source is None:
+                current = cache_header_mode(header) is not None
+            else:
+                current = zip_header_is_current(header, source, info)
+            if current:
+                return (marshal.loads(data[CACHE_HEADER.size:]), path)
+        if source is None:
+            msg = 'No source and no valid cache file for `%s` in `%s`'
+            raise ImportError(msg % (self.src_name, archive.path))
+        ast = parse(normalize_newlines(source), filename=path)
+        code = EnamlCompiler.compile(ast, path)
+        return (code, path)
+
+
+#------------------------------------------------------------------------------
+# Enaml Bundles
+#------------------------------------------------------------------------------
+# An Enaml bundle is a single file which holds the compiled code of many
+# Enaml modules. The file starts with a header of the bundle magic, the
+# interpreter magic, and the offset and size of the index. The index is
+# a marshalled dict which holds the compiler tag and a dict which maps
+# each fully qualified module name to the offset and size of its
+# marshalled code and its source file name relative to the bundle.
+BUNDLE_MAGIC = 'ENAMLBDL'
+BUNDLE_HEADER = struct.Struct('<8s4sII')
+BUNDLE_EXT = os.path.extsep + 'enamlbundle'
+
+
+def write_bundle(path, modules):
+    """ Write an Enaml bundle file.
+
+    The bundle is written to a temporary file which is renamed over
+    the path once it is complete.
+
+    Parameters
+    ----------
+    path : str
+        The path of the bundle file to write.
+
+    modules : iterable
+        An iterable of (fullname, filename, code) tuples giving the
+        fully qualified module name, the source file name to report
+        relative to the bundle, and the compiled code object.
+
+    """
+    index = {}
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as bundle_file:
+            bundle_file.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, MAGIC, 0, 0))
+            for fullname, filename, code in modules:
+                data = marshal.dumps(code)
+                index[fullname] = (bundle_file.tell(), len(data), filename)
+                bundle_file.write(data)
+            index_data = marshal.dumps({'tag': MAGIC_TAG, 'modules': index})
+            index_offset = bundle_file.tell()
+            bundle_file.write(index_data)
+            bundle_file.seek(0)
+            bundle_file.write(BUNDLE_HEADER.pack(
+                BUNDLE_MAGIC, MAGIC, index_offset, len(index_data),
+            ))
+        # os.rename does not replace an existing file on Windows.
+        if sys.platform == 'win32' and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+    finally:
+        # The temporary file only remains if the write failed.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class Bundle(object):
+    """ An Enaml bundle file with a loaded index.
+
+    """
+    def __init__(self, path):
+        """ Initialize a Bundle.
+
+        Parameters
+        ----------
+        path : str
+            The path to the bundle file.
+
+        Raises
+        ------
+        ValueError
+            The file is not a bundle for this interpreter and compiler.
+
+        """
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        with open(path, 'rb') as bundle_file:
+            header = bundle_file.read(BUNDLE_HEADER.size)
+            if len(header) != BUNDLE_HEADER.size:
+                raise ValueError('Truncated Enaml bundle %s' % path)
+            magic, py_magic, offset, size = BUNDLE_HEADER.unpack(header)
+            if magic != BUNDLE_MAGIC:
+                raise ValueError('%s is not an Enaml bundle' % path)
+            bundle_file.seek(offset)
+            index = marshal.loads(bundle_file.read(size))
+        if py_magic != MAGIC or index.get('tag') != MAGIC_TAG:
+            msg = 'Enaml bundle %s was built for a different interpreter'
+            raise ValueError(msg % path)
+        self.modules = index['modules']
+
+    def read_code(self, fullname):
+        """ Read the code object for a module in the bundle.
+
+        Parameters
+        ----------
+        fullname : str
+            The fully qualified name of the module.
+
+        Returns
+        -------
+        result : (code, path)
+            The code object for the module, and the path to report as
+            the __file__ of the module.
+
+        """
+        offset, size, filename = self.modules[fullname]
+        with open(self.path, 'rb') as bundle_file:
+            bundle_file.seek(offset)
+            code = marshal.loads(bundle_file.read(size))
+        return (code, os.path.join(self.path, filename))
+
+
+class BundleEnamlImporter(AbstractEnamlImporter):
+    """ An Enaml importer which imports modules from the Enaml bundle
+    files on sys.path.
+
+    A bundle is indexed by fully qualified module name, so a module in
+    a bundle is found regardless of the __path__ of its package.
+
+    """
+    #: The cache of loaded bundles keyed on the bundle path.
+    _bundles = {}
+
+    @classmethod
+    def _get_bundle(cls, path):
+        """ Get the loaded bundle for a bundle file.
+
+        The bundle is reloaded if the file has been modified.
+
+        Parameters
+        ----------
+        path : str
+            The path to the bundle file.
+
+        Returns
+        -------
+        result : Bundle or None
+            The loaded bundle, or None if it could not be loaded.
+
+        """
+        bundles = cls._bundles
+        bundle = bundles.get(path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            bundles.pop(path, None)
+            return None
+        if bundle is not None and bundle.mtime == mtime:
+            return bundle
+        try:
+            bundle = Bundle(path)
+        except (IOError, OSError, ValueError, EOFError), e:
+            logger.warning('Ignoring Enaml bundle: %s' % e)
+            bundle = None
+        bundles[path] = bundle
+        return bundle
+
+    @classmethod
+    def locate_module(cls, fullname, path=None):
+        """ Searches for the given Enaml module in the bundles on
+        sys.path and returns an instance of this class on success.
+
+        Paramters
+        ---------
+        fullname : string
+            The fully qualified name of the module.
+
+        path : list or None
+            The subpackage __path__ for submodules and subpackages
+            or None if a top-level module. This is ignored.
+
+        Returns
+        -------
+        results : Instance(AbstractEnamlImporter) or None
+            If the Enaml module is located an instance of the importer
+            that will perform the rest of the operations is returned.
+            Otherwise, returns None.
+
+        """
+        for entry in sys.path:
+            if entry.endswith(BUNDLE_EXT):
+                bundle = cls._get_bundle(entry)
+                if bundle is not None and fullname in bundle.modules:
+                    return cls(bundle, fullname)
+
+    def __init__(self, bundle, fullname):
+        """ Initialize a BundleEnamlImporter.
+
+        Parameters
+        ----------
+        bundle : Bundle
+            The bundle which contains the module.
+
+        fullname : str
+            The fully qualified name of the module.
+
+        """
+        self.bundle = bundle
+        self.fullname = fullname
+
+    def get_code(self):
+        """ Loads and returns the code object for the Enaml module and
+        the full path to the module for use as the __file__ attribute
+        of the module.
+
+        Returns
+        -------
+        result : (code, path)
+            The Python code object for the .enaml module, and the full
+            path to the module as a string.
+
+        """
+        return self.bundle.read_code(self.fullname)
@@ -10,6 +10,7 @@ from .abstract_expressions import (
     AbstractExpression, AbstractListener, AbstractListenableExpression
 )
 from .dynamic_scope import DynamicAttributeError
+from .invalidation_batch import InvalidationBatch
 from .object import Object
 from .operator_context import OperatorContext
 from .trait_types import EnamlInstance, EnamlEvent
@@ -304,15 +305,20 @@ class Declarative(Object):
         expression is invalidated, it is recomputed and the value of
         its attribute is updated.
 
+        If an InvalidationBatch is active, the refresh is deferred until
+        the batch exits.
+
         Parameters
         ----------
         name : str
             The attribute name to which the invalid expression is bound.
 
         """
-        value = self.eval_expression(name)
-        if value is not NotImplemented:
-            setattr(self, name, value)
+        batch = InvalidationBatch.active_batch()
+        if batch is not None:
+            batch.add(self, name)
+        else:
+            self.refresh_expression(name)
 
     def _anytrait_changed(self, name, old, new):
         """ An any trait changed handler for listener notification.
@@ -410,6 +416,20 @@ class Declarative(Object):
             return exprs[name].eval(self, name)
         return NotImplemented
 
+    def refresh_expression(self, name):
+        """ Evaluate a bound expression and update its attribute.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute with the bound expression. If no
+            expression is bound to the name, this method is a no-op.
+
+        """
+        value = self.eval_expression(name)
+        if value is not NotImplemented:
+            setattr(self, name, value)
+
     def run_listeners(self, name, old, new):
         """ Run the listeners bound to the given attribute name.
 
@@ -4,6 +4,8 @@
 #------------------------------------------------------------------------------
 from abc import ABCMeta, abstractmethod
 
+from .object import Object
+
 
 #------------------------------------------------------------------------------
 # Abstract Scope Listener
@@ -50,6 +52,127 @@ class DynamicAttributeError(AttributeError):
     pass
 
 
+class ScopeCache(object):
+    """ A cache of the ancestor depths at which dynamic names resolve.
+
+    Resolving a name through dynamic scoping walks up the tree from
+    the owner of the executing code until an ancestor provides the
+    attribute. For deep trees, and for names which are not found on
+    any ancestor such as globals and builtins, the walk dominates the
+    cost of evaluating an expression. A ScopeCache records the depth
+    of the ancestor which resolved each name, or that the name was not
+    found, so that later loads can jump straight to that ancestor.
+
+    The cache records the object ids of the ancestors of the object.
+    When the parent generation counter of `Object` changes, the
+    ancestors are collected again and the cache is only discarded if
+    they differ, so reparenting objects elsewhere in the tree does not
+    invalidate it. A cached ancestor which no longer provides the
+    attribute causes a full walk for that name.
+
+    """
+    __slots__ = ('_obj_id', '_generation', '_ancestors', '_depths')
+
+    def __init__(self):
+        """ Initialize a ScopeCache.
+
+        """
+        self._obj_id = None
+        self._generation = -1
+        self._ancestors = ()
+        self._depths = {}
+
+    def resolve(self, obj, name):
+        """ Resolve a name on the given object or its ancestors.
+
+        Parameters
+        ----------
+        obj : Declarative
+            The object from which to start the lookup.
+
+        name : str
+            The name of the attribute to lookup.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of the ancestor which provided the attribute and
+            the value of the attribute.
+
+        Raises
+        ------
+        KeyError
+            The name is not provided by the object or its ancestors.
+
+        """
+        depths = self._depths
+        generation = Object._parent_generation
+        obj_id = id(obj)
+        if obj_id != self._obj_id:
+            depths.clear()
+            self._generation = generation
+            self._obj_id = obj_id
+            self._ancestors = _ancestor_ids(obj)
+        elif generation != self._generation:
+            self._generation = generation
+            ancestors = _ancestor_ids(obj)
+            if ancestors != self._ancestors:
+                depths.clear()
+                self._ancestors = ancestors
+        depth = depths.get(name)
+        if depth is not None:
+            if depth < 0:
+                raise KeyError(name)
+            parent = obj
+            for idx in xrange(depth):
+                parent = parent.parent
+            try:
+                return (parent, getattr(parent, name))
+            except DynamicAttributeError:
+                raise
+            except AttributeError:
+                del depths[name]
+
+        depth = 0
+        parent = obj
+        while parent is not None:
+            try:
+                value = getattr(parent, name)
+            except DynamicAttributeError:
+                raise
+            except AttributeError:
+                parent = parent.parent
+                depth += 1
+            else:
+                depths[name] = depth
+                return (parent, value)
+        depths[name] = -1
+        raise KeyError(name)
+
+
+def _ancestor_ids(obj):
+    """ Get the object ids of an object and its ancestors.
+
+    Parameters
+    ----------
+    obj : Object
+        The object of interest.
+
+    Returns
+    -------
+    result : tuple
+        The object ids of the object and its ancestors, starting with
+        the object itself.
+
+    """
+    ids = []
+    push = ids.append
+    while obj is not None:
+        push(obj.object_id)
+        obj = obj.parent
+    return tuple(ids)
+
+
 class DynamicScope(object):
     """ A custom mapping object that implements Enaml's dynamic scope.
 
@@ -64,7 +187,7 @@ class DynamicScope(object):
     order to avoid unnecessary reference cycles.
 
     """
-    def __init__(self, obj, identifiers, overrides, listener):
+    def __init__(self, obj, identifiers, overrides, listener, cache=None):
         """ Initialize a DynamicScope.
 
         Parameters
@@ -83,11 +206,18 @@ class DynamicScope(object):
             A listener which should be notified when a name is loaded
             via dynamic scoping.
 
+        cache : ScopeCache or None, optional
+            A cache of the ancestor depths at which names resolve. The
+            cache should be owned by the executing code and reused
+            across evaluations. If None, names are resolved by walking
+            the ancestors of the object on every load.
+
         """
         self._obj = obj
         self._identifiers = identifiers
         self._overrides = overrides
         self._listener = listener
+        self._cache = cache
 
     def __getitem__(self, name):
         """ Lookup and return an item from the scope.
@@ -109,20 +239,27 @@ class DynamicScope(object):
         dct = self._identifiers
         if name in dct:
             return dct[name]
-        parent = self._obj
-        while parent is not None:
-            try:
-                value = getattr(parent, name)
-            except DynamicAttributeError:
-                raise
-            except AttributeError:
-                parent = parent.parent
-            else:
-                listener = self._listener
-                if listener is not None:
-                    listener.dynamic_load(parent, name, value)
-                return value
-        raise KeyError(name)
+        cache = self._cache
+        if cache is None:
+            parent = self._obj
+            while parent is not None:
+                try:
+                    value = getattr(parent, name)
+                except DynamicAttributeError:
+                    raise
+                except AttributeError:
+                    parent = parent.parent
+                else:
+                    listener = self._listener
+                    if listener is not None:
+                        listener.dynamic_load(parent, name, value)
+                    return value
+            raise KeyError(name)
+        parent, value = cache.resolve(self._obj, name)
+        listener = self._listener
+        if listener is not None:
+            listener.dynamic_load(parent, name, value)
+        return value
 
     def __contains__(self, name):
         """ Returns True if the name is in scope, False otherwise.
@@ -3,7 +3,7 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 from collections import namedtuple
-from weakref import ref
+from weakref import ref, WeakSet
 
 from traits.api import HasTraits, Disallow, TraitListObject, TraitDictObject
 
@@ -13,7 +13,9 @@ from .abstract_expressions import (
     AbstractExpression, AbstractListener, AbstractListenableExpression
 )
 from .code_tracing import CodeTracer, CodeInverter
-from .dynamic_scope import DynamicScope, AbstractScopeListener, Nonlocals
+from .dynamic_scope import (
+    DynamicScope, AbstractScopeListener, Nonlocals, ScopeCache
+)
 from .funchelper import call_func
 
 
@@ -196,7 +198,7 @@ class BaseExpression(object):
     """ The base class of the standard Enaml expression classes.
 
     """
-    __slots__ = ('_func', '_identifiers')
+    __slots__ = ('_func', '_identifiers', '_scope_cache')
 
     def __init__(self, func, identifiers):
         """ Initialize a BaseExpression.
@@ -214,6 +216,7 @@ class BaseExpression(object):
         """
         self._func = func
         self._identifiers = identifiers
+        self._scope_cache = ScopeCache()
 
 
 #------------------------------------------------------------------------------
@@ -233,7 +236,8 @@ class SimpleExpression(BaseExpression):
 
         """
         overrides = {'nonlocals': Nonlocals(obj, None)}
-        scope = DynamicScope(obj, self._identifiers, overrides, None)
+        scope = DynamicScope(obj, self._identifiers, overrides, None,
+                             self._scope_cache)
         with obj.operators:
             return call_func(self._func, (), {}, scope)
 
@@ -264,7 +268,8 @@ class NotificationExpression(BaseExpression):
             'event': self.event(obj, name, old, new),
             'nonlocals': Nonlocals(obj, None),
         }
-        scope = DynamicScope(obj, self._identifiers, overrides, None)
+        scope = DynamicScope(obj, self._identifiers, overrides, None,
+                             self._scope_cache)
         with obj.operators:
             call_func(self._func, (), {}, scope)
 
@@ -291,7 +296,8 @@ class UpdateExpression(BaseExpression):
         nonlocals = Nonlocals(obj, None)
         overrides = {'nonlocals': nonlocals}
         inverter = StandardInverter(nonlocals)
-        scope = DynamicScope(obj, self._identifiers, overrides, None)
+        scope = DynamicScope(obj, self._identifiers, overrides, None,
+                             self._scope_cache)
         with obj.operators:
             call_func(self._func, (inverter, new), {}, scope)
 
@@ -305,10 +311,19 @@ AbstractListener.register(UpdateExpression)
 class SubscriptionNotifier(object):
     """ A simple object used for attaching notification handlers.
 
+    A notifier is owned by a single expression and tracks the edges,
+    or `(obj, name)` pairs, to which its handler is attached. When the
+    dependencies of the expression change, the notifier is rewired
+    incrementally by the `update` method.
+
     """
-    __slots__ = ('expr', 'name', 'keyval', '__weakref__')
+    __slots__ = ('expr', 'name', 'edges', '__weakref__')
+
+    #: A class level weak set of the notifiers in existence. This is
+    #: used to compute the total number of live subscriptions.
+    _instances = WeakSet()
 
-    def __init__(self, expr, name, keyval):
+    def __init__(self, expr, name):
         """ Initialize a Notifier.
 
         Parameters
@@ -320,13 +335,11 @@ class SubscriptionNotifier(object):
         name : str
             The name to which the expression is bound.
 
-        keyval : object
-            An object to use for testing equivalency of notifiers.
-
         """
         self.expr = ref(expr)
         self.name = name
-        self.keyval = keyval
+        self.edges = {}
+        self._instances.add(self)
 
     def notify(self):
         """ Notify that the expression is invalid.
@@ -336,6 +349,69 @@ class SubscriptionNotifier(object):
         if expr is not None:
             expr.invalidated.emit(self.name)
 
+    def update(self, traced):
+        """ Rewire the notifier for a new set of traced items.
+
+        Handlers are only attached to the items which are not already
+        subscribed, and are detached from the subscribed items which
+        are no longer traced. The edges are keyed on the id of an object
+        instead of the object itself so that strong references to the
+        object are not maintained by the notifier.
+
+        Parameters
+        ----------
+        traced : iterable
+            An iterable of `(obj, name)` pairs of HasTraits objects and
+            trait names on which the expression depends.
+
+        """
+        id_ = id
+        handler = self.notify
+        old = self.edges
+        new = {}
+        for obj, attr in traced:
+            key = (id_(obj), attr)
+            objref = old.pop(key, None)
+            # If the weakref is dead, the id has been reused by a new
+            # object and the old handler was removed along with the old
+            # object, so the edge must be attached to the new object.
+            if objref is None or objref() is not obj:
+                obj.on_trait_change(handler, attr)
+                objref = ref(obj)
+            new[key] = objref
+        for (ignored, attr), objref in old.iteritems():
+            obj = objref()
+            if obj is not None:
+                obj.on_trait_change(handler, attr, remove=True)
+        self.edges = new
+
+    def subscription_count(self):
+        """ Get the number of live subscriptions for the notifier.
+
+        Returns
+        -------
+        result : int
+            The number of edges whose object is still alive.
+
+        """
+        return sum(1 for objref in self.edges.itervalues() if objref())
+
+
+def live_subscription_count():
+    """ Get the total number of live subscriptions of all expressions.
+
+    This is intended for monitoring the number of trait notification
+    handlers which are attached on behalf of `<<` and `:=` expressions.
+
+    Returns
+    -------
+    result : int
+        The total number of live subscriptions in the process.
+
+    """
+    notifiers = list(SubscriptionNotifier._instances)
+    return sum(notifier.subscription_count() for notifier in notifiers)
+
 
 class SubscriptionExpression(BaseExpression):
     """ An implementation of AbstractListenableExpression for the `<<`
@@ -359,31 +435,55 @@ class SubscriptionExpression(BaseExpression):
         """
         tracer = TraitsTracer()
         overrides = {'nonlocals': Nonlocals(obj, tracer)}
-        scope = DynamicScope(obj, self._identifiers, overrides, tracer)
+        scope = DynamicScope(obj, self._identifiers, overrides, tracer,
+                             self._scope_cache)
         with obj.operators:
             result = call_func(self._func, (tracer,), {}, scope)
 
-        # In most cases, the objects comprising the dependencies of an
-        # expression will not change during subsequent evaluations of
-        # the expression. Rather than creating a new notifier on each
-        # pass and repeating the work of creating the change handlers,
-        # a key for the dependencies is computed and a new notifier is
-        # created only when the key changes. The key uses the id of an
-        # object instead of the object itself so strong references to
-        # the object are not maintained by the expression.
-        id_ = id
-        traced = tracer.traced_items
-        keyval = frozenset((id_(obj), attr) for obj, attr in traced)
+        # The dependencies of an expression may change between passes,
+        # for example when a conditional branch is taken. The notifier
+        # diffs the new dependencies against the old ones, so handlers
+        # are only attached and detached for the edges which changed.
         notifier = self._notifier
-        if notifier is None or keyval != notifier.keyval:
-            notifier = SubscriptionNotifier(self, name, keyval)
-            self._notifier = notifier
-            handler = notifier.notify
-            for obj, attr in traced:
-                obj.on_trait_change(handler, attr)
+        if notifier is None:
+            notifier = self._notifier = SubscriptionNotifier(self, name)
+        notifier.update(tracer.traced_items)
 
         return result
 
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def subscription_count(self):
+        """ Get the number of live subscriptions for the expression.
+
+        Returns
+        -------
+        result : int
+            The number of `(obj, name)` pairs which currently have a
+            change handler attached on behalf of this expression.
+
+        """
+        notifier = self._notifier
+        if notifier is None:
+            return 0
+        return notifier.subscription_count()
+
+    def dependencies(self):
+        """ Get the keys of the dependencies of the expression.
+
+        Returns
+        -------
+        result : list
+            The list of `(id(obj), name)` keys for the attributes read
+            by the most recent evaluation of the expression.
+
+        """
+        notifier = self._notifier
+        if notifier is None:
+            return []
+        return notifier.edges.keys()
+
 
 AbstractListenableExpression.register(SubscriptionExpression)
 
@@ -406,7 +506,8 @@ class DelegationExpression(SubscriptionExpression):
         nonlocals = Nonlocals(obj, None)
         inverter = StandardInverter(nonlocals)
         overrides = {'nonlocals': nonlocals}
-        scope = DynamicScope(obj, self._identifiers, overrides, None)
+        scope = DynamicScope(obj, self._identifiers, overrides, None,
+                             self._scope_cache)
         with obj.operators:
             call_func(self._func._update, (inverter, new), {}, scope)
 
@@ -5,11 +5,14 @@
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
 import imp
+import logging
 import marshal
 import os
 import struct
 import sys
+import thread
 import types
+import zlib
 
 from .enaml_compiler import EnamlCompiler, COMPILER_VERSION
 from .parser import parse
@@ -17,6 +20,8 @@ from .parser import parse
 from ..utils import abstractclassmethod
 
 
+logger = logging.getLogger(__name__)
+
 # The magic number as symbols for the current Python interpreter. These
 # define the naming scheme used when create cached files and directories.
 MAGIC = imp.get_magic()
@@ -30,6 +35,54 @@ except AttributeError:
         sys.version_info[0], sys.version_info[1], COMPILER_VERSION,
     )
 CACHEDIR = '__enamlcache__'
+ENAML_EXT = os.path.extsep + 'enaml'
+ENAMLC_EXT = os.path.extsep + 'enamlc'
+
+# The modes for validating a cache file against its source file. These
+# follow the invalidation modes of PEP 552. A 'timestamp' cache file is
+# current if the mtime and size of the source match those recorded in
+# the file. A 'checked-hash' cache file is current if the size and hash
+# of the source match those recorded in the file, which makes it robust
+# against tools which reset mtimes. An 'unchecked-hash' cache file is
+# always used if it exists, and is intended for deployments where the
+# cache files are generated together with the sources.
+TIMESTAMP = 'timestamp'
+CHECKED_HASH = 'checked-hash'
+UNCHECKED_HASH = 'unchecked-hash'
+VALIDATION_MODES = (TIMESTAMP, CHECKED_HASH, UNCHECKED_HASH)
+
+# The header of a cache file is the interpreter magic, a flags field,
+# and two fields which are (mtime, size) for a timestamp file or
+# (size, hash) for a hash file. The flag bits match those of PEP 552.
+CACHE_HEADER = struct.Struct('<4sIII')
+FLAG_HASH = 0x1
+FLAG_CHECK_SOURCE = 0x2
+VALIDATION_FLAGS = {
+    TIMESTAMP: 0,
+    CHECKED_HASH: FLAG_HASH | FLAG_CHECK_SOURCE,
+    UNCHECKED_HASH: FLAG_HASH,
+}
+
+
+def env_validation_mode():
+    """ Get the cache validation mode from the environment.
+
+    Returns
+    -------
+    result : str
+        The mode given by the ENAML_CACHE_VALIDATION environment
+        variable, or TIMESTAMP if it is not set. If the value is not
+        one of the VALIDATION_MODES, a warning is logged and TIMESTAMP
+        is used.
+
+    """
+    mode = os.environ.get('ENAML_CACHE_VALIDATION', TIMESTAMP)
+    if mode not in VALIDATION_MODES:
+        msg = 'Invalid ENAML_CACHE_VALIDATION mode %r, expected one of %s; '
+        msg += 'using %r.'
+        logger.warn(msg % (mode, ', '.join(VALIDATION_MODES), TIMESTAMP))
+        mode = TIMESTAMP
+    return mode
 
 
 #------------------------------------------------------------------------------
@@ -60,6 +113,297 @@ def make_file_info(src_path):
     return EnamlFileInfo(src_path, cache_path, cache_dir)
 
 
+def read_source(src_path):
+    """ Read the source of an .enaml file.
+
+    Parameters
+    ----------
+    src_path : string
+        The full path to the .enaml file.
+
+    Returns
+    -------
+    result : str
+        The source of the file, with universal newlines.
+
+    """
+    with open(src_path, 'rU') as src_file:
+        return src_file.read()
+
+
+def source_hash(source):
+    """ Compute the hash of an .enaml source which is stored in a hash
+    based cache file.
+
+    Parameters
+    ----------
+    source : str
+        The source of the .enaml file, as returned by `read_source`.
+
+    Returns
+    -------
+    result : int
+        The unsigned 32-bit CRC of the source.
+
+    """
+    return zlib.crc32(source) & 0xFFFFFFFF
+
+
+def make_cache_header(source, st, mode=TIMESTAMP):
+    """ Create the header for the cache file of an .enaml source.
+
+    Parameters
+    ----------
+    source : str
+        The source of the .enaml file, as returned by `read_source`.
+
+    st : stat_result
+        The result of `os.stat` on the .enaml file. This should be
+        taken before reading the source, so that a source which is
+        modified concurrently produces a stale cache file.
+
+    mode : str, optional
+        One of the VALIDATION_MODES. The default is TIMESTAMP.
+
+    Returns
+    -------
+    result : str
+        The packed header of the cache file.
+
+    """
+    if mode not in VALIDATION_FLAGS:
+        raise ValueError('Invalid cache validation mode %r' % (mode,))
+    flags = VALIDATION_FLAGS[mode]
+    if flags & FLAG_HASH:
+        first = len(source) & 0xFFFFFFFF
+        second = source_hash(source)
+    else:
+        first = int(st.st_mtime) & 0xFFFFFFFF
+        second = st.st_size & 0xFFFFFFFF
+    return CACHE_HEADER.pack(MAGIC, flags, first, second)
+
+
+def cache_header_is_current(header, file_info):
+    """ Returns whether a cache file header is current with respect to
+    the source file of the given info.
+
+    Parameters
+    ----------
+    header : str
+        The header bytes read from the start of the cache file.
+
+    file_info : EnamlFileInfo
+        The file info object for the file.
+
+    Returns
+    -------
+    result : bool
+        True if the cache file can be used in place of the source.
+
+    """
+    if len(header) != CACHE_HEADER.size:
+        return False
+    magic, flags, first, second = CACHE_HEADER.unpack(header)
+    if magic != MAGIC:
+        return False
+    if flags == VALIDATION_FLAGS[UNCHECKED_HASH]:
+        return True
+    if flags == VALIDATION_FLAGS[CHECKED_HASH]:
+        try:
+            source = read_source(file_info.src_path)
+        except (OSError, IOError):
+            return False
+        size = len(source) & 0xFFFFFFFF
+        return first == size and second == source_hash(source)
+    if flags == VALIDATION_FLAGS[TIMESTAMP]:
+        try:
+            st = os.stat(file_info.src_path)
+        except OSError:
+            return False
+        mtime = int(st.st_mtime) & 0xFFFFFFFF
+        size = st.st_size & 0xFFFFFFFF
+        return first == mtime and second == size
+    # An unknown flags field, such as an old style timestamp header.
+    return False
+
+
+def cache_header_mode(header):
+    """ Returns the validation mode of a cache file header.
+
+    Parameters
+    ----------
+    header : str
+        The header bytes read from the start of the cache file.
+
+    Returns
+    -------
+    result : str or None
+        One of the VALIDATION_MODES or None if the header is invalid.
+
+    """
+    if len(header) != CACHE_HEADER.size:
+        return None
+    magic, flags, first, second = CACHE_HEADER.unpack(header)
+    if magic != MAGIC:
+        return None
+    for mode, mode_flags in VALIDATION_FLAGS.iteritems():
+        if flags == mode_flags:
+            return mode
+
+
+def write_cache(code, header, file_info):
+    """ Write the cache file for the given info, creating the cache
+    directory if needed.
+
+    The file is written to a temporary file in the cache directory
+    which is then renamed over the cache path. Concurrent readers will
+    therefore see either the old cache file or the new one, but never
+    a partially written file.
+
+    Parameters
+    ----------
+    code : types.CodeType
+        The code object to write to the cache.
+
+    header : str
+        The header for the file, as returned by `make_cache_header`.
+
+    file_info : EnamlFileInfo
+        The file info object for the file.
+
+    Raises
+    ------
+    OSError, IOError
+        The cache file could not be written.
+
+    """
+    cache_dir = file_info.cache_dir
+    if not os.path.isdir(cache_dir):
+        try:
+            os.mkdir(cache_dir)
+        except OSError:
+            # Another process may have created the directory.
+            if not os.path.isdir(cache_dir):
+                raise
+    # The temporary name is unique to the writing thread, and the file
+    # is created with the default permissions subject to the umask,
+    # which tempfile.mkstemp would restrict to the current user.
+    tmp_path = '%s.%d-%d.tmp' % (
+        file_info.cache_path, os.getpid(), thread.get_ident(),
+    )
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(tmp_path, flags, 0666)
+    try:
+        with os.fdopen(fd, 'wb') as cache_file:
+            cache_file.write(header)
+            marshal.dump(code, cache_file)
+        # os.rename does not replace an existing file on Windows.
+        if sys.platform == 'win32' and os.path.exists(file_info.cache_path):
+            os.remove(file_info.cache_path)
+        os.rename(tmp_path, file_info.cache_path)
+    finally:
+        # The temporary file only remains if the write failed.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class PathIndex(object):
+    """ A cache of the Enaml files in the directories on the import path.
+
+    Since the Enaml importer is installed on sys.meta_path, it is asked
+    to locate every module imported while it is installed. Testing for
+    the .enaml and .enamlc files of a module on every path entry costs
+    two stats per entry. The index instead caches the listing of each
+    directory and revalidates it when the modification time of the
+    directory changes, so that each path entry costs a single stat and
+    set lookups. The listing of a __enamlcache__ directory is only
+    consulted if the .enaml file does not exist and the directory has
+    a __enamlcache__ entry.
+
+    """
+    def __init__(self):
+        """ Initialize a PathIndex.
+
+        """
+        self._listings = {}
+
+    def _listing(self, dirpath):
+        """ Get the cached listing of a directory.
+
+        Parameters
+        ----------
+        dirpath : str
+            The path to the directory.
+
+        Returns
+        -------
+        result : frozenset or None
+            The names of the .enaml files, .enamlc files and cache
+            directory in the directory, or None if the directory does
+            not exist.
+
+        """
+        listings = self._listings
+        try:
+            mtime = os.stat(dirpath).st_mtime
+        except OSError:
+            listings.pop(dirpath, None)
+            return None
+        entry = listings.get(dirpath)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        try:
+            names = os.listdir(dirpath)
+        except OSError:
+            # A file on the path, such as a zip or an egg.
+            names = ()
+        suffixes = (ENAML_EXT, ENAMLC_EXT)
+        names = frozenset(
+            name for name in names
+            if name.endswith(suffixes) or name == CACHEDIR
+        )
+        listings[dirpath] = (mtime, names)
+        return names
+
+    def find(self, stem, modname):
+        """ Find the Enaml file for a module in a directory.
+
+        Parameters
+        ----------
+        stem : str
+            The directory in which to look for the module. An empty
+            string refers to the current working directory.
+
+        modname : str
+            The unqualified name of the module.
+
+        Returns
+        -------
+        result : EnamlFileInfo or None
+            The file info for the module if its .enaml file or its
+            .enamlc file exist in the directory, None otherwise.
+
+        """
+        names = self._listing(stem or os.curdir)
+        if not names:
+            return None
+        leaf = modname + ENAML_EXT
+        if leaf in names:
+            return make_file_info(os.path.join(stem, leaf))
+        if CACHEDIR not in names:
+            return None
+        file_info = make_file_info(os.path.join(stem, leaf))
+        cached = self._listing(file_info.cache_dir)
+        if cached and os.path.basename(file_info.cache_path) in cached:
+            return file_info
+
+    def invalidate(self):
+        """ Clear all of the cached directory listings.
+
+        """
+        self._listings.clear()
+
+
 #------------------------------------------------------------------------------
 # Abstract Enaml Importer
 #------------------------------------------------------------------------------
@@ -188,6 +532,28 @@ class EnamlImporter(AbstractEnamlImporter):
     http://www.mail-archive.com/python-dev@python.org/msg45203.html
 
     """
+    #: The validation mode of the cache files written by the importer.
+    #: This must be one of the VALIDATION_MODES and may be set using the
+    #: ENAML_CACHE_VALIDATION environment variable. Existing cache files
+    #: are always validated according to the mode recorded in the file.
+    cache_validation = env_validation_mode()
+
+    #: The index of the Enaml files in the directories on the import
+    #: path. This is shared by all instances of the importer.
+    path_index = PathIndex()
+
+    @classmethod
+    def invalidate_caches(cls):
+        """ Clear the cached directory listings of the path index.
+
+        The path index revalidates a directory listing whenever the
+        modification time of the directory changes. This method only
+        needs to be called if a file is added with a modification time
+        which the file system cannot distinguish from the last listing.
+
+        """
+        cls.path_index.invalidate()
+
     @classmethod
     def locate_module(cls, fullname, path=None):
         """ Searches for the given Enaml module and returns an instance 
@@ -213,13 +579,7 @@ class EnamlImporter(AbstractEnamlImporter):
         # We're looking inside a package and 'path' the package path
         if path is not None:
             modname = fullname.rsplit('.', 1)[-1]
-            leaf = ''.join((modname, os.path.extsep, 'enaml'))
-            for stem in path:
-                enaml_path = os.path.join(stem, leaf)
-                file_info = make_file_info(enaml_path)  
-                if (os.path.exists(file_info.src_path) or
-                    os.path.exists(file_info.cache_path)):
-                    return cls(file_info)
+            stems = path
 
         # We're trying a load a package
         elif '.' in fullname:
@@ -227,13 +587,14 @@ class EnamlImporter(AbstractEnamlImporter):
         
         # We're doing a direct import
         else:
-            leaf = fullname + os.path.extsep + 'enaml'
-            for stem in sys.path:
-                enaml_path = os.path.join(stem, leaf)
-                file_info = make_file_info(enaml_path) 
-                if (os.path.exists(file_info.src_path) or
-                    os.path.exists(file_info.cache_path)):
-                    return cls(file_info)
+            modname = fullname
+            stems = sys.path
+
+        find = cls.path_index.find
+        for stem in stems:
+            file_info = find(stem, modname)
+            if file_info is not None:
+                return cls(file_info)
     
     def __init__(self, file_info):
         """ Initialize an importer object.
@@ -261,11 +622,41 @@ class EnamlImporter(AbstractEnamlImporter):
 
         """
         with open(file_info.cache_path, 'rb') as cache_file:
-            cache_file.read(8)
+            cache_file.read(CACHE_HEADER.size)
             code = marshal.load(cache_file)
         return code
 
-    def _write_cache(self, code, ts, file_info):
+    def _load_current_cache(self, file_info):
+        """ Loads and returns the code object for the given file info
+        if the cache file exists and is current.
+
+        The header and the code are read from the same open file, so
+        the result is consistent even if the cache file is replaced
+        concurrently.
+
+        Parameters
+        ----------
+        file_info : EnamlFileInfo
+            The file info object for the file.
+
+        Returns
+        -------
+        result : types.CodeType or None
+            The code object for the file, or None if the cache file
+            does not exist or is not current.
+
+        """
+        try:
+            cache_file = open(file_info.cache_path, 'rb')
+        except IOError:
+            return None
+        with cache_file:
+            header = cache_file.read(CACHE_HEADER.size)
+            if not cache_header_is_current(header, file_info):
+                return None
+            return marshal.load(cache_file)
+
+    def _write_cache(self, code, header, file_info):
         """ Write the cached file for then given info, creating the 
         cache directory if needed. This call will suppress any 
         IOError or OSError exceptions.
@@ -275,41 +666,71 @@ class EnamlImporter(AbstractEnamlImporter):
         code : types.CodeType
             The code object to write to the cache.
         
-        ts : int
-            The integer timestamp for the file.
+        header : str
+            The header for the file, as returned by `make_cache_header`.
         
         file_info : EnamlFileInfo
             The file info object for the file.
         
         """
         try:
-            if not os.path.exists(file_info.cache_dir):
-                os.mkdir(file_info.cache_dir)
-            with open(file_info.cache_path, 'w+b') as cache_file:
-                cache_file.write(MAGIC)
-                cache_file.write(struct.pack('i', ts))
-                marshal.dump(code, cache_file)
+            write_cache(code, header, file_info)
         except (OSError, IOError):
             pass
 
-    def _get_magic_info(self, file_info):
-        """ Loads and returns the magic info for the given path.
+    def is_cache_current(self, mode=None):
+        """ Returns whether the cache file for this importer exists and
+        is current with respect to the source file.
 
         Parameters
         ----------
-        file_info : EnamlFileInfo
-            The file info object for the file.
-        
+        mode : str or None, optional
+            If given, the cache file is only considered current if it
+            was also written with this validation mode.
+
         Returns
         -------
-        result : (magic, timestamp)
-            The magic string and integer timestamp for the file.
+        result : bool
+            True if importing the module will use the cache file rather
+            than compiling the source.
 
         """
-        with open(file_info.cache_path, 'rb') as cache_file:
-            magic = cache_file.read(4)
-            timestamp = struct.unpack('i', cache_file.read(4))[0]
-        return (magic, timestamp)
+        file_info = self.file_info
+        try:
+            with open(file_info.cache_path, 'rb') as cache_file:
+                header = cache_file.read(CACHE_HEADER.size)
+        except IOError:
+            return False
+        if mode is not None and cache_header_mode(header) != mode:
+            return False
+        return cache_header_is_current(header, file_info)
+
+    def compile_source(self, mode=None):
+        """ Compiles the source file and writes the cache file.
+
+        Unlike `get_code`, errors raised while writing the cache file
+        are not suppressed.
+
+        Parameters
+        ----------
+        mode : str or None, optional
+            The validation mode of the cache file. If None, the mode
+            given by `cache_validation` is used.
+
+        Returns
+        -------
+        result : types.CodeType
+            The code object for the source file.
+
+        """
+        file_info = self.file_info
+        st = os.stat(file_info.src_path)
+        src = read_source(file_info.src_path)
+        header = make_cache_header(src, st, mode or self.cache_validation)
+        ast = parse(src, filename=file_info.src_path)
+        code = EnamlCompiler.compile(ast, file_info.src_path)
+        write_cache(code, header, file_info)
+        return code
 
     def get_code(self):
         """ Loads and returns the code object for the Enaml module and
@@ -334,19 +755,17 @@ class EnamlImporter(AbstractEnamlImporter):
             return (code, file_info.src_path)
 
         # Use the cached file if it exists and is current
-        src_mod_time = int(os.path.getmtime(file_info.src_path))
-        if os.path.exists(file_info.cache_path):
-            magic, ts = self._get_magic_info(file_info)
-            if magic == MAGIC and src_mod_time <= ts:
-                code = self._load_cache(file_info)
-                return (code, file_info.src_path)
+        code = self._load_current_cache(file_info)
+        if code is not None:
+            return (code, file_info.src_path)
 
         # Otherwise, compile from source and attempt to cache
-        with open(file_info.src_path) as src_file:
-            src = src_file.read()
+        st = os.stat(file_info.src_path)
+        src = read_source(file_info.src_path)
+        header = make_cache_header(src, st, self.cache_validation)
         ast = parse(src)
         code = EnamlCompiler.compile(ast, file_info.src_path)
-        self._write_cache(code, src_mod_time, file_info)
+        self._write_cache(code, header, file_info)
         return (code, file_info.src_path)
 
 
@@ -0,0 +1,173 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import OrderedDict, deque
+from threading import local
+
+from .expressions import SubscriptionExpression
+
+
+#: The per-thread batch state. The `active` attribute holds the
+#: outermost batch which is active on the current thread.
+_batch_state = local()
+
+
+def dependency_order(items):
+    """ Sort invalidated items so that dependencies are refreshed first.
+
+    An item depends on another item if the expression bound to the
+    first item reads the attribute of the second item. The items are
+    topologically sorted on this relation. Ties are broken by the order
+    of the given items, and the items which participate in a cycle are
+    placed last, in their given order.
+
+    Parameters
+    ----------
+    items : list
+        The list of `(obj, name)` pairs of Declarative objects and the
+        names of their invalidated expressions.
+
+    Returns
+    -------
+    result : list
+        The list of items in dependency order.
+
+    """
+    count = len(items)
+    if count < 2:
+        return items
+    index = {}
+    for idx, (obj, name) in enumerate(items):
+        index[(id(obj), name)] = idx
+    downstream = [[] for idx in xrange(count)]
+    indegree = [0] * count
+    for idx, (obj, name) in enumerate(items):
+        expr = obj._expressions.get(name)
+        if isinstance(expr, SubscriptionExpression):
+            for key in expr.dependencies():
+                other = index.get(key)
+                if other is not None and other != idx:
+                    downstream[other].append(idx)
+                    indegree[idx] += 1
+    ready = deque(idx for idx in xrange(count) if indegree[idx] == 0)
+    order = []
+    while ready:
+        idx = ready.popleft()
+        order.append(idx)
+        for other in downstream[idx]:
+            indegree[other] -= 1
+            if indegree[other] == 0:
+                ready.append(other)
+    if len(order) != count:
+        seen = set(order)
+        order.extend(idx for idx in xrange(count) if idx not in seen)
+    return [items[idx] for idx in order]
+
+
+class InvalidationBatch(object):
+    """ A context manager which batches the refresh of `<<` expressions.
+
+    While a batch is active, an invalidated expression is not evaluated
+    immediately. Instead, the `(obj, name)` pair is recorded and each
+    recorded expression is evaluated once, in dependency order, when
+    the outermost batch exits. This avoids redundant evaluations and
+    inconsistent intermediate values when a change touches several
+    attributes read by the same expression. Batches may be nested, in
+    which case the inner batches defer to the outermost batch. A
+    batch is only active on the thread which entered it.
+
+    """
+    @staticmethod
+    def active_batch():
+        """ A staticmethod that returns the batch which is active on
+        the current thread, or None if there is no active batch.
+
+        """
+        return getattr(_batch_state, 'active', None)
+
+    def __init__(self):
+        """ Initialize an InvalidationBatch.
+
+        """
+        self._pending = OrderedDict()
+        self._scheduled = set()
+        self._outermost = False
+        self._evaluations = 0
+
+    def __enter__(self):
+        """ A context manager method that activates the batch if there
+        is no active batch on the current thread.
+
+        """
+        if getattr(_batch_state, 'active', None) is None:
+            _batch_state.active = self
+            self._outermost = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ A context manager method that refreshes the pending
+        expressions if this is the outermost batch.
+
+        The pending expressions are discarded if an exception was
+        raised in the context.
+
+        """
+        if self._outermost:
+            try:
+                if exc_type is None:
+                    self.flush()
+            finally:
+                self._pending.clear()
+                self._outermost = False
+                _batch_state.active = None
+
+    def add(self, obj, name):
+        """ Record an invalidated expression for a later refresh.
+
+        Parameters
+        ----------
+        obj : Declarative
+            The object to which the expression is bound.
+
+        name : str
+            The attribute name to which the expression is bound.
+
+        """
+        key = (id(obj), name)
+        if key not in self._scheduled:
+            self._pending[key] = (obj, name)
+
+    def flush(self):
+        """ Refresh the pending expressions in dependency order.
+
+        The batch remains active during the flush. An expression which
+        is invalidated by the refresh of an upstream expression is not
+        refreshed again if it is still scheduled in the current round.
+        Other expressions invalidated by the refresh are collected and
+        refreshed in a subsequent round.
+
+        """
+        scheduled = self._scheduled
+        while self._pending:
+            items = self._pending.values()
+            self._pending = OrderedDict()
+            scheduled.update((id(obj), name) for obj, name in items)
+            try:
+                for obj, name in dependency_order(items):
+                    scheduled.discard((id(obj), name))
+                    self._evaluations += 1
+                    obj.refresh_expression(name)
+            finally:
+                scheduled.clear()
+
+    def evaluations(self):
+        """ Get the number of expressions evaluated by the batch.
+
+        Returns
+        -------
+        result : int
+            The number of expression refreshes performed by `flush`.
+
+        """
+        return self._evaluations
@@ -8,7 +8,7 @@ import re
 
 from traits.api import (
     HasStrictTraits, ReadOnly, Str, Property, Tuple, Instance, Bool, Disallow,
-    cached_property
+    cached_property, on_trait_change
 )
 
 from enaml.utils import LoopbackGuard, id_generator
@@ -165,6 +165,12 @@ class Object(HasStrictTraits):
     #: explicitly destroyed.
     _objects = {}
 
+    #: Class level counter which is incremented whenever the parent of
+    #: any Object changes. Caches which depend on the shape of the tree,
+    #: such as the name resolution cache used by dynamic scoping, use
+    #: this counter to cheaply determine whether they are still valid.
+    _parent_generation = 0
+
     @classmethod
     def lookup_object(cls, object_id):
         """ A classmethod which finds the object with the given id.
@@ -183,6 +189,19 @@ class Object(HasStrictTraits):
         """
         return cls._objects.get(object_id)
 
+    @classmethod
+    def parent_generation(cls):
+        """ A classmethod which returns the current parent generation.
+
+        Returns
+        -------
+        result : int
+            A counter which is incremented whenever the parent of any
+            Object is changed.
+
+        """
+        return Object._parent_generation
+
     def __new__(cls, *args, **kwargs):
         """ Create a new Object.
 
@@ -249,6 +268,13 @@ class Object(HasStrictTraits):
         self.session = None
         type(self)._objects.pop(self.object_id, None)
 
+    @on_trait_change('_parent')
+    def _bump_parent_generation(self):
+        """ Increment the parent generation when the parent changes.
+
+        """
+        Object._parent_generation += 1
+
     #--------------------------------------------------------------------------
     # Property Methods
     #--------------------------------------------------------------------------
@@ -590,7 +616,7 @@ class Object(HasStrictTraits):
                     return
                 parent = parent._parent
 
-    def send_action(self, action, content):
+    def send_action(self, action, content, buffers=None):
         """ Send an action to the client of this object.
 
         The action will only be sent if the object is fully initialized.
@@ -603,6 +629,12 @@ class Object(HasStrictTraits):
         content : dict
             The content data for the action.
 
+        buffers : list, optional
+            A list of objects supporting the buffer protocol, such as
+            bytearrays or NumPy arrays, to send without encoding along
+            with the action. The client receives them as a list under
+            the 'buffers' key of the content. The default is None.
+
         """
         if self.initialized:
             session = self.session
@@ -610,7 +642,7 @@ class Object(HasStrictTraits):
                 self.inherit_session()
                 session = self.session
             if session is not None:
-                session.send(self.object_id, action, content)
+                session.send(self.object_id, action, content, buffers)
 
     def snapshot(self):
         """ Create a snapshot of the tree starting from this object.
@@ -0,0 +1,97 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import deque
+from threading import Lock
+
+
+class DeferredQueue(object):
+    """ A thread-safe queue of callbacks to run on the main gui thread.
+
+    Posting a callback only appends it to a lock-protected deque. The
+    toolkit is woken up only when the queue goes from empty to
+    non-empty, and its wake-up handler then drains the queue. A burst
+    of deferred calls therefore costs a single toolkit event.
+
+    """
+    __slots__ = ('_calls', '_lock', '_wake')
+
+    def __init__(self, wake):
+        """ Initialize a DeferredQueue.
+
+        Parameters
+        ----------
+        wake : callable
+            A thread-safe callable which takes no arguments. It should
+            arrange for `drain` to be called on the main gui thread.
+
+        """
+        self._calls = deque()
+        self._lock = Lock()
+        self._wake = wake
+
+    def post(self, callback, args, kwargs):
+        """ Post a callback to the queue. This call is thread-safe.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to execute on the main thread.
+
+        args : tuple
+            The positional arguments to pass to the callback.
+
+        kwargs : dict
+            The keyword arguments to pass to the callback.
+
+        """
+        with self._lock:
+            calls = self._calls
+            needs_wake = len(calls) == 0
+            calls.append((callback, args, kwargs))
+        if needs_wake:
+            self._wake()
+
+    def drain(self):
+        """ Run the callbacks which are in the queue.
+
+        This should only be called on the main gui thread, by the
+        wake-up handler. Callbacks posted while the queue is drained
+        are left for the next wake-up, so that a callback which posts
+        itself again cannot starve the event loop. If a callback
+        raises, the callbacks after it are put back at the front of
+        the queue before the exception propagates.
+
+        Returns
+        -------
+        result : int
+            The number of callbacks which were run.
+
+        """
+        with self._lock:
+            calls = self._calls
+            self._calls = deque()
+        ran = 0
+        try:
+            while calls:
+                callback, args, kwargs = calls.popleft()
+                ran += 1
+                callback(*args, **kwargs)
+        finally:
+            if calls:
+                with self._lock:
+                    pending = self._calls
+                    needs_wake = len(pending) == 0
+                    calls.extend(pending)
+                    self._calls = calls
+                if needs_wake:
+                    self._wake()
+        return ran
+
+    def pending(self):
+        """ Get the number of callbacks waiting in the queue.
+
+        """
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,150 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import types
+
+from enaml.socket_interface import ActionSocketInterface
+from enaml.weakmethod import WeakMethod
+
+
+class HeadlessActionSocket(object):
+    """ A concrete in-memory implementation of ActionSocketInterface.
+
+    A headless socket is one end of a connected pair. A message sent
+    on a socket is delivered to the `receive` method of its peer on a
+    later cycle of the event loop, which mirrors the queued connection
+    of the Qt action sockets. The content is not copied or encoded.
+
+    """
+    def __init__(self, post):
+        """ Initialize a HeadlessActionSocket.
+
+        Parameters
+        ----------
+        post : callable
+            A callable with the signature of `deferred_call`, which is
+            used to deliver the messages sent on the socket.
+
+        """
+        self._post = post
+        self._peer = None
+        self._callback = None
+
+    @classmethod
+    def pair(cls, post):
+        """ Create a pair of connected sockets.
+
+        Parameters
+        ----------
+        post : callable
+            A callable with the signature of `deferred_call`, which is
+            used to deliver the messages sent on the sockets.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of connected HeadlessActionSocket instances.
+
+        """
+        first = cls(post)
+        second = cls(post)
+        first._peer = second
+        second._peer = first
+        return first, second
+
+    def on_message(self, callback):
+        """ Register a callback for receiving messages sent by a client
+        object.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable with an argument signature that is equivalent to
+            the `send` method. If the callback is a bound method, then
+            the lifetime of the callback will be bound to lifetime of
+            the method owner object.
+
+        """
+        if isinstance(callback, types.MethodType):
+            callback = WeakMethod(callback)
+        self._callback = callback
+
+    def send(self, object_id, action, content):
+        """ Send the action to the peer socket.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        peer = self._peer
+        if peer is not None:
+            self._post(peer.receive, object_id, action, content)
+
+    def send_binary(self, object_id, action, content, buffers):
+        """ Send the action and binary data to the peer socket.
+
+        The buffers are passed by reference in the 'buffers' key of
+        a copy of the content dict. They are not copied or encoded.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        buffers : list
+            The list of buffer objects to send with the action.
+
+        """
+        content = dict(content)
+        content['buffers'] = list(buffers)
+        self.send(object_id, action, content)
+
+    def receive(self, object_id, action, content):
+        """ Receive a message sent to the socket.
+
+        The message will be routed to the registered callback, if one
+        exists.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        callback = self._callback
+        if callback is not None:
+            callback(object_id, action, content)
+
+    def close(self):
+        """ Disconnect the socket from its peer and its callback.
+
+        """
+        peer = self._peer
+        if peer is not None:
+            peer._peer = None
+        self._peer = None
+        self._callback = None
+
+
+ActionSocketInterface.register(HeadlessActionSocket)
@@ -0,0 +1,317 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from heapq import heappush, heappop
+from itertools import count
+import logging
+from threading import Event, Lock, current_thread
+import time
+
+from enaml.application import Application
+from enaml.deferred_queue import DeferredQueue
+
+from .headless_action_socket import HeadlessActionSocket
+
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessApplication(Application):
+    """ A concrete implementation of an Enaml application which does
+    not require a gui toolkit.
+
+    A HeadlessApplication runs its own event loop in pure Python, on
+    the thread which created the application. The sessions of the
+    application communicate through in-memory socket pairs, and the
+    client side of a session is available from `client_socket`. This
+    makes it possible to serve, test, and benchmark sessions without
+    a display.
+
+    Each cycle of the event loop first runs the calls which were
+    deferred before the cycle, then the timed calls which are due.
+    Calls which are deferred during a cycle are run on the next one.
+
+    """
+    def __init__(self, factories):
+        """ Initialize a HeadlessApplication.
+
+        Parameters
+        ----------
+        factories : iterable
+            An iterable of SessionFactory instances to pass to the
+            superclass constructor.
+
+        """
+        super(HeadlessApplication, self).__init__(factories)
+        self._thread = current_thread()
+        self._wakeup = Event()
+        self._queue = DeferredQueue(self._wakeup.set)
+        self._timers = []
+        self._timer_lock = Lock()
+        self._timer_counter = count()
+        self._running = False
+        self._sockets = {}
+
+    #--------------------------------------------------------------------------
+    # Abstract API Implementation
+    #--------------------------------------------------------------------------
+    def socket(self, session_id):
+        """ Get the ActionSocketInterface for a session.
+
+        Parameters
+        ----------
+        session_id : str
+            The string identifier for the session which will use the
+            created action socket.
+
+        Returns
+        -------
+        result : ActionSocketInterface
+            An implementor of ActionSocketInterface which can be used
+            by Enaml Session instances for messaging.
+
+        """
+        return self._socket_pair(session_id)[0]
+
+    def start(self):
+        """ Start the application's main event loop.
+
+        The loop runs until `stop` is called. It sleeps while there
+        are no deferred calls and no timed calls are due. Exceptions
+        raised by callbacks are logged, and do not stop the loop.
+
+        """
+        if self._running:
+            return
+        self._running = True
+        wakeup = self._wakeup
+        try:
+            while self._running:
+                wakeup.clear()
+                try:
+                    self.process_events()
+                except Exception:
+                    logger.exception('Error in the headless event loop')
+                if not self._running or self._queue.pending():
+                    continue
+                wakeup.wait(self._next_timeout())
+        finally:
+            self._running = False
+
+    def stop(self):
+        """ Stop the application's main event loop.
+
+        This call is thread-safe.
+
+        """
+        self._running = False
+        self._wakeup.set()
+
+    def deferred_call(self, callback, *args, **kwargs):
+        """ Invoke a callable on the next cycle of the main event loop
+        thread.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to execute at some point in the future.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callback.
+
+        """
+        self._queue.post(callback, args, kwargs)
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        """ Invoke a callable on the main event loop thread at a
+        specified time in the future.
+
+        Parameters
+        ----------
+        ms : int
+            The time to delay, in milliseconds, before executing the
+            callable.
+
+        callback : callable
+            The callable object to execute at some point in the future.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callback.
+
+        """
+        deadline = time.time() + ms / 1000.0
+        with self._timer_lock:
+            order = self._timer_counter.next()
+            heappush(self._timers, (deadline, order, callback, args, kwargs))
+        self._wakeup.set()
+
+    def is_main_thread(self):
+        """ Indicates whether the caller is on the main gui thread.
+
+        Returns
+        -------
+        result : bool
+            True if called from the thread which created the
+            application. False otherwise.
+
+        """
+        return current_thread() is self._thread
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def end_session(self, session_id):
+        """ End the session with the given session id.
+
+        This is an overridden parent class method which closes the
+        sockets of the session.
+
+        """
+        super(HeadlessApplication, self).end_session(session_id)
+        pair = self._sockets.pop(session_id, None)
+        if pair is not None:
+            pair[0].close()
+            pair[1].close()
+
+    def client_socket(self, session_id):
+        """ Get the client side socket for a session.
+
+        Messages sent by the objects of the session are delivered to
+        the callback registered on this socket, and messages sent on
+        this socket are delivered to the objects of the session.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the session of interest.
+
+        Returns
+        -------
+        result : HeadlessActionSocket
+            The client side socket for the session.
+
+        Raises
+        ------
+        ValueError
+            If the session id does not correspond to an active session.
+
+        """
+        pair = self._sockets.get(session_id)
+        if pair is None:
+            raise ValueError('Invalid session id')
+        return pair[1]
+
+    def process_events(self):
+        """ Run a single cycle of the event loop.
+
+        This must be called on the main thread. It does not block.
+
+        Returns
+        -------
+        result : int
+            The number of callbacks which were run.
+
+        """
+        ran = self._queue.drain()
+        timers = self._timers
+        lock = self._timer_lock
+        now = time.time()
+        due = []
+        with lock:
+            while timers and timers[0][0] <= now:
+                due.append(heappop(timers))
+        due.reverse()
+        try:
+            while due:
+                callback, args, kwargs = due.pop()[2:]
+                ran += 1
+                callback(*args, **kwargs)
+        finally:
+            # The timers after a failing one are run on the next cycle.
+            if due:
+                with lock:
+                    for item in due:
+                        heappush(timers, item)
+        return ran
+
+    def run_until_idle(self, timeout=None):
+        """ Run the event loop until there is no more pending work.
+
+        This runs cycles of the event loop while there are deferred
+        calls, and waits for the timed calls which are due within the
+        timeout. This must be called on the main thread.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum time, in seconds, to wait for pending timed
+            calls. The default is None, which only runs the timed
+            calls which are already due.
+
+        Returns
+        -------
+        result : int
+            The number of callbacks which were run.
+
+        """
+        limit = time.time() + (timeout or 0.0)
+        ran = 0
+        while True:
+            ran += self.process_events()
+            if self._queue.pending():
+                continue
+            wait = self._next_timeout()
+            if wait is None:
+                break
+            if wait > 0:
+                if time.time() + wait > limit:
+                    break
+                time.sleep(wait)
+        return ran
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _next_timeout(self):
+        """ Get the time until the next timed call is due.
+
+        Returns
+        -------
+        result : float or None
+            The time in seconds until the next timed call is due, or
+            None if there are no timed calls.
+
+        """
+        with self._timer_lock:
+            timers = self._timers
+            if not timers:
+                return None
+            return max(timers[0][0] - time.time(), 0.0)
+
+    def _socket_pair(self, session_id):
+        """ Get the socket pair for the given session id.
+
+        If the socket pair does not yet exist, it will be created. This
+        is only called by `socket`, when a session is started.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the session that will use the sockets.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of action sockets for the server and client sides,
+            respectively.
+
+        """
+        sockets = self._sockets
+        pair = sockets.get(session_id)
+        if pair is None:
+            pair = HeadlessActionSocket.pair(self.deferred_call)
+            sockets[session_id] = pair
+        return pair
@@ -0,0 +1,209 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" A compact, flat encoding of linear constraints for the wire.
+
+The encoding of a list of constraints is a dict with the following
+keys:
+
+'owners'
+    The list of unique owner ids of the constraint variables.
+
+'vars'
+    The variable table. This is a flat list of (owner index, name)
+    pairs, one pair per unique constraint variable.
+
+'cns'
+    A list with one flat list per constraint. Each constraint is
+    normalized to the form `expression <op> 0` and encoded as
+    [op, strength, weight, constant, var, coeff, var, coeff, ...]
+    where `op` and `strength` are indices into the OPERATORS and
+    STRENGTHS tuples, `constant` is the constant of the expression,
+    and each `var`, `coeff` pair is an index into the variable table
+    and the coefficient of that variable in the expression.
+
+"""
+from .constraint_variable import ConstraintVariable, Term, LinearExpression
+
+
+#: The constraint operators, indexed by their code.
+OPERATORS = ('==', '<=', '>=')
+
+#: The constraint strengths, indexed by their code.
+STRENGTHS = ('required', 'strong', 'medium', 'weak')
+
+_OPERATOR_CODES = dict((op, idx) for idx, op in enumerate(OPERATORS))
+
+_STRENGTH_CODES = dict((s, idx) for idx, s in enumerate(STRENGTHS))
+
+
+def _collect_terms(symbolic, sign, coeffs):
+    """ Accumulate the terms of a linear symbolic into a dict.
+
+    Parameters
+    ----------
+    symbolic : LinearSymbolic
+        The constraint variable, term, or linear expression.
+
+    sign : float
+        The factor to apply to the coefficients, 1.0 for the left
+        hand side of a constraint and -1.0 for the right hand side.
+
+    coeffs : dict
+        The dict mapping (owner, name) to coefficient to update.
+
+    Returns
+    -------
+    result : float
+        The signed constant of the symbolic.
+
+    """
+    if isinstance(symbolic, ConstraintVariable):
+        key = (symbolic.owner, symbolic.name)
+        coeffs[key] = coeffs.get(key, 0.0) + sign
+        return 0.0
+    if isinstance(symbolic, Term):
+        var = symbolic.var
+        key = (var.owner, var.name)
+        coeffs[key] = coeffs.get(key, 0.0) + sign * symbolic.coeff
+        return 0.0
+    if isinstance(symbolic, LinearExpression):
+        for var, coeff in symbolic.coefficients():
+            key = (var.owner, var.name)
+            coeffs[key] = coeffs.get(key, 0.0) + sign * coeff
+        return sign * symbolic.constant
+    msg = 'Unhandled linear symbolic type `%s`'
+    raise TypeError(msg % type(symbolic).__name__)
+
+
+def encode_constraints(constraints):
+    """ Encode a list of linear constraints.
+
+    Parameters
+    ----------
+    constraints : iterable
+        An iterable of LinearConstraint objects.
+
+    Returns
+    -------
+    result : dict
+        The flat encoding of the constraints.
+
+    """
+    owners = []
+    owner_index = {}
+    var_table = []
+    var_index = {}
+    encoded = []
+    op_codes = _OPERATOR_CODES
+    strength_codes = _STRENGTH_CODES
+    collect = _collect_terms
+    for cn in constraints:
+        coeffs = {}
+        const = collect(cn.lhs, 1.0, coeffs)
+        const += collect(cn.rhs, -1.0, coeffs)
+        item = [
+            op_codes[cn.op], strength_codes[cn.strength], cn.weight, const,
+        ]
+        for key, coeff in coeffs.iteritems():
+            if coeff == 0.0:
+                continue
+            idx = var_index.get(key)
+            if idx is None:
+                owner, name = key
+                o_idx = owner_index.get(owner)
+                if o_idx is None:
+                    o_idx = owner_index[owner] = len(owners)
+                    owners.append(owner)
+                idx = var_index[key] = len(var_index)
+                var_table.append(o_idx)
+                var_table.append(name)
+            item.append(idx)
+            item.append(coeff)
+        encoded.append(item)
+    return {'owners': owners, 'vars': var_table, 'cns': encoded}
+
+
+def decode_constraints(info, variable):
+    """ Decode an encoded list of constraints into casuarius objects.
+
+    Parameters
+    ----------
+    info : dict
+        The flat encoding of the constraints as created by a call to
+        `encode_constraints`.
+
+    variable : callable
+        A callable which accepts an owner id and a variable name and
+        returns the casuarius ConstraintVariable for that pair.
+
+    Returns
+    -------
+    result : list
+        The list of casuarius LinearConstraint objects.
+
+    """
+    from casuarius import (
+        STRENGTH_MAP, EQConstraint, GEConstraint, LEConstraint,
+        LinearExpression, Term,
+    )
+    owners = info['owners']
+    flat = info['vars']
+    variables = [
+        variable(owners[flat[idx]], flat[idx + 1])
+        for idx in xrange(0, len(flat), 2)
+    ]
+    classes = {'==': EQConstraint, '<=': LEConstraint, '>=': GEConstraint}
+    classes = [classes[op] for op in OPERATORS]
+    strengths = [STRENGTH_MAP[strength] for strength in STRENGTHS]
+    term = Term
+    expression = LinearExpression
+    cns = []
+    push = cns.append
+    for item in info['cns']:
+        terms = [
+            term(variables[item[idx]], item[idx + 1])
+            for idx in xrange(4, len(item), 2)
+        ]
+        expr = expression(terms, item[3])
+        push(classes[item[0]](expr, 0.0, strengths[item[1]], item[2]))
+    return cns
+
+
+def constraint_keys(info):
+    """ Compute hashable structural keys for encoded constraints.
+
+    Two constraints have equal keys if they have the same operator,
+    strength, weight, constant, and coefficients for the same owner
+    id and variable name pairs. The keys are independent of the order
+    of the variable table, so they can be compared across messages to
+    find the constraints which were added and removed.
+
+    Parameters
+    ----------
+    info : dict
+        The flat encoding of the constraints as created by a call to
+        `encode_constraints`.
+
+    Returns
+    -------
+    result : list
+        The list of keys, in the same order as the constraints.
+
+    """
+    owners = info['owners']
+    flat = info['vars']
+    variables = [
+        (owners[flat[idx]], flat[idx + 1])
+        for idx in xrange(0, len(flat), 2)
+    ]
+    keys = []
+    push = keys.append
+    for item in info['cns']:
+        terms = frozenset(
+            (variables[item[idx]], item[idx + 1])
+            for idx in xrange(4, len(item), 2)
+        )
+        push((item[0], item[1], item[2], item[3], terms))
+    return keys
@@ -2,7 +2,6 @@
 #  Copyright (c) 2011, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from collections import defaultdict
 import operator
 
 
@@ -13,8 +12,36 @@ def almost_equal(a, b, eps=1e-8):
     return abs(a - b) < eps
 
 
+def _add_coeff(coeffs, var, coeff):
+    """ Add a coefficient for a variable to a coefficient map in place.
+
+    Variables whose accumulated coefficient is almost zero are removed
+    from the map, so the map only ever holds non-zero terms.
+
+    """
+    coeff += coeffs.get(var, 0.0)
+    if -1e-8 < coeff < 1e-8:
+        coeffs.pop(var, None)
+    else:
+        coeffs[var] = coeff
+
+
+def _expression(coeffs, constant):
+    """ Create a LinearExpression which takes ownership of the given
+    coefficient map, without copying or reducing it.
+
+    """
+    expr = LinearExpression.__new__(LinearExpression)
+    expr._coeffs = coeffs
+    expr._terms = None
+    expr.constant = constant
+    return expr
+
+
 class LinearSymbolic(object):
 
+    __slots__ = ()
+
     def nonlinear(self, msg):
         raise TypeError('Non-linear expression: %s' % msg)
     
@@ -107,7 +134,7 @@ class LinearSymbolic(object):
 
     def __eq__(self, other):
         if isinstance(other, (float, int, long)):
-            rhs = LinearExpression([], float(other))
+            rhs = _expression({}, float(other))
         elif isinstance(other, LinearSymbolic):
             rhs = other
         else:
@@ -117,7 +144,7 @@ class LinearSymbolic(object):
 
     def __le__(self, other):
         if isinstance(other, (float, int, long)):
-            rhs = LinearExpression([], float(other))
+            rhs = _expression({}, float(other))
         elif isinstance(other, LinearSymbolic):
             rhs = other
         else:
@@ -127,7 +154,7 @@ class LinearSymbolic(object):
 
     def __ge__(self, other):
         if isinstance(other, (float, int, long)):
-            rhs = LinearExpression([], float(other))
+            rhs = _expression({}, float(other))
         elif isinstance(other, LinearSymbolic):
             rhs = other
         else:
@@ -147,6 +174,8 @@ class LinearSymbolic(object):
 
 class ConstraintVariable(LinearSymbolic):
 
+    __slots__ = ('name', 'owner')
+
     def __init__(self, name, owner):
         self.name = name
         self.owner = owner
@@ -171,15 +200,15 @@ class ConstraintVariable(LinearSymbolic):
         if not isinstance(self, LinearSymbolic):
             self, other = other, self
         if isinstance(other, (float, int, long)):
-            terms = [Term(self)]
-            const = float(other)
-            expr = LinearExpression(terms, const)
+            expr = _expression({self: 1.0}, float(other))
         elif isinstance(other, Term):
-            terms = [Term(self), other]
-            expr = LinearExpression(terms)
+            coeffs = {self: 1.0}
+            _add_coeff(coeffs, other.var, other.coeff)
+            expr = _expression(coeffs, 0.0)
         elif isinstance(other, ConstraintVariable):
-            terms = [Term(self), Term(other)]
-            expr = LinearExpression(terms)
+            coeffs = {self: 1.0}
+            _add_coeff(coeffs, other, 1.0)
+            expr = _expression(coeffs, 0.0)
         elif isinstance(other, LinearExpression):
             expr = other + self
         else:
@@ -211,6 +240,8 @@ class ConstraintVariable(LinearSymbolic):
 
 class Term(LinearSymbolic):
 
+    __slots__ = ('var', 'coeff')
+
     def __init__(self, var, coeff=1.0):
         self.var = var
         self.coeff = coeff
@@ -244,15 +275,19 @@ class Term(LinearSymbolic):
         if not isinstance(self, LinearSymbolic):
             self, other = other, self
         if isinstance(other, (float, int, long)):
-            terms = [self]
-            const = float(other)
-            expr = LinearExpression(terms, const)
+            coeffs = {}
+            _add_coeff(coeffs, self.var, self.coeff)
+            expr = _expression(coeffs, float(other))
         elif isinstance(other, Term):
-            terms = [self, other]
-            expr = LinearExpression(terms)
+            coeffs = {}
+            _add_coeff(coeffs, self.var, self.coeff)
+            _add_coeff(coeffs, other.var, other.coeff)
+            expr = _expression(coeffs, 0.0)
         elif isinstance(other, ConstraintVariable):
-            terms = [self, Term(other)]
-            expr = LinearExpression(terms)
+            coeffs = {}
+            _add_coeff(coeffs, self.var, self.coeff)
+            _add_coeff(coeffs, other, 1.0)
+            expr = _expression(coeffs, 0.0)
         elif isinstance(other, LinearExpression):
             expr = other + self
         else:
@@ -284,21 +319,50 @@ class Term(LinearSymbolic):
 
 class LinearExpression(LinearSymbolic):
 
+    # An expression is stored as a map of variable to coefficient which
+    # never contains an almost zero coefficient. The map is never
+    # modified after the expression is created, so expressions which
+    # chain, such as `a + b + 10`, copy the map and accumulate into
+    # the copy in place. The tuple of Term objects is only created on
+    # request.
+    __slots__ = ('_coeffs', '_terms', 'constant')
+
     @staticmethod
     def reduce_terms(terms):
-        mapping = defaultdict(float)
+        mapping = {}
         for term in terms:
-            mapping[term.var] += term.coeff
-        terms = tuple(
+            _add_coeff(mapping, term.var, term.coeff)
+        return tuple(
             Term(var, coeff) for (var, coeff) in mapping.iteritems()
-            if not almost_equal(coeff, 0.0)
         )
-        return terms
 
     def __init__(self, terms, constant=0.0):
-        self.terms = self.reduce_terms(terms)
+        coeffs = {}
+        for term in terms:
+            _add_coeff(coeffs, term.var, term.coeff)
+        self._coeffs = coeffs
+        self._terms = None
         self.constant = constant
 
+    @property
+    def terms(self):
+        """ The tuple of reduced Term objects of the expression.
+
+        """
+        terms = self._terms
+        if terms is None:
+            terms = self._terms = tuple(
+                Term(var, coeff) for (var, coeff) in self._coeffs.iteritems()
+            )
+        return terms
+
+    def coefficients(self):
+        """ Returns an iterator of the (variable, coefficient) pairs
+        of the expression, without creating Term objects.
+
+        """
+        return self._coeffs.iteritems()
+
     def as_dict(self):
         dct = {
             'type': 'linear_expression',
@@ -323,17 +387,21 @@ class LinearExpression(LinearSymbolic):
         if not isinstance(self, LinearSymbolic):
             self, other = other, self
         if isinstance(other, (float, int, long)):
-            expr = LinearExpression(self.terms, self.constant + float(other))
+            expr = _expression(self._coeffs, self.constant + float(other))
         elif isinstance(other, Term):
-            terms = list(self.terms) + [other]
-            expr = LinearExpression(terms, self.constant)
+            coeffs = self._coeffs.copy()
+            _add_coeff(coeffs, other.var, other.coeff)
+            expr = _expression(coeffs, self.constant)
         elif isinstance(other, ConstraintVariable):
-            terms = list(self.terms) + [Term(other)]
-            expr = LinearExpression(terms, self.constant)
+            coeffs = self._coeffs.copy()
+            _add_coeff(coeffs, other, 1.0)
+            expr = _expression(coeffs, self.constant)
         elif isinstance(other, LinearExpression):
-            terms = list(self.terms) + list(other.terms)
+            coeffs = self._coeffs.copy()
+            for var, coeff in other._coeffs.iteritems():
+                _add_coeff(coeffs, var, coeff)
             const = self.constant + other.constant
-            expr = LinearExpression(terms, const)
+            expr = _expression(coeffs, const)
         else:
             return NotImplemented
         return expr
@@ -342,9 +410,10 @@ class LinearExpression(LinearSymbolic):
         if not isinstance(self, LinearSymbolic):
             self, other = other, self
         if isinstance(other, (float, int, long)):
-            terms = [other * term for term in self.terms]
-            const = self.constant * other
-            res = LinearExpression(terms, const)
+            coeffs = {}
+            for var, coeff in self._coeffs.iteritems():
+                _add_coeff(coeffs, var, coeff * other)
+            res = _expression(coeffs, self.constant * other)
         elif isinstance(other, (Term, ConstraintVariable, LinearExpression)):
             self.nonlinear('[ %s ] * [ %s ]' % (self, other))
         else:
@@ -365,12 +434,16 @@ class LinearExpression(LinearSymbolic):
 
 class LinearConstraint(object):
 
+    __slots__ = ('lhs', 'rhs', 'strength', 'weight')
+
+    #: The constraint operator, which is defined by the subclasses.
+    op = None
+
     def __init__(self, lhs, rhs, strength='required', weight=1.0):
         self.lhs = lhs
         self.rhs = rhs
         self.strength = strength
         self.weight = weight
-        self.op = None
 
     def as_dict(self):
         dct = {
@@ -431,21 +504,21 @@ class LinearConstraint(object):
 
 class LEConstraint(LinearConstraint):
 
-    def __init__(self, lhs, rhs, strength='required', weight=1.0):
-        super(LEConstraint, self).__init__(lhs, rhs, strength, weight)
-        self.op = '<='
+    __slots__ = ()
+
+    op = '<='
 
 
 class GEConstraint(LinearConstraint):
 
-    def __init__(self, lhs, rhs, strength='required', weight=1.0):
-        super(GEConstraint, self).__init__(lhs, rhs, strength, weight)
-        self.op = b'>='
+    __slots__ = ()
+
+    op = '>='
 
 
 class EQConstraint(LinearConstraint):
 
-    def __init__(self, lhs, rhs, strength='required', weight=1.0):
-        super(EQConstraint, self).__init__(lhs, rhs, strength, weight)
-        self.op = b'=='
+    __slots__ = ()
+
+    op = '=='
 
@@ -0,0 +1,458 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" A toolkit independent constraints layout engine.
+
+The HeadlessLayout in this module solves the layout of a Container from
+its snapshot dict, following the same rules as the Qt and Wx container
+implementations. The size hints of the widgets, which are normally
+provided by the toolkit, are supplied by a pluggable callable. This
+makes it possible to compute and test layouts without a gui.
+
+"""
+from collections import deque
+
+from casuarius import weak
+
+from .constraint_encoding import decode_constraints
+from .layout_box import (
+    LayoutBox, contents_constraints, hard_constraints, size_hint_constraints
+)
+from .layout_manager import LayoutManager
+
+
+class SizeHintTable(object):
+    """ A size hint provider which looks up hints by widget class.
+
+    An instance of this class is a callable which accepts the snapshot
+    dict of a widget and returns its size hint. The hint is looked up
+    first by the class name of the widget, then by the names of its
+    base classes in order.
+
+    """
+    def __init__(self, hints=None, default=None):
+        """ Initialize a SizeHintTable.
+
+        Parameters
+        ----------
+        hints : dict, optional
+            A dict mapping class name to either a (width, height) size
+            hint or a callable which accepts the snapshot dict of the
+            widget and returns its size hint.
+
+        default : tuple or callable, optional
+            The size hint to use for a widget which has no entry in
+            the table. The default is None, which means the widget has
+            no size hint.
+
+        """
+        self.hints = dict(hints or {})
+        self.default = default
+
+    def __call__(self, tree):
+        """ Get the size hint for a widget.
+
+        Parameters
+        ----------
+        tree : dict
+            The snapshot dict of the widget.
+
+        Returns
+        -------
+        result : tuple or None
+            The (width, height) size hint for the widget. None, or a
+            hint with a dimension less than zero, means the widget has
+            no size hint.
+
+        """
+        hints = self.hints
+        hint = self.default
+        for name in [tree['class']] + list(tree.get('bases', ())):
+            if name in hints:
+                hint = hints[name]
+                break
+        if callable(hint):
+            hint = hint(tree)
+        return hint
+
+
+def zero_margins(tree):
+    """ The default contents margins provider for containers.
+
+    Parameters
+    ----------
+    tree : dict
+        The snapshot dict of the container.
+
+    Returns
+    -------
+    result : tuple
+        The (top, right, bottom, left) contents margins, which are
+        always zero.
+
+    """
+    return (0, 0, 0, 0)
+
+
+def is_constraints_widget(tree):
+    """ Whether the snapshot dict is for a ConstraintsWidget.
+
+    """
+    if 'layout' not in tree:
+        return False
+    return 'ConstraintsWidget' in [tree['class']] + list(tree['bases'])
+
+
+def is_container(tree):
+    """ Whether the snapshot dict is for a Container.
+
+    """
+    return 'Container' in [tree['class']] + list(tree['bases'])
+
+
+def find_container(tree):
+    """ Find the outermost Container in a snapshot tree.
+
+    Parameters
+    ----------
+    tree : dict
+        The snapshot dict of a widget, such as a Window.
+
+    Returns
+    -------
+    result : dict or None
+        The snapshot dict of the first Container found in a breadth
+        first traversal of the tree, or None.
+
+    """
+    queue = deque([tree])
+    while queue:
+        item = queue.popleft()
+        if is_container(item) and is_constraints_widget(item):
+            return item
+        queue.extend(item.get('children', ()))
+
+
+class HeadlessLayout(object):
+    """ A solver for the layout of a Container snapshot.
+
+    The container and its descendants are laid out by the same rules
+    as a Qt or Wx client. Children of containers which share their
+    layout are solved together with the owner, and containers which
+    do not share their layout are solved separately at the size given
+    to them by their parent.
+
+    """
+    def __init__(self, tree, size_hint=None, contents_margins=None,
+                 cache_size=None, reverse=False):
+        """ Initialize a HeadlessLayout.
+
+        Parameters
+        ----------
+        tree : dict
+            The snapshot dict of a Container, or of a widget such as
+            a Window whose outermost Container is to be laid out.
+
+        size_hint : callable, optional
+            A callable which accepts the snapshot dict of a widget
+            which is not a container, and returns its (width, height)
+            size hint or None. The default is a SizeHintTable with no
+            entries.
+
+        contents_margins : callable, optional
+            A callable which accepts the snapshot dict of a container
+            and returns its (top, right, bottom, left) contents margins.
+            The default is `zero_margins`.
+
+        cache_size : int, optional
+            The size of the solved layout cache of the layout managers.
+            See LayoutManager.
+
+        reverse : bool, optional
+            Whether to add the constraints to the solvers in reverse
+            order. A layout which is fully determined by its constraints
+            solves to the same geometry in either order. The default is
+            False.
+
+        """
+        container = find_container(tree)
+        if container is None:
+            raise ValueError('The snapshot does not contain a Container')
+        self.tree = container
+        self.size_hint = size_hint or SizeHintTable()
+        self.contents_margins = contents_margins or zero_margins
+        self.cache_size = cache_size
+        self.reverse = reverse
+        self._root = _LayoutOwner(container, self)
+
+    def min_size(self):
+        """ Compute the minimum size of the container.
+
+        Returns
+        -------
+        result : (float, float)
+            The minimum size which allows all constraints to be
+            satisfied. A dimension for which the container resist
+            policy is weaker than 'medium' is zero.
+
+        """
+        return self._root.min_size()
+
+    def best_size(self):
+        """ Compute the best size of the container.
+
+        Returns
+        -------
+        result : (float, float)
+            The best size of the container, which is the size hint a
+            client would give the container.
+
+        """
+        return self._root.best_size()
+
+    def max_size(self):
+        """ Compute the maximum size of the container.
+
+        Returns
+        -------
+        result : (float, float)
+            The maximum size which allows all constraints to be
+            satisfied. A dimension which has no maximum is -1.
+
+        """
+        return self._root.max_size()
+
+    def layout_table(self):
+        """ Get the widgets which are laid out by the solver of the
+        container.
+
+        Returns
+        -------
+        result : list
+            The object ids of the constraints widget descendants of the
+            container which do not belong to a nested container with a
+            solver of its own, in the breadth first order of the layout
+            table of a Qt or Wx container.
+
+        """
+        return [object_id for _, object_id, _ in self._root.items]
+
+    def layout_signature(self):
+        """ Get the structure of the layout table of the container.
+
+        Returns
+        -------
+        result : list
+            The class names of the widgets in the layout table, in the
+            same order as `layout_table`.
+
+        """
+        return list(self._root.classes)
+
+    def layout(self, size):
+        """ Solve the layout for the given size of the container.
+
+        Parameters
+        ----------
+        size : (int, int)
+            The (width, height) size of the container.
+
+        Returns
+        -------
+        result : dict
+            A dict mapping the object id of the container and of each
+            of its constraints widget descendants to the solved
+            (x, y, width, height) rect. The rect of a widget is in the
+            coordinates of its parent, and the rect of the container
+            is at the origin.
+
+        """
+        width, height = size
+        rects = {self.tree['object_id']: (0, 0, width, height)}
+        rects.update(self._root.layout(size))
+        return rects
+
+    def layout_batch(self, sizes):
+        """ Solve the layout for each of the given sizes.
+
+        Parameters
+        ----------
+        sizes : iterable
+            An iterable of (width, height) sizes of the container.
+
+        Returns
+        -------
+        result : list
+            The list of rects dicts as returned by `layout`, one for
+            each size.
+
+        """
+        return [self.layout(size) for size in sizes]
+
+
+class _LayoutOwner(object):
+    """ The solver for a container which owns its layout.
+
+    """
+    def __init__(self, tree, engine):
+        self.tree = tree
+        self.engine = engine
+        self.box = LayoutBox(tree['class'], tree['object_id'])
+        self.items = []
+        self.classes = []
+        self.nested = {}
+        self.manager = manager = LayoutManager(engine.cache_size)
+        cns = self._generate_constraints()
+        if engine.reverse:
+            cns.reverse()
+        manager.initialize(cns)
+
+    def _generate_constraints(self):
+        """ Build the layout table and the list of constraints.
+
+        """
+        tree = self.tree
+        box = self.box
+        engine = self.engine
+        owners = {tree['object_id']: box}
+        infos = [tree['layout']['constraints']]
+        cns = hard_constraints(box)
+        cns.extend(self._contents_constraints(tree, box))
+        items = self.items
+        nested = self.nested
+        queue = deque((0, child) for child in tree['children'])
+        running_index = 0
+        while queue:
+            offset_index, item = queue.popleft()
+            if not is_constraints_widget(item):
+                continue
+            object_id = item['object_id']
+            item_box = owners[object_id] = LayoutBox(item['class'], object_id)
+            items.append((offset_index, object_id, item_box))
+            self.classes.append(item['class'])
+            running_index += 1
+            cns.extend(hard_constraints(item_box))
+            layout = item['layout']
+            hint = None
+            if is_container(item):
+                if layout['share_layout']:
+                    infos.append(layout['constraints'])
+                    cns.extend(self._contents_constraints(item, item_box))
+                    for child in item['children']:
+                        queue.append((running_index, child))
+                else:
+                    owner = nested[object_id] = _LayoutOwner(item, engine)
+                    hint = tuple(int(v) for v in owner.best_size())
+            else:
+                hint = engine.size_hint(item)
+                infos.append(layout['constraints'])
+            cns.extend(size_hint_constraints(
+                item_box, hint, layout['hug'], layout['resist']
+            ))
+
+        def variable(owner_id, name):
+            owner = owners.get(owner_id)
+            if owner is None:
+                owner = owners[owner_id] = LayoutBox('_virtual', owner_id)
+            return owner.primitive(name)
+
+        for info in infos:
+            if info:
+                cns.extend(decode_constraints(info, variable))
+        self.owners = owners
+        return cns
+
+    def _contents_constraints(self, tree, box):
+        """ Create the contents constraints for a container.
+
+        """
+        padding = tree['layout']['padding']
+        margins = self.engine.contents_margins(tree)
+        return contents_constraints(box, padding, margins)
+
+    def _solved_rects(self):
+        """ Read the solved rects of the layout table.
+
+        This is called by the layout manager while the solved values
+        are valid.
+
+        """
+        rects = {}
+        offsets = [(0, 0)]
+        push = offsets.append
+        for offset_index, object_id, box in self.items:
+            dx, dy = offsets[offset_index]
+            primitive = box.primitive
+            x = primitive('left').value
+            y = primitive('top').value
+            width = primitive('width').value
+            height = primitive('height').value
+            rects[object_id] = (x - dx, y - dy, width, height)
+            push((x, y))
+        return rects
+
+    def layout(self, size):
+        """ Solve the layout for the given size.
+
+        """
+        solved = []
+        def solve():
+            rects = self._solved_rects()
+            solved.append(rects)
+            return rects
+        primitive = self.box.primitive
+        width = primitive('width')
+        height = primitive('height')
+        self.manager.layout(solve, width, height, size, replay=solved.append)
+        rects = dict(solved[0])
+        for object_id, owner in self.nested.iteritems():
+            _, _, width, height = rects[object_id]
+            rects.update(owner.layout((width, height)))
+        return rects
+
+    def min_size(self):
+        """ Compute the minimum size, following QtContainer.
+
+        """
+        resist_width, resist_height = self.tree['layout']['resist']
+        shrink = ('ignore', 'weak')
+        if resist_width in shrink and resist_height in shrink:
+            return (0, 0)
+        primitive = self.box.primitive
+        width = primitive('width')
+        height = primitive('height')
+        w, h = self.manager.get_min_size(width, height)
+        if resist_width in shrink:
+            w = 0
+        if resist_height in shrink:
+            h = 0
+        return (w, h)
+
+    def best_size(self):
+        """ Compute the best size, following QtContainer.
+
+        """
+        primitive = self.box.primitive
+        width = primitive('width')
+        height = primitive('height')
+        return self.manager.get_min_size(width, height, weak)
+
+    def max_size(self):
+        """ Compute the maximum size, following QtContainer.
+
+        """
+        hug_width, hug_height = self.tree['layout']['hug']
+        expanding = ('ignore', 'weak')
+        if hug_width in expanding and hug_height in expanding:
+            return (-1, -1)
+        primitive = self.box.primitive
+        width = primitive('width')
+        height = primitive('height')
+        w, h = self.manager.get_max_size(width, height)
+        if hug_width in expanding:
+            w = -1
+        if hug_height in expanding:
+            h = -1
+        return (w, h)
+
@@ -0,0 +1,161 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from casuarius import ConstraintVariable
+
+
+class LayoutBox(object):
+    """ A class which encapsulates a layout box using casuarius
+    constraint variables.
+
+    The constraint variables are created on an as-needed basis, this
+    allows Enaml widgets to define new constraints and build layouts
+    with them, without having to specifically update this client code.
+
+    """
+    def __init__(self, name, owner):
+        """ Initialize a LayoutBox.
+
+        Parameters
+        ----------
+        name : str
+            A name to use in the label for the constraint variables in
+            this layout box.
+
+        owner : str
+            The owner id to use in the label for the constraint variables
+            in this layout box.
+
+        """
+        self._name = name
+        self._owner = owner
+        self._primitives = {}
+
+    def primitive(self, name):
+        """ Returns a primitive casuarius constraint variable for the
+        given name.
+
+        Parameters
+        ----------
+        name : str
+            The name of the constraint variable to return.
+
+        """
+        primitives = self._primitives
+        if name in primitives:
+            res = primitives[name]
+        else:
+            label = '{0}|{1}|{2}'.format(self._name, self._owner, name)
+            res = primitives[name] = ConstraintVariable(label)
+        return res
+
+
+def hard_constraints(box):
+    """ Create the constraints which must always be applied to a box.
+
+    Parameters
+    ----------
+    box : LayoutBox
+        The layout box of the widget.
+
+    Returns
+    -------
+    result : list
+        A list of casuarius LinearConstraint instances.
+
+    """
+    primitive = box.primitive
+    return [
+        primitive('left') >= 0,
+        primitive('top') >= 0,
+        primitive('width') >= 0,
+        primitive('height') >= 0,
+    ]
+
+
+def contents_constraints(box, padding, margins):
+    """ Create the contents constraints for a container.
+
+    Parameters
+    ----------
+    box : LayoutBox
+        The layout box of the container.
+
+    padding : tuple
+        The (top, right, bottom, left) user padding of the container.
+
+    margins : tuple
+        The (top, right, bottom, left) contents margins of the
+        container, which are added to the padding.
+
+    Returns
+    -------
+    result : list
+        A list of casuarius LinearConstraint instances.
+
+    """
+    tval, rval, bval, lval = map(sum, zip(padding, margins))
+    primitive = box.primitive
+    top = primitive('top')
+    left = primitive('left')
+    width = primitive('width')
+    height = primitive('height')
+    contents_top = primitive('contents_top')
+    contents_left = primitive('contents_left')
+    contents_right = primitive('contents_right')
+    contents_bottom = primitive('contents_bottom')
+    return [
+        contents_top == (top + tval),
+        contents_left == (left + lval),
+        contents_right == (left + width - rval),
+        contents_bottom == (top + height - bval),
+    ]
+
+
+def size_hint_constraints(box, hint, hug, resist):
+    """ Create the size hint constraints for a widget.
+
+    Parameters
+    ----------
+    box : LayoutBox
+        The layout box of the widget.
+
+    hint : tuple or None
+        The (width, height) size hint of the widget. None, or a hint
+        with a dimension less than zero, means the hint is not valid
+        and no constraints are generated.
+
+    hug : tuple
+        The (width, height) hug strengths of the widget.
+
+    resist : tuple
+        The (width, height) resist strengths of the widget.
+
+    Returns
+    -------
+    result : list
+        A list of casuarius LinearConstraint instances.
+
+    """
+    cns = []
+    if hint is None:
+        return cns
+    width_hint, height_hint = hint
+    if width_hint < 0 or height_hint < 0:
+        return cns
+    push = cns.append
+    primitive = box.primitive
+    width = primitive('width')
+    height = primitive('height')
+    hug_width, hug_height = hug
+    resist_width, resist_height = resist
+    if hug_width != 'ignore':
+        push((width == width_hint) | hug_width)
+    if resist_width != 'ignore':
+        push((width >= width_hint) | resist_width)
+    if hug_height != 'ignore':
+        push((height == height_hint) | hug_height)
+    if resist_height != 'ignore':
+        push((height >= height_hint) | resist_height)
+    return cns
@@ -100,6 +100,11 @@ class DeferredConstraints(object):
         self.default_strength = None
         self.default_weight = None
 
+        # The cache of the last expanded constraints list. It is a tuple
+        # of (key, refs, cn_list) where refs holds the objects whose ids
+        # appear in the key, so that the ids cannot be reused.
+        self._constraints_cache = None
+
     def __or__(self, other):
         """ Set the strength of all of the constraints to a common
         strength.
@@ -141,6 +146,17 @@ class DeferredConstraints(object):
             weighted by any provided strengths and weights.
 
         """
+        # Only the expansion for a component is cached. The nested and
+        # transient helpers which are expanded with a None component
+        # are covered by the cache key of their parent.
+        key = None
+        if component is not None:
+            refs = []
+            key = self.cache_key(component, refs)
+        if key is not None:
+            cache = self._constraints_cache
+            if cache is not None and cache[0] == key:
+                return list(cache[2])
         cn_list = self._get_constraints(component)
         strength = self.default_strength
         if strength is not None:
@@ -148,8 +164,72 @@ class DeferredConstraints(object):
         weight = self.default_weight
         if weight is not None:
             cn_list = [cn | weight for cn in cn_list]
+        if key is not None:
+            self._constraints_cache = (key, refs, cn_list)
+            cn_list = list(cn_list)
         return cn_list
 
+    def cache_key(self, component, refs):
+        """ Compute the key for caching the expanded constraints.
+
+        The key is composed of the identity of the component and of the
+        items returned by `_cache_items()`, the config returned by
+        `_cache_config()`, and the default strength and weight. Nested
+        DeferredConstraints items contribute their own keys.
+
+        Parameters
+        ----------
+        component : Component or None
+            The component that owns this DeferredConstraints.
+
+        refs : list
+            A list to which the objects whose ids are used in the key
+            are appended, in order to keep them alive for as long as
+            the key is in use.
+
+        Returns
+        -------
+        result : tuple or None
+            A hashable key for the expanded constraints, or None if
+            the constraints of the instance cannot be cached.
+
+        """
+        items = self._cache_items()
+        if items is None:
+            return None
+        ids = [id(component)]
+        refs.append(component)
+        for item in items:
+            if isinstance(item, DeferredConstraints):
+                item_key = item.cache_key(None, refs)
+                if item_key is None:
+                    return None
+                ids.append(item_key)
+            else:
+                ids.append(id(item))
+                refs.append(item)
+        config = self._cache_config()
+        return (tuple(ids), config, self.default_strength, self.default_weight)
+
+    def _cache_items(self):
+        """ Returns the sequence of items from which the constraints
+        are generated, or None if the constraints cannot be cached.
+
+        The default implementation returns None. Subclasses whose
+        constraints are fully determined by their items, their config,
+        and the component should reimplement this method and the
+        `_cache_config()` method to enable caching.
+
+        """
+        return None
+
+    def _cache_config(self):
+        """ Returns a hashable tuple of the configuration values which
+        affect the generated constraints.
+
+        """
+        return ()
+
     @abstractmethod
     def _get_constraints(self, component):
         """ Returns a list of LinearConstraint objects.
@@ -252,6 +332,18 @@ class AbutmentHelper(DeferredConstraints):
         items = ', '.join(map(repr, self.items))
         return '{0}({1})'.format(self.orientation, items)
 
+    def _cache_items(self):
+        """ Reimplemented parent class method.
+
+        """
+        return self.items
+
+    def _cache_config(self):
+        """ Reimplemented parent class method.
+
+        """
+        return (self.orientation, self.spacing)
+
     def _get_constraints(self, component):
         """ Abstract method implementation which applies the constraints
         to the given items, after filtering them for None values.
@@ -304,6 +396,18 @@ class AlignmentHelper(DeferredConstraints):
         items = ', '.join(map(repr, self.items))
         return 'align({0!r}, {1})'.format(self.anchor, items)
 
+    def _cache_items(self):
+        """ Reimplemented parent class method.
+
+        """
+        return self.items
+
+    def _cache_config(self):
+        """ Reimplemented parent class method.
+
+        """
+        return (self.anchor, self.spacing)
+
     def _get_constraints(self, component):
         """ Abstract method implementation which applies the constraints
         to the given items, after filtering them for None values.
@@ -412,6 +516,18 @@ class LinearBoxHelper(BoxHelper):
         items = ', '.join(map(repr, self.items))
         return '{0}box({1})'.format(self.orientation[0], items)
 
+    def _cache_items(self):
+        """ Reimplemented parent class method.
+
+        """
+        return self.items
+
+    def _cache_config(self):
+        """ Reimplemented parent class method.
+
+        """
+        return (self.orientation, self.spacing, tuple(self.margins))
+
     def _get_constraints(self, component):
         """ Generate the linear box constraints.
 
@@ -595,6 +711,28 @@ class GridHelper(BoxHelper):
         items = ', '.join(map(repr, self.grid_rows))
         return 'grid({0})'.format(items)
 
+    def _cache_items(self):
+        """ Reimplemented parent class method.
+
+        The items of the grid are flattened with a None marking the
+        end of each row, so that the key reflects the grid shape.
+
+        """
+        items = []
+        for row in self.grid_rows:
+            items.extend(row)
+            items.append(None)
+        return items
+
+    def _cache_config(self):
+        """ Reimplemented parent class method.
+
+        """
+        return (
+            self.row_align, self.col_align, self.row_spacing,
+            self.col_spacing, tuple(self.margins),
+        )
+
     def _get_constraints(self, component):
         """ Generate the grid constraints.
 
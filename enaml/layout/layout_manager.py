@@ -2,7 +2,13 @@
 #  Copyright (c) 2011, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from casuarius import Solver, medium
+from collections import OrderedDict
+import sys
+import time
+
+from casuarius import CassowaryError, ExplainedCassowaryError, Solver, medium
+
+from .layout_stats import constraint_variables
 
 
 class LayoutManager(object):
@@ -10,10 +16,110 @@ class LayoutManager(object):
     of constraints.
 
     """
-    def __init__(self):
+    #: The default maximum number of solved layouts to keep in the
+    #: layout cache. See the `layout` method.
+    cache_size = 32
+
+    #: The number of calls to `get_min_size` and `get_max_size` which
+    #: were answered from the size cache of the current generation.
+    size_hits = 0
+
+    #: The number of calls to `get_min_size` and `get_max_size` which
+    #: required a pass of the solver.
+    size_misses = 0
+
+    def __init__(self, cache_size=None, stats=None):
+        """ Initialize a LayoutManager.
+
+        Parameters
+        ----------
+        cache_size : int, optional
+            The maximum number of solved layouts to cache. If not
+            given, the class default is used. A size of 0 disables
+            the layout cache.
+
+        stats : LayoutStats, optional
+            The collector of layout statistics. If given, the manager
+            keeps track of its constraints and variables, times each
+            of its operations, and records the constraints involved
+            in an unsatisfiable system. The default is None, which
+            disables the instrumentation.
+
+        """
         self._solver = Solver(autosolve=False)
         self._initialized = False
         self._running = False
+        self._generation = 0
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._tracked = OrderedDict()
+        self._var_refs = {}
+        self.stats = stats
+        if cache_size is not None:
+            self.cache_size = cache_size
+
+    @property
+    def generation(self):
+        """ A counter which is incremented each time the constraints
+        of the solver are changed.
+
+        """
+        return self._generation
+
+    def _constraints_changed(self):
+        """ Bump the constraint generation and drop the solved
+        layouts and sizes which belong to the previous generations.
+
+        """
+        self._generation += 1
+        self._cache.clear()
+        self._sizes.clear()
+
+    def _tracked_replace(self, old_cns, new_cns, phase):
+        """ Replace constraints in the solver while keeping track of
+        the constraints and variables for the layout statistics.
+
+        If a constraint cannot be added, the constraints which explain
+        the failure are recorded as a conflict before the error is
+        reraised.
+
+        """
+        solver = self._solver
+        stats = self.stats
+        tracked = self._tracked
+        refs = self._var_refs
+        try:
+            for cn in old_cns:
+                solver.remove_constraint(cn)
+                del tracked[cn]
+                for var in constraint_variables(cn):
+                    count = refs[var] - 1
+                    if count:
+                        refs[var] = count
+                    else:
+                        del refs[var]
+            for cn in new_cns:
+                try:
+                    solver.add_constraint(cn)
+                except CassowaryError as e:
+                    # Explaining the error can clobber the exception
+                    # state, so the traceback is kept for the reraise.
+                    tb = sys.exc_info()[2]
+                    involved = []
+                    if isinstance(e, ExplainedCassowaryError):
+                        involved.extend(
+                            other for other in tracked
+                            if other.explains_exception(e)
+                        )
+                    involved.append(cn)
+                    stats.add_conflict(phase, e, involved)
+                    raise type(e), e, tb
+                tracked[cn] = None
+                for var in constraint_variables(cn):
+                    refs[var] = refs.get(var, 0) + 1
+        finally:
+            stats.constraints = len(tracked)
+            stats.variables = len(refs)
 
     def initialize(self, constraints):
         """ Initialize the solver with the given constraints.
@@ -29,10 +135,17 @@ class LayoutManager(object):
             raise RuntimeError('Solver already initialized')
         solver = self._solver
         solver.autosolve = False
-        for cn in constraints:
-            solver.add_constraint(cn)
-        solver.autosolve = True
+        stats = self.stats
+        if stats is None:
+            for cn in constraints:
+                solver.add_constraint(cn)
+            solver.autosolve = True
+        else:
+            with stats.timer('initialize'):
+                self._tracked_replace((), constraints, 'initialize')
+                solver.autosolve = True
         self._initialized = True
+        self._constraints_changed()
 
     def replace_constraints(self, old_cns, new_cns):
         """ Replace constraints in the solver.
@@ -51,16 +164,30 @@ class LayoutManager(object):
             raise RuntimeError('Solver not yet initialized')
         solver = self._solver
         solver.autosolve = False
-        for cn in old_cns:
-            solver.remove_constraint(cn)
-        for cn in new_cns:
-            solver.add_constraint(cn)
-        solver.autosolve = True
-
-    def layout(self, cb, width, height, size, strength=medium, weight=1.0):
+        stats = self.stats
+        if stats is None:
+            for cn in old_cns:
+                solver.remove_constraint(cn)
+            for cn in new_cns:
+                solver.add_constraint(cn)
+            solver.autosolve = True
+        else:
+            with stats.timer('replace'):
+                self._tracked_replace(old_cns, new_cns, 'replace')
+                solver.autosolve = True
+        self._constraints_changed()
+
+    def layout(self, cb, width, height, size, strength=medium, weight=1.0,
+               replay=None):
         """ Perform an iteration of the solver for the new width and
         height constraint variables.
 
+        If a `replay` callable is given, the solved layouts are kept in
+        a bounded LRU cache keyed on the size, strength, weight, and
+        constraint generation. On a cache hit the solver is not run;
+        instead, the value returned by `cb` for that key is passed to
+        `replay`.
+
         Parameters
         ----------
         cb : callable
@@ -68,7 +195,8 @@ class LayoutManager(object):
             solver are available. This will be called from within a
             solver context while the solved values are valid. Thus
             the new values should be consumed before the callback
-            returns.
+            returns. If the callback returns None, the layout is not
+            cached.
 
         width : Constraint Variable
             The constraint variable representing the width of the
@@ -90,6 +218,11 @@ class LayoutManager(object):
         weight : float, optional
             The weight to apply to the strength. The default is 1.0
 
+        replay : callable, optional
+            A callable which accepts a value returned by `cb` for an
+            earlier layout and reapplies it. If not given, the layout
+            cache is not used.
+
         """
         if not self._initialized:
             raise RuntimeError('Layout with uninitialized solver')
@@ -97,10 +230,37 @@ class LayoutManager(object):
             return
         try:
             self._running = True
+            stats = self.stats
+            if stats is not None:
+                start = time.time()
             w, h = size
+            cached = replay is not None and self.cache_size > 0
+            if cached:
+                cache = self._cache
+                key = (w, h, strength, weight, self._generation)
+                result = cache.pop(key, None)
+                if result is not None:
+                    # Re-insert the hit to mark it most recently used.
+                    cache[key] = result
+                    replay(result)
+                    if stats is not None:
+                        stats.add_time('replay', time.time() - start)
+                    return
             values = [(width, w), (height, h)]
-            with self._solver.suggest_values(values, strength, weight):
-                cb()
+            if stats is None:
+                with self._solver.suggest_values(values, strength, weight):
+                    result = cb()
+            else:
+                # The time spent in the callback is not solver time.
+                with self._solver.suggest_values(values, strength, weight):
+                    cb_start = time.time()
+                    result = cb()
+                    cb_time = time.time() - cb_start
+                stats.add_time('solve', time.time() - start - cb_time)
+            if cached and result is not None:
+                cache[key] = result
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
         finally:
             self._running = False
 
@@ -110,6 +270,9 @@ class LayoutManager(object):
         compute the minimum size that the window can be to solve the
         system.
 
+        The result is cached until the constraints of the solver are
+        changed by `initialize` or `replace_constraints`.
+
         Parameters
         ----------
         width : Constraint Variable
@@ -139,11 +302,23 @@ class LayoutManager(object):
         """
         if not self._initialized:
             raise RuntimeError('Get min size on uninitialized solver')
+        key = ('min', width, height, strength, weight)
+        sizes = self._sizes
+        if key in sizes:
+            self.size_hits += 1
+            return sizes[key]
+        self.size_misses += 1
+        stats = self.stats
+        if stats is not None:
+            start = time.time()
         values = [(width, 0.0), (height, 0.0)]
         with self._solver.suggest_values(values, strength, weight):
             min_width = width.value
             min_height = height.value
-        return (min_width, min_height)
+        if stats is not None:
+            stats.add_time('min_size', time.time() - start)
+        res = sizes[key] = (min_width, min_height)
+        return res
 
     def get_max_size(self, width, height, strength=medium, weight=0.1):
         """ Run an iteration of the solver with the suggested size of
@@ -153,6 +328,9 @@ class LayoutManager(object):
         If one of the numbers is -1, it indicates there is no maximum in
         that direction.
 
+        The result is cached until the constraints of the solver are
+        changed by `initialize` or `replace_constraints`.
+
         Parameters
         ----------
         width : Constraint Variable
@@ -182,6 +360,15 @@ class LayoutManager(object):
         """
         if not self._initialized:
             raise RuntimeError('Get max size on uninitialized solver')
+        key = ('max', width, height, strength, weight)
+        sizes = self._sizes
+        if key in sizes:
+            self.size_hits += 1
+            return sizes[key]
+        self.size_misses += 1
+        stats = self.stats
+        if stats is not None:
+            start = time.time()
         max_val = 2**24 - 1 # Arbitrary, but the max allowed by Qt.
         values = [(width, max_val), (height, max_val)]
         with self._solver.suggest_values(values, strength, weight):
@@ -193,5 +380,8 @@ class LayoutManager(object):
             max_width = -1
         if height_diff <= 1:
             max_height = -1
-        return (max_width, max_height)
+        if stats is not None:
+            stats.add_time('max_size', time.time() - start)
+        res = sizes[key] = (max_width, max_height)
+        return res
 
@@ -0,0 +1,229 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Opt-in instrumentation for the constraints layout system.
+
+A LayoutStats instance is given to a LayoutManager or a constraints
+widget to collect the number of constraints and variables in a layout,
+the time spent in each phase of the layout, counts such as the number
+of widgets moved by each layout pass, and the constraints which are
+involved in an unsatisfiable system. The results are available as
+a structured report, and can be written to the 'enaml.layout.stats'
+logger.
+
+"""
+from contextlib import contextmanager
+import logging
+import time
+
+from casuarius import ConstraintVariable, LinearExpression, Term
+
+
+logger = logging.getLogger(__name__)
+
+
+def constraint_variables(cn):
+    """ Get the variables which are referenced by a casuarius
+    constraint.
+
+    Parameters
+    ----------
+    cn : LinearConstraint
+        The casuarius constraint of interest.
+
+    Returns
+    -------
+    result : list
+        The list of casuarius ConstraintVariable instances in the
+        constraint, which may contain duplicates.
+
+    """
+    res = []
+    for side in (cn.lhs, cn.rhs):
+        if isinstance(side, ConstraintVariable):
+            res.append(side)
+        elif isinstance(side, Term):
+            res.append(side.var)
+        elif isinstance(side, LinearExpression):
+            res.extend(term.var for term in side.terms)
+    return res
+
+
+class LayoutStats(object):
+    """ A collector of statistics for a layout.
+
+    """
+    def __init__(self, name=''):
+        """ Initialize a LayoutStats.
+
+        Parameters
+        ----------
+        name : str, optional
+            A name which identifies the layout in the report, such as
+            the class name and object id of a container.
+
+        """
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        """ Reset the collected statistics.
+
+        """
+        self.constraints = 0
+        self.variables = 0
+        self.timings = {}
+        self.counts = {}
+        self.conflicts = []
+
+    def add_time(self, phase, elapsed):
+        """ Record the time spent in a phase of the layout.
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase, such as 'solve' or 'geometry'.
+
+        elapsed : float
+            The time spent in the phase, in seconds.
+
+        """
+        timing = self.timings.get(phase)
+        if timing is None:
+            self.timings[phase] = [1, elapsed, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+
+    def add_count(self, counter, value):
+        """ Record a value of a per pass counter.
+
+        Parameters
+        ----------
+        counter : str
+            The name of the counter, such as 'moved'.
+
+        value : int
+            The value of the counter for the pass.
+
+        """
+        count = self.counts.get(counter)
+        if count is None:
+            self.counts[counter] = [1, value, value]
+        else:
+            count[0] += 1
+            count[1] += value
+            if value > count[2]:
+                count[2] = value
+
+    @contextmanager
+    def timer(self, phase):
+        """ A context manager which records the time spent in its
+        body for the given phase.
+
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.time() - start)
+
+    def add_conflict(self, phase, error, constraints):
+        """ Record an unsatisfiable system of constraints.
+
+        The conflict is also logged as a warning.
+
+        Parameters
+        ----------
+        phase : str
+            The phase of the layout in which the error was raised.
+
+        error : Exception
+            The error raised by the solver.
+
+        constraints : list
+            The constraints which are involved in the conflict.
+
+        """
+        conflict = {
+            'phase': phase,
+            'error': str(error),
+            'constraints': [repr(cn) for cn in constraints],
+        }
+        self.conflicts.append(conflict)
+        lines = ['Unsatisfiable constraints in %s %s:' % (self.name, phase)]
+        lines.extend('    ' + cn for cn in conflict['constraints'])
+        logger.warn('\n'.join(lines))
+
+    def report(self):
+        """ Create a structured report of the collected statistics.
+
+        Returns
+        -------
+        result : dict
+            A dict with the 'name', the current number of 'constraints'
+            and 'variables', the 'timings' of each phase as a dict with
+            the 'calls', and the 'total', 'mean', and 'max' time in
+            seconds, the 'counts' of each counter as a dict with the
+            'passes', and the 'total', 'mean', and 'max' value, and the
+            list of 'conflicts'.
+
+        """
+        timings = {}
+        for phase, (calls, total, max_time) in self.timings.iteritems():
+            timings[phase] = {
+                'calls': calls,
+                'total': total,
+                'mean': total / calls,
+                'max': max_time,
+            }
+        counts = {}
+        for counter, (passes, total, max_value) in self.counts.iteritems():
+            counts[counter] = {
+                'passes': passes,
+                'total': total,
+                'mean': float(total) / passes,
+                'max': max_value,
+            }
+        report = {
+            'name': self.name,
+            'constraints': self.constraints,
+            'variables': self.variables,
+            'timings': timings,
+            'counts': counts,
+            'conflicts': list(self.conflicts),
+        }
+        return report
+
+    def log(self, level=logging.INFO):
+        """ Write the report to the 'enaml.layout.stats' logger.
+
+        Parameters
+        ----------
+        level : int, optional
+            The logging level of the message. The default is INFO.
+
+        """
+        if not logger.isEnabledFor(level):
+            return
+        lines = ['Layout stats for %s: %d constraints, %d variables' % (
+            self.name, self.constraints, self.variables)]
+        for phase, timing in sorted(self.report()['timings'].iteritems()):
+            lines.append(
+                '    %-10s %6d calls %10.3f ms total %10.3f ms max' % (
+                    phase, timing['calls'], timing['total'] * 1e3,
+                    timing['max'] * 1e3,
+                )
+            )
+        for counter, count in sorted(self.report()['counts'].iteritems()):
+            lines.append(
+                '    %-10s %6d passes %10.1f mean %10d max' % (
+                    counter, count['passes'], count['mean'], count['max'],
+                )
+            )
+        if self.conflicts:
+            lines.append('    %d conflicts' % len(self.conflicts))
+        logger.log(level, '\n'.join(lines))
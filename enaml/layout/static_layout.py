@@ -0,0 +1,313 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Precomputed layouts for containers whose constraints never change.
+
+The solved geometry of the widgets in a container with fixed constraints
+is a piecewise linear function of the size of the container. The
+`export_static_layout` function samples that function with a
+HeadlessLayout and exports it as a table of breakpoints. A client can
+evaluate the table with a StaticLayout, instead of building a solver
+for the container.
+
+The exported layout is a dict with the following keys:
+
+'count'
+    The number of widgets in the layout table of the container. A
+    client only uses the layout if its own layout table matches.
+
+'signature'
+    The class names of the widgets in the layout table, in order. The
+    Container only sends the layout to the client if the structure of
+    its widgets still matches.
+
+'min_size', 'best_size', 'max_size'
+    The (width, height) sizes of the container, as computed by the
+    HeadlessLayout.
+
+'width'
+    The table of the horizontal geometry. This is a dict with the
+    sorted list of container widths in 'breaks', and in 'values' one
+    flat list of [x, width, x, width, ...] per break, in the order of
+    the layout table of the container.
+
+'height'
+    The table of the vertical geometry, which is the same as 'width'
+    for the container heights and [y, height, y, height, ...] values.
+
+The horizontal geometry of the widgets must depend only on the width
+of the container, and the vertical geometry only on its height. This
+holds for layouts built with the box and grid helpers, but not for
+constraints which relate widths and heights, such as a fixed aspect
+ratio. Such a layout cannot be exported. Neither can a layout whose
+constraints leave the geometry of a widget under-determined, since the
+solver of a client may choose a different one of the valid solutions.
+
+"""
+from array import array
+from bisect import bisect_right
+from itertools import izip
+import math
+
+from .headless_layout import HeadlessLayout
+
+
+class StaticLayout(object):
+    """ An evaluator for an exported static layout.
+
+    """
+    def __init__(self, info):
+        """ Initialize a StaticLayout.
+
+        Parameters
+        ----------
+        info : dict
+            The static layout created by `export_static_layout`.
+
+        """
+        self.count = info['count']
+        self.min_size = tuple(info['min_size'])
+        self.best_size = tuple(info['best_size'])
+        self.max_size = tuple(info['max_size'])
+        self._width = _Table(info['width'])
+        self._height = _Table(info['height'])
+
+    def geometry(self, width, height):
+        """ Compute the geometry of the widgets for a container size.
+
+        Sizes outside of the sampled range are extrapolated from the
+        nearest segment of the table.
+
+        Parameters
+        ----------
+        width : float
+            The width of the container.
+
+        height : float
+            The height of the container.
+
+        Returns
+        -------
+        result : array
+            The flat array of (x, y, width, height) geometries of the
+            widgets, in the order of the layout table. The geometry of
+            a widget is in the coordinates of its parent.
+
+        """
+        horizontal = self._width.evaluate(width)
+        vertical = self._height.evaluate(height)
+        rects = array('d', [0.0]) * (4 * self.count)
+        rects[0::4] = horizontal[0::2]
+        rects[2::4] = horizontal[1::2]
+        rects[1::4] = vertical[0::2]
+        rects[3::4] = vertical[1::2]
+        return rects
+
+
+class _Table(object):
+    """ A piecewise linear function of one variable.
+
+    """
+    def __init__(self, info):
+        self.breaks = list(info['breaks'])
+        self.values = [array('d', values) for values in info['values']]
+
+    def evaluate(self, size):
+        """ Evaluate the table as an array of values.
+
+        """
+        breaks = self.breaks
+        values = self.values
+        if len(breaks) == 1:
+            return values[0]
+        index = bisect_right(breaks, size) - 1
+        index = min(max(index, 0), len(breaks) - 2)
+        start = breaks[index]
+        if size == start:
+            return values[index]
+        t = float(size - start) / (breaks[index + 1] - start)
+        return array('d', [
+            a + (b - a) * t for a, b in izip(values[index], values[index + 1])
+        ])
+
+
+def _max_error(first, last, middle, t):
+    """ The largest difference between the values of a sample and the
+    values interpolated at t between two other samples.
+
+    """
+    return max(
+        abs(a + (b - a) * t - m) for a, b, m in izip(first, last, middle)
+    ) if middle else 0.0
+
+
+def _fit(sample, lo, hi, step, tolerance):
+    """ Fit a piecewise linear table to a sampled function.
+
+    The function is sampled at a regular step, and each interval whose
+    midpoint is not within the tolerance of the interpolated value is
+    bisected, down to single units. The breaks which are within the
+    tolerance of the line between their neighbours are then removed.
+
+    """
+    samples = {}
+    def get(size):
+        res = samples.get(size)
+        if res is None:
+            res = samples[size] = sample(size)
+        return res
+
+    get(lo)
+    points = range(lo, hi, step) + [hi]
+    intervals = zip(points[:-1], points[1:])
+    while intervals:
+        a, b = intervals.pop()
+        first = get(a)
+        last = get(b)
+        if b - a < 2:
+            continue
+        m = (a + b) // 2
+        t = float(m - a) / (b - a)
+        if _max_error(first, last, get(m), t) > tolerance:
+            intervals.append((a, m))
+            intervals.append((m, b))
+
+    breaks = sorted(samples)
+    keep = [breaks[0]]
+    dropped = []
+    for idx in xrange(1, len(breaks) - 1):
+        prev = keep[-1]
+        nxt = breaks[idx + 1]
+        first = samples[prev]
+        last = samples[nxt]
+        span = float(nxt - prev)
+        for size in dropped + [breaks[idx]]:
+            t = (size - prev) / span
+            if _max_error(first, last, samples[size], t) > tolerance:
+                keep.append(breaks[idx])
+                dropped = []
+                break
+        else:
+            dropped.append(breaks[idx])
+    if len(breaks) > 1:
+        keep.append(breaks[-1])
+    return {'breaks': keep, 'values': [list(samples[b]) for b in keep]}
+
+
+def export_static_layout(tree, size_hint=None, contents_margins=None,
+                         extent=2048, step=16, tolerance=0.5):
+    """ Export the layout of a container as a static layout.
+
+    Parameters
+    ----------
+    tree : dict
+        The snapshot dict of a Container, or of a widget such as a
+        Window whose outermost Container is to be exported.
+
+    size_hint : callable, optional
+        The size hint provider for the widgets. See HeadlessLayout.
+        The hints should match the ones of the client toolkit.
+
+    contents_margins : callable, optional
+        The contents margins provider for the containers. See
+        HeadlessLayout.
+
+    extent : int, optional
+        The range of sizes above the minimum size which is sampled in
+        a dimension in which the container has no maximum size. The
+        default is 2048.
+
+    step : int, optional
+        The initial sampling step, in pixels. The default is 16.
+
+    tolerance : float, optional
+        The largest allowed error of the interpolated geometry, in
+        pixels. The default is 0.5.
+
+    Returns
+    -------
+    result : dict
+        The static layout, which is JSON serializable. It can be given
+        to the `static_layout` attribute of the Container.
+
+    Raises
+    ------
+    ValueError
+        If the snapshot does not contain a Container, if the geometry
+        of the container is under-determined by its constraints, or if
+        it is not separable into horizontal and vertical geometry.
+
+    """
+    engine = HeadlessLayout(tree, size_hint, contents_margins)
+    reverse = HeadlessLayout(tree, size_hint, contents_margins, reverse=True)
+    ids = engine.layout_table()
+    min_width, min_height = engine.min_size()
+    max_width, max_height = engine.max_size()
+    lo_width = int(math.ceil(min_width))
+    lo_height = int(math.ceil(min_height))
+    if max_width < 0:
+        hi_width = lo_width + extent
+    else:
+        hi_width = max(lo_width, int(max_width))
+    if max_height < 0:
+        hi_height = lo_height + extent
+    else:
+        hi_height = max(lo_height, int(max_height))
+
+    def horizontal(width):
+        rects = engine.layout((width, lo_height))
+        res = []
+        for object_id in ids:
+            x, y, w, h = rects[object_id]
+            res.extend((x, w))
+        return res
+
+    def vertical(height):
+        rects = engine.layout((lo_width, height))
+        res = []
+        for object_id in ids:
+            x, y, w, h = rects[object_id]
+            res.extend((y, h))
+        return res
+
+    info = {
+        'count': len(ids),
+        'signature': engine.layout_signature(),
+        'min_size': engine.min_size(),
+        'best_size': engine.best_size(),
+        'max_size': (max_width, max_height),
+        'width': _fit(horizontal, lo_width, hi_width, step, tolerance),
+        'height': _fit(vertical, lo_height, hi_height, step, tolerance),
+    }
+
+    # The tables are sampled along each dimension with the other one
+    # held at its minimum. Check the combinations of a few sizes to
+    # verify that the dimensions are in fact independent. The layout
+    # is also solved with the constraints in reverse order. If that
+    # yields a different geometry, the constraints do not determine
+    # a unique solution.
+    static = StaticLayout(info)
+    widths = sorted(set([lo_width, (lo_width + hi_width) // 2, hi_width]))
+    heights = sorted(set([lo_height, (lo_height + hi_height) // 2, hi_height]))
+    for width in widths:
+        for height in heights:
+            rects = engine.layout((width, height))
+            reversed_rects = reverse.layout((width, height))
+            expected = array('d')
+            for object_id in ids:
+                expected.extend(rects[object_id])
+                other = reversed_rects[object_id]
+                if any(abs(a - b) > tolerance
+                       for a, b in izip(rects[object_id], other)):
+                    msg = ('The geometry of the container is not fully '
+                           'determined by its constraints, and cannot be '
+                           'exported as a static layout.')
+                    raise ValueError(msg)
+            geometry = static.geometry(width, height)
+            if any(abs(a - b) > tolerance for a, b in izip(expected, geometry)):
+                msg = ('The layout of the container is not separable into '
+                       'horizontal and vertical geometry, and cannot be '
+                       'exported as a static layout.')
+                raise ValueError(msg)
+    return info
@@ -27,4 +27,17 @@ class AbstractImage(object):
 
         """
         raise NotImplementedError
-    
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def as_binary(self):
+        """ Return the image as a JSON-serializable dict and a list of
+        buffers holding the raw image data.
+
+        The buffers can be sent on the binary channel of a socket, which
+        avoids the cost of base64 encoding the data. The default
+        implementation returns the result of `as_dict` and no buffers.
+
+        """
+        return self.as_dict(), []
@@ -40,6 +40,18 @@ class ImageFromArray(AbstractImage):
         }
         return img_dict
 
+    def as_binary(self):
+        """ Return the image metadata as a JSON-serializable dict and
+        the image data, by reference, as the only buffer.
+
+        """
+        img_dict = {
+            'format' : self._format,
+            'size' : self._size,
+            'color_table' : self._color_table
+        }
+        return img_dict, [self._data]
+
     @staticmethod
     def from_dict(image_dict):
         """ Receive a JSON representation of an image and convert it into the
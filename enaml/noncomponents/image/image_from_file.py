@@ -34,6 +34,17 @@ class ImageFromFile(AbstractImage):
         }
         return image_dict
 
+    def as_binary(self):
+        """ Return the image metadata as a JSON-serializable dict and
+        the raw file data as the only buffer.
+
+        """
+        image_dict = {
+            'format' : 'raw_file',
+            'size' : (-1, -1)
+        }
+        return image_dict, [self._data]
+
     @staticmethod
     def from_dict(image_dict):
         """ Receive a JSON representation of an image and convert it into the
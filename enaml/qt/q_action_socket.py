@@ -63,6 +63,31 @@ class QActionSocket(QObject):
         """
         self.messagePosted.emit(object_id, action, content)
 
+    def send_binary(self, object_id, action, content, buffers):
+        """ Send the action and binary data to any attached listeners.
+
+        The buffers are passed by reference in the 'buffers' key of
+        a copy of the content dict. They are not copied or encoded.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        buffers : list
+            The list of buffer objects to send with the action.
+
+        """
+        content = dict(content)
+        content['buffers'] = list(buffers)
+        self.messagePosted.emit(object_id, action, content)
+
     def receive(self, object_id, action, content):
         """ Receive a message sent to the socket.
 
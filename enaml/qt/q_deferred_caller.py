@@ -2,6 +2,8 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+from enaml.deferred_queue import DeferredQueue
+
 from .qt.QtCore import QObject, QTimer, Qt, Signal
 from .qt.QtGui import QApplication
 
@@ -10,8 +12,12 @@ class QDeferredCaller(QObject):
     """ A QObject subclass which facilitates executing callbacks on the
     main application thread.
 
+    Deferred calls are appended to a DeferredQueue, and a queued wake
+    up signal is only emitted when the queue becomes non-empty. The
+    handler of the signal then runs all of the queued callbacks.
+
     """
-    _posted = Signal(object)
+    _wake = Signal()
 
     def __init__(self):
         """ Initialize a QDeferredCaller.
@@ -21,18 +27,19 @@ class QDeferredCaller(QObject):
         app = QApplication.instance()
         if app is not None:
             self.moveToThread(app.thread())
-        self._posted.connect(self._onPosted, Qt.QueuedConnection)
+        self._queue = DeferredQueue(self._wake.emit)
+        self._wake.connect(self._onWake, Qt.QueuedConnection)
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
-    def _onPosted(self, callback):
-        """ A private signal handler for the '_callbackPosted' signal.
+    def _onWake(self):
+        """ A private signal handler for the '_wake' signal.
 
-        This handler simply executes the callback.
+        This handler runs the callbacks in the deferred queue.
 
         """
-        callback()
+        self._queue.drain()
 
     #--------------------------------------------------------------------------
     # Public API
@@ -50,8 +57,7 @@ class QDeferredCaller(QObject):
             the callback.
 
         """
-        f = lambda: callback(*args, **kwargs)
-        self._posted.emit(f)
+        self._queue.post(callback, args, kwargs)
 
     def timedCall(self, ms, callback, *args, **kwargs):
         """ Execute a callback on a timer in the main gui thread.
@@ -71,6 +77,5 @@ class QDeferredCaller(QObject):
 
         """
         f = lambda: callback(*args, **kwargs)
-        f2 = lambda: QTimer.singleShot(ms, f)
-        self._posted.emit(f2)
+        self._queue.post(QTimer.singleShot, (ms, f), {})
 
@@ -2,103 +2,63 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+from array import array
 from collections import deque
+import os
+import time
 
 from casuarius import weak
+from enaml.layout.constraint_encoding import (
+    constraint_keys, decode_constraints
+)
+from enaml.layout.layout_box import LayoutBox, contents_constraints
 from enaml.layout.layout_manager import LayoutManager
+from enaml.layout.layout_stats import LayoutStats
+from enaml.layout.static_layout import StaticLayout
 
-from .qt.QtCore import QSize, Signal
+from .qt.QtCore import QSize, QEvent, QCoreApplication, Signal
 from .qt.QtGui import QFrame
-from .qt_constraints_widget import QtConstraintsWidget, LayoutBox
-
-
-def _convert_cn_info(info, owners):
-    """ Converts the lhs or rhs of a linear constraint info dict into
-    its corresponding casuarius object.
-
-    """
-    cn_type = info['type']
-    if cn_type == 'linear_expression':
-        const = info['constant']
-        terms = info['terms']
-        convert = _convert_cn_info
-        res = sum(convert(t, owners) for t in terms) + const
-    elif cn_type == 'term':
-        coeff = info['coeff']
-        var = info['var']
-        res = coeff * _convert_cn_info(var, owners)
-    elif cn_type == 'linear_symbolic':
-        sym_name = info['name']
-        owner_id = info['owner']
-        owner = owners.get(owner_id, None)
-        if owner is None:
-            owner = owners[owner_id] = LayoutBox('_virtual', owner_id)
-        res = owner.primitive(sym_name)
-    else:
-        msg = 'Unhandled constraint info type `%s`' % cn_type
-        raise ValueError(msg)
-    return res
-
-
-def as_linear_constraint(info, owners):
-    """ Converts a constraint info dict into a casuarius linear
-    constraint.
-
-    For constraints specified in the info dict which do not have a
-    corresponding owner (e.g. those created by box helpers) a
-    constraint variable will be synthesized.
-
-    Parameters
-    ----------
-    info : dict
-        A dictionary sent from an Enaml widget which specifies the
-        information for a linear constraint.
-
-    owners : dict
-        A mapping from constraint id to an owner object which holds
-        the actual casuarius constraint variables as attributes.
-
-    Returns
-    -------
-    result : LinearConstraint
-        A casuarius linear constraint for the given dict.
-
-    """
-    if info['type'] != 'linear_constraint':
-        msg = 'The info dict does not specify a linear constraint.'
-        raise ValueError(msg)
-    convert = _convert_cn_info
-    lhs = convert(info['lhs'], owners)
-    rhs = convert(info['rhs'], owners)
-    op = info['op']
-    if op == '==':
-        cn = lhs == rhs
-    elif op == '<=':
-        cn = lhs <= rhs
-    elif op == '>=':
-        cn = lhs >= rhs
-    else:
-        msg = 'Unhandled constraint operator `%s`' % op
-        raise ValueError(msg)
-    return cn | info['strength'] | info['weight']
+from .qt_constraints_widget import QtConstraintsWidget
 
 
 class QContainer(QFrame):
     """ A subclass of QFrame which behaves as a container.
 
     """
-    #: A signal which is emitted on a resize event.
+    #: A signal which is emitted after the widget has been resized.
     resized = Signal()
 
     #: The internally cached size hint.
     _size_hint = QSize()
 
+    #: Whether a resize has occurred which has not yet been signaled.
+    _resize_pending = False
+
     def resizeEvent(self, event):
-        """ Converts a resize event into a signal.
+        """ Converts a resize event into a deferred signal.
+
+        A window drag produces many resize events between paints. The
+        first of them posts a LayoutRequest event, which is compressed
+        by Qt, so the `resized` signal is emitted once for the final
+        size before the next paint.
 
         """
         super(QContainer, self).resizeEvent(event)
-        self.resized.emit()
+        if not self._resize_pending:
+            self._resize_pending = True
+            QCoreApplication.postEvent(self, QEvent(QEvent.LayoutRequest))
+
+    def event(self, event):
+        """ A custom event handler which handles LayoutRequest events.
+
+        If a resize is pending, the `resized` signal is emitted.
+
+        """
+        res = super(QContainer, self).event(event)
+        if event.type() == QEvent.LayoutRequest and self._resize_pending:
+            self._resize_pending = False
+            self.resized.emit()
+        return res
 
     def sizeHint(self):
         """ Returns the previously set size hint. If that size hint is
@@ -159,15 +119,43 @@ class QtContainer(QtConstraintsWidget):
     #: The table of (index, updater) pairs to use during a layout pass.
     _layout_table = []
 
+    #: A flat array of the integer (x, y, width, height) geometries
+    #: which were last applied to the widgets in the layout table, in
+    #: table order.
+    _layout_rects = array('l')
+
+    #: The number of widgets whose geometry was changed by the last
+    #: layout pass.
+    moved_count = 0
+
     #: A dict mapping constraint owner id to associated LayoutBox
     _cn_owners = {}
 
+    #: A dict mapping constraint key to the casuarius constraint which
+    #: is currently in the layout manager. See _generate_constraints.
+    _cn_map = {}
+
     #: A list of the current contents constraints for the widget.
     _contents_cns = []
 
+    #: Whether containers which own their layout collect statistics
+    #: about it. This is enabled by the ENAML_LAYOUT_STATS environment
+    #: variable. See the `layout_stats` method.
+    collect_layout_stats = bool(os.environ.get('ENAML_LAYOUT_STATS'))
+
+    #: The LayoutStats for the layout, if it is being collected.
+    _layout_stats = None
+
     #: A list of the current size hint constraints for the widget.
     _size_hint_cns = []
 
+    #: The precomputed static layout sent by the Enaml widget, if any.
+    _static_info = None
+
+    #: The StaticLayout which is used instead of a layout manager. It
+    #: is only used if it matches the layout table of the container.
+    _static_layout = None
+
     #--------------------------------------------------------------------------
     # Setup Methods
     #--------------------------------------------------------------------------
@@ -185,6 +173,7 @@ class QtContainer(QtConstraintsWidget):
         layout = tree['layout']
         self._share_layout = layout['share_layout']
         self._padding = layout['padding']
+        self._static_info = layout.get('static_layout')
         # The resized signal is connected directly to the refresh
         # method to save the overhead of the extra function call.
         self.widget().resized.connect(self.refresh)
@@ -200,18 +189,45 @@ class QtContainer(QtConstraintsWidget):
         # transfer ownership at some point.
         if not self.will_transfer():
             offset_table, layout_table = self._build_layout_table()
-            cns = self._generate_constraints(layout_table)
+            static = self._static_info
+            if static is not None and static['count'] == len(layout_table):
+                static = StaticLayout(static)
+                self._init_static_layout(static, offset_table, layout_table)
+                return
+            self._static_layout = None
+            stats = None
+            if self.collect_layout_stats:
+                name = '%s %s' % (type(self).__name__, self.object_id())
+                stats = LayoutStats(name)
+            self._layout_stats = stats
+            if stats is None:
+                cn_items = self._generate_constraints(layout_table)
+            else:
+                with stats.timer('generate'):
+                    cn_items = self._generate_constraints(layout_table)
             # Initializing the layout manager can fail if the objective
             # function is unbounded. We let that failure occur so it can
             # be logged. Nothing is stored until it succeeds.
-            manager = LayoutManager()
-            manager.initialize(cns)
+            manager = LayoutManager(stats=stats)
+            manager.initialize(cn for _, cn in cn_items)
+            self._cn_map = dict(cn_items)
             self._offset_table = offset_table
             self._layout_table = layout_table
+            self._layout_rects = self._empty_rects(len(layout_table))
             self._layout_manager = manager
             self._refresh = self._build_refresher(manager)
             self.refresh_sizes()
 
+    #--------------------------------------------------------------------------
+    # Message Handlers
+    #--------------------------------------------------------------------------
+    def on_action_relayout(self, content):
+        """ Handle the 'relayout' action from the Enaml widget.
+
+        """
+        self._static_info = content.get('static_layout')
+        super(QtContainer, self).on_action_relayout(content)
+
     #--------------------------------------------------------------------------
     # Public Layout Handling
     #--------------------------------------------------------------------------
@@ -223,7 +239,8 @@ class QtContainer(QtConstraintsWidget):
         if self._owns_layout:
             item = self.widget_item()
             old_hint = item.sizeHint()
-            self.init_layout()
+            if not self._update_layout():
+                self.init_layout()
             self.refresh()
             new_hint = item.sizeHint()
             # If the size hint constraints are empty, it indicates that
@@ -281,6 +298,7 @@ class QtContainer(QtConstraintsWidget):
                 item = self.widget_item()
                 old_hint = item.sizeHint()
                 manager.replace_constraints(old_cns, new_cns)
+                self._update_constraint_map(old_cns, new_cns)
                 self.refresh_sizes()
                 self.refresh()
                 new_hint = item.sizeHint()
@@ -303,6 +321,7 @@ class QtContainer(QtConstraintsWidget):
             manager = self._layout_manager
             if manager is not None:
                 manager.replace_constraints(cns, [])
+                self._update_constraint_map(cns, [])
         else:
             self._layout_owner.clear_constraints(cns)
 
@@ -311,7 +330,15 @@ class QtContainer(QtConstraintsWidget):
         new layout values available.
 
         This iterates over the layout table and calls the geometry
-        updater functions.
+        updater functions to compute the new geometries, which are
+        then applied by `replay_layout`.
+
+        Returns
+        -------
+        result : array
+            The flat array of (x, y, width, height) geometries, in the
+            order of the layout table. This is cached by the layout
+            manager and passed to `replay_layout` for a repeated size.
 
         """
         # We explicitly don't use enumerate() to generate the running
@@ -320,12 +347,63 @@ class QtContainer(QtConstraintsWidget):
         # resize event is micro optimized and justified with profiling.
         offset_table = self._offset_table
         layout_table = self._layout_table
+        rects = array('d')
+        push = rects.extend
         running_index = 1
         for offset_index, updater in layout_table:
             dx, dy = offset_table[offset_index]
-            new_offset = updater(dx, dy)
-            offset_table[running_index] = new_offset
+            nx, ny, geo = updater(dx, dy)
+            offset_table[running_index] = (nx, ny)
+            push(geo)
             running_index += 1
+        self.replay_layout(rects)
+        return rects
+
+    def replay_layout(self, rects):
+        """ Apply an array of geometries to the widgets in the layout
+        table.
+
+        The geometries are rounded to integer pixels, and only the
+        widgets whose rounded geometry differs from the one which was
+        last applied are updated. If more than one widget is updated,
+        the updates of the container are disabled while the geometry
+        is applied, so that the changes are painted as a batch. The
+        number of updated widgets is stored in `moved_count`.
+
+        Parameters
+        ----------
+        rects : array
+            The flat array of geometries returned by an earlier call
+            to the `layout` method.
+
+        """
+        last = self._layout_rects
+        rects = array('l', [int(round(value)) for value in rects])
+        moved = []
+        push = moved.append
+        index = 0
+        for _, updater in self._layout_table:
+            end = index + 4
+            geo = rects[index:end]
+            if last[index:end] != geo:
+                last[index:end] = geo
+                push((updater.set_geometry, index))
+            index = end
+        if len(moved) > 1:
+            widget = self._widget
+            widget.setUpdatesEnabled(False)
+            try:
+                for set_geometry, index in moved:
+                    set_geometry(*rects[index:index + 4])
+            finally:
+                widget.setUpdatesEnabled(True)
+        elif moved:
+            set_geometry, index = moved[0]
+            set_geometry(*rects[index:index + 4])
+        self.moved_count = len(moved)
+        stats = self._layout_stats
+        if stats is not None:
+            stats.add_count('moved', len(moved))
 
     def contents_margins(self):
         """ Get the contents margins for the container.
@@ -369,30 +447,154 @@ class QtContainer(QtConstraintsWidget):
         """
         cns = self._contents_cns
         if not cns:
-            padding = self._padding
-            margins = self.contents_margins()
-            tval, rval, bval, lval = map(sum, zip(padding, margins))
-            primitive = self.layout_box.primitive
-            top = primitive('top')
-            left = primitive('left')
-            width = primitive('width')
-            height = primitive('height')
-            contents_top = primitive('contents_top')
-            contents_left = primitive('contents_left')
-            contents_right = primitive('contents_right')
-            contents_bottom = primitive('contents_bottom')
-            cns = [
-                contents_top == (top + tval),
-                contents_left == (left + lval),
-                contents_right == (left + width - rval),
-                contents_bottom == (top + height - bval),
-            ]
+            cns = contents_constraints(
+                self.layout_box, self._padding, self.contents_margins()
+            )
             self._contents_cns = cns
         return cns
 
     #--------------------------------------------------------------------------
     # Private Layout Handling
     #--------------------------------------------------------------------------
+    def _update_layout(self):
+        """ A private method which updates the live layout manager
+        with the difference between the old and new constraints.
+
+        Only the constraints which were removed or added since the
+        last layout are replaced in the solver. The constraints are
+        matched by the keys created by _generate_constraints.
+
+        Returns
+        -------
+        result : bool
+            True if the layout was updated, or False if there is no
+            layout manager or the set of widgets in the layout has
+            changed, in which case a full rebuild is required.
+
+        """
+        manager = self._layout_manager
+        if manager is None:
+            return False
+        offset_table, layout_table = self._build_layout_table()
+        old_table = self._layout_table
+        if len(layout_table) != len(old_table):
+            return False
+        for old, new in zip(old_table, layout_table):
+            if old[0] != new[0] or old[1].item is not new[1].item:
+                return False
+
+        # Constraints which are in both sets are kept as the instance
+        # which is already in the solver.
+        old_map = self._cn_map
+        new_map = {}
+        added = []
+        push = added.append
+        stats = self._layout_stats
+        if stats is None:
+            cn_items = self._generate_constraints(
+                layout_table, self._cn_owners,
+            )
+        else:
+            with stats.timer('generate'):
+                cn_items = self._generate_constraints(
+                    layout_table, self._cn_owners,
+                )
+        for key, cn in cn_items:
+            old_cn = old_map.get(key)
+            if old_cn is None:
+                push(cn)
+            else:
+                cn = old_cn
+            new_map[key] = cn
+        removed = [cn for key, cn in old_map.iteritems() if key not in new_map]
+        if removed or added:
+            manager.replace_constraints(removed, added)
+        # The widgets in the layout are unchanged, so the geometries
+        # which were last applied to them remain valid.
+        self._cn_map = new_map
+        self._offset_table = offset_table
+        self._layout_table = layout_table
+        self.refresh_sizes()
+        return True
+
+    @staticmethod
+    def _empty_rects(count):
+        """ A private method which creates the array of last applied
+        geometries for a new layout table.
+
+        The array is filled with -1, which is never a valid width or
+        height, so that the first layout pass updates every widget.
+
+        """
+        return array('l', [-1]) * (4 * count)
+
+    def _init_static_layout(self, static, offset_table, layout_table):
+        """ A private method which initializes the layout from a
+        precomputed static layout, without a layout manager.
+
+        Parameters
+        ----------
+        static : StaticLayout
+            The static layout which matches the layout table.
+
+        offset_table : list
+            The offset table of the container.
+
+        layout_table : list
+            The layout table of the container.
+
+        """
+        self._static_layout = static
+        self._layout_manager = None
+        self._layout_stats = None
+        self._cn_map = {}
+        self._offset_table = offset_table
+        self._layout_table = layout_table
+        self._layout_rects = self._empty_rects(len(layout_table))
+        geometry = static.geometry
+        replay = self.replay_layout
+        widget = self._widget
+        width = widget.width
+        height = widget.height
+        def refresher():
+            replay(geometry(width(), height()))
+        self._refresh = refresher
+        self.refresh_sizes()
+
+    @staticmethod
+    def _timed(stats, phase, func):
+        """ A private method which wraps a function so that the time
+        spent in it is recorded in the given LayoutStats.
+
+        """
+        add_time = stats.add_time
+        clock = time.time
+        def timed(*args):
+            start = clock()
+            res = func(*args)
+            add_time(phase, clock() - start)
+            return res
+        return timed
+
+    def _update_constraint_map(self, old_cns, new_cns):
+        """ A private method which updates the constraint map after
+        constraints are replaced in the layout manager.
+
+        Parameters
+        ----------
+        old_cns : list
+            The list of casuarius constraints which were removed.
+
+        new_cns : list
+            The list of casuarius constraints which were added.
+
+        """
+        cn_map = self._cn_map
+        for cn in old_cns:
+            cn_map.pop(id(cn), None)
+        for cn in new_cns:
+            cn_map[id(cn)] = cn
+
     def _build_refresher(self, manager):
         """ A private method which will build a function which, when
         called, will refresh the layout for the container.
@@ -410,6 +612,11 @@ class QtContainer(QtConstraintsWidget):
         # justified with profiling.
         mgr_layout = manager.layout
         layout = self.layout
+        replay = self.replay_layout
+        stats = self._layout_stats
+        if stats is not None:
+            layout = self._timed(stats, 'geometry', layout)
+            replay = self._timed(stats, 'geometry', replay)
         primitive = self.layout_box.primitive
         width_var = primitive('width')
         height_var = primitive('height')
@@ -417,7 +624,8 @@ class QtContainer(QtConstraintsWidget):
         width = widget.width
         height = widget.height
         def refresher():
-            mgr_layout(layout, width_var, height_var, (width(), height()))
+            size = (width(), height())
+            mgr_layout(layout, width_var, height_var, size, replay=replay)
         return refresher
 
     def _build_layout_table(self):
@@ -487,33 +695,42 @@ class QtContainer(QtConstraintsWidget):
 
         return offset_table, layout_table
 
-    def _generate_constraints(self, layout_table):
+    def _generate_constraints(self, layout_table, owners=None):
         """ Creates the list of casuarius LinearConstraint objects for
         the widgets for which this container owns the layout.
 
         This method walks over the items in the given layout table and
         aggregates their constraints into a single list of casuarius
         LinearConstraint objects which can be given to the layout
-        manager.
+        manager. Each constraint is paired with a hashable key. The
+        constraints generated on the client are keyed by their id,
+        since they are cached by the widgets. The constraints sent by
+        the server are keyed by their structure, so that equal keys
+        across relayouts identify the same constraint.
 
         Parameters
         ----------
         layout_table : list
             The layout table created by a call to _build_layout_table.
 
+        owners : dict, optional
+            The constraint owners dict of the previous layout. The
+            virtual owners it contains are reused, so that the kept
+            constraints and the new constraints share variables.
+
         Returns
         -------
         result : list
-            The list of casuarius LinearConstraints instances to pass to
-            the layout manager.
+            The list of (key, constraint) pairs for the casuarius
+            LinearConstraint instances to pass to the layout manager.
 
         """
-        # The mapping of constraint owners and the list of constraint
-        # info dictionaries provided by the Enaml widgets.
+        # The mapping of constraint owners and the list of encoded
+        # constraint infos provided by the Enaml widgets.
         box = self.layout_box
         cn_owners = {self.object_id(): box}
-        cn_dicts = list(self.user_constraints())
-        cn_dicts_extend = cn_dicts.extend
+        cn_infos = [self.user_constraints()]
+        cn_infos_append = cn_infos.append
 
         # The list of raw casuarius constraints which will be returned
         # from this method to be added to the casuarius solver.
@@ -530,20 +747,46 @@ class QtContainer(QtConstraintsWidget):
             raw_cns_extend(child.hard_constraints())
             if isinst(child, QtContainer_):
                 if child.transfer_layout_ownership(self):
-                    cn_dicts_extend(child.user_constraints())
+                    cn_infos_append(child.user_constraints())
                     raw_cns_extend(child.contents_constraints())
                 else:
                     raw_cns_extend(child.size_hint_constraints())
             else:
                 raw_cns_extend(child.size_hint_constraints())
-                cn_dicts_extend(child.user_constraints())
-
-        # Convert the list of Enaml constraints info dicts to actual
-        # casuarius LinearConstraint objects for the solver.
-        add_cn = raw_cns.append
-        as_cn = as_linear_constraint
-        for info in cn_dicts:
-            add_cn(as_cn(info, cn_owners))
+                cn_infos_append(child.user_constraints())
+
+        # Decode the Enaml constraint infos into actual casuarius
+        # LinearConstraint objects for the solver. Variables which do
+        # not have a corresponding owner (e.g. those created by box
+        # helpers) are synthesized on a virtual LayoutBox.
+        old_owners = owners or {}
+        def variable(owner_id, name):
+            owner = cn_owners.get(owner_id)
+            if owner is None:
+                owner = old_owners.get(owner_id)
+                if owner is None:
+                    owner = LayoutBox('_virtual', owner_id)
+                cn_owners[owner_id] = owner
+            return owner.primitive(name)
+
+        # Identical constraints are distinguished by their occurrence
+        # count, so that none of them are dropped from the layout.
+        cn_items = [(id(cn), cn) for cn in raw_cns]
+        push = cn_items.append
+        counts = {}
+        decode = decode_constraints
+        stats = self._layout_stats
+        for info in cn_infos:
+            if info:
+                if stats is None:
+                    cns = decode(info, variable)
+                else:
+                    with stats.timer('decode'):
+                        cns = decode(info, variable)
+                for key, cn in zip(constraint_keys(info), cns):
+                    count = counts.get(key, 0)
+                    counts[key] = count + 1
+                    push(((key, count), cn))
 
         # We keep a strong reference to the constraint owners dict,
         # since it may include instances of LayoutBox which were
@@ -551,7 +794,7 @@ class QtContainer(QtConstraintsWidget):
         # should not be deleted.
         self._cn_owners = cn_owners
 
-        return raw_cns
+        return cn_items
 
     #--------------------------------------------------------------------------
     # Auxiliary Methods
@@ -586,9 +829,34 @@ class QtContainer(QtConstraintsWidget):
         self._refresh = owner.refresh
         self._offset_table = []
         self._layout_table = []
+        self._layout_rects = array('l')
         self._cn_owners = {}
+        self._cn_map = {}
+        self._layout_stats = None
         return True
 
+    def layout_stats(self):
+        """ Get the statistics about the layout of this container.
+
+        Statistics are only collected if the `collect_layout_stats`
+        class attribute is True when the layout is initialized. The
+        report includes the number of constraints and variables, the
+        time spent generating and decoding the constraints, in the
+        solver, and applying the geometry of the widgets, the number
+        of widgets moved by each layout pass, and the constraints
+        involved in an unsatisfiable system.
+
+        Returns
+        -------
+        result : dict or None
+            The report created by LayoutStats.report for the layout of
+            this container, or None if the container does not own its
+            layout or statistics are not being collected.
+
+        """
+        if self._owns_layout and self._layout_stats is not None:
+            return self._layout_stats.report()
+
     def will_transfer(self):
         """ Whether or not the container expects to transfer its layout
         ownership to its parent.
@@ -623,6 +891,8 @@ class QtContainer(QtConstraintsWidget):
         shrink = ('ignore', 'weak')
         if resist_width in shrink and resist_height in shrink:
             return QSize(0, 0)
+        if self._owns_layout and self._static_layout is not None:
+            return QSize(*self._static_layout.min_size)
         if self._owns_layout and self._layout_manager is not None:
             primitive = self.layout_box.primitive
             width = primitive('width')
@@ -653,6 +923,8 @@ class QtContainer(QtConstraintsWidget):
             will satisfy all constraints.
 
         """
+        if self._owns_layout and self._static_layout is not None:
+            return QSize(*self._static_layout.best_size)
         if self._owns_layout and self._layout_manager is not None:
             primitive = self.layout_box.primitive
             width = primitive('width')
@@ -680,15 +952,18 @@ class QtContainer(QtConstraintsWidget):
         expanding = ('ignore', 'weak')
         if hug_width in expanding and hug_height in expanding:
             return QSize(16777215, 16777215)
-        if self._owns_layout and self._layout_manager is not None:
+        if self._owns_layout and self._static_layout is not None:
+            w, h = self._static_layout.max_size
+        elif self._owns_layout and self._layout_manager is not None:
             primitive = self.layout_box.primitive
             width = primitive('width')
             height = primitive('height')
             w, h = self._layout_manager.get_max_size(width, height)
-            if w < 0 or hug_width in expanding:
-                w = 16777215
-            if h < 0 or hug_height in expanding:
-                h = 16777215
-            return QSize(w, h)
-        return QSize(16777215, 16777215)
+        else:
+            return QSize(16777215, 16777215)
+        if w < 0 or hug_width in expanding:
+            w = 16777215
+        if h < 0 or hug_height in expanding:
+            h = 16777215
+        return QSize(w, h)
 
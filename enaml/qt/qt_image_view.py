@@ -2,7 +2,9 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from .qt.QtGui import QWidget, QPainter
+from base64 import b64decode
+
+from .qt.QtGui import QWidget, QPainter, QImage, QPixmap, qRgb
 from .qt_control import QtControl
 
 
@@ -190,33 +192,46 @@ class QImageView(QWidget):
         self.update()
 
 
+#: A mapping from Enaml image format to QImage format.
+IMAGE_FORMATS = {
+    'indexed8': QImage.Format_Indexed8,
+    'rgba32': QImage.Format_ARGB32,
+    'rgb32': QImage.Format_RGB32,
+}
+
+
+#: The number of bytes per pixel for the Enaml image formats.
+BYTES_PER_PIXEL = {
+    'indexed8': 1,
+    'rgba32': 4,
+    'rgb32': 4,
+}
+
+
 class QtImageView(QtControl):
-    """ A Qt4 implementation of an Enaml ImageView widget.
+    """ A Qt implementation of an Enaml ImageView widget.
 
     """
-    #: The internal cached size hint which is used to determine whether
-    #: or not a size hint updated event should be emitted when the image
-    #: in the control changes.
-    _cached_size_hint = None
-
     #--------------------------------------------------------------------------
-    # Setup methods
+    # Setup Methods
     #--------------------------------------------------------------------------
-    def create(self):
-        """ Creates the underlying QImageView control.
+    def create_widget(self, parent, tree):
+        """ Create the underlying QImageView widget.
 
         """
-        self.widget = QImageView(self.parent_widget)
+        return QImageView(parent)
 
-    def initialize(self, attrs):
-        """ Initializes the attributes on the underlying control.
+    def create(self, tree):
+        """ Create and initialize the underlying widget.
 
         """
-        super(QtImageView, self).initialize()
-        self.set_scale_to_fit(attrs['scale_to_fit'])
-        self.set_preserve_aspect_ratio(attrs['preserve_aspect_ratio'])
-        self.set_allow_upscaling(attrs['allow_upscaling'])
-        #self.set_image(shell.image)
+        super(QtImageView, self).create(tree)
+        self.set_scale_to_fit(tree['scale_to_fit'])
+        self.set_preserve_aspect_ratio(tree['preserve_aspect_ratio'])
+        self.set_allow_upscaling(tree['allow_upscaling'])
+        image = tree['image']
+        if image is not None:
+            self.set_image(image, [b64decode(image['data'])])
 
     #--------------------------------------------------------------------------
     # Message Handlers
@@ -244,8 +259,16 @@ class QtImageView(QtControl):
     def on_action_set_image(self, content):
         """ Handle the 'set_image' action from the Enaml widget.
 
+        The image data is delivered on the binary channel of the socket
+        in the 'buffers' list of the content.
+
         """
-        self.set_image(content['image'])
+        widget = self.widget()
+        old_hint = widget.sizeHint()
+        self.set_image(content['image'], content.get('buffers'))
+        new_hint = widget.sizeHint()
+        if old_hint != new_hint:
+            self.size_hint_updated()
 
     #--------------------------------------------------------------------------
     # Widget Update Methods
@@ -255,25 +278,53 @@ class QtImageView(QtControl):
         control.
 
         """
-        self.widget.setScaledContents(scale_to_fit)
+        self.widget().setScaledContents(scale_to_fit)
 
     def set_preserve_aspect_ratio(self, preserve):
         """ Sets whether or not to preserve the aspect ratio of the
         image when scaling.
 
         """
-        self.widget.setPreserveAspectRatio(preserve)
+        self.widget().setPreserveAspectRatio(preserve)
 
     def set_allow_upscaling(self, allow):
         """ Sets whether or not the image will scale beyond its natural
         size.
 
         """
-        self.widget.setAllowUpscaling(allow)
+        self.widget().setAllowUpscaling(allow)
 
-    def set_image(self, image):
-        """ Sets the image on the underlying QLabel.
+    def set_image(self, image, buffers):
+        """ Sets the image on the underlying QImageView.
 
-        """
-        return
+        Parameters
+        ----------
+        image : dict or None
+            The image metadata dict, or None to clear the image.
+
+        buffers : list
+            The list of buffers for the image. The first buffer holds
+            the image data.
 
+        """
+        widget = self.widget()
+        if image is None or not buffers:
+            widget.setPixmap(None)
+            return
+        data = buffers[0]
+        img_format = image['format']
+        if img_format == 'raw_file':
+            qimage = QImage.fromData(bytes(data))
+        else:
+            # The QImage refers to the memory of the buffer, so no copy
+            # is made until the image is converted into a pixmap. The
+            # buffer must be kept alive until that conversion is done.
+            width, height = image['size']
+            bpl = width * BYTES_PER_PIXEL[img_format]
+            qimage = QImage(
+                buffer(data), width, height, bpl, IMAGE_FORMATS[img_format]
+            )
+            color_table = image.get('color_table')
+            if color_table:
+                qimage.setColorTable([qRgb(*rgb) for rgb in color_table])
+        widget.setPixmap(QPixmap.fromImage(qimage))
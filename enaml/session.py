@@ -2,13 +2,15 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+from collections import OrderedDict
 import logging
+import time
 
-from traits.api import HasTraits, Instance, List, Str, ReadOnly
+from traits.api import HasTraits, Instance, List, Str, ReadOnly, Bool
 
 from enaml.core.object import Object
 
-from .application import deferred_call
+from .application import deferred_call, timed_call
 from .signaling import Signal
 from .socket_interface import ActionSocketInterface
 
@@ -22,46 +24,69 @@ logger = logging.getLogger(__name__)
 BATCH_ACTIONS = set(['destroy', 'children_changed', 'relayout'])
 
 
+#: The prefix of the actions which may be coalesced by a session which
+#: has enabled action coalescing. These are the actions generated by
+#: `Object._anytrait_changed` for published attributes, where only the
+#: most recent value is relevant to the client.
+COALESCE_PREFIX = 'set_'
+
+
 class DeferredMessageBatch(object):
     """ A class which aggregates batch messages.
 
-    Each time a message is added to this object, its tick count is
-    incremented and a tick down event is posted to the event queue.
-    When the object receives the tick down event, it decrements its
-    tick count, and if it's zero, fires the `triggered` signal.
-
-    This allows a consumer of the batch to continually add messages and
-    have the `triggered` signal fired only when the event queue is fully
-    drained of relevant messages.
+    When a message is added and no flush is pending, one is scheduled
+    with a zero delay timed call. The toolkit runs it once the events
+    which are already in the event queue have been processed, so the
+    messages added while handling those events join the batch. The
+    `triggered` signal is then emitted once for the whole batch. An
+    optional maximum latency schedules a second flush, which fires if
+    the first one was held back by a busy event queue.
 
     """
-    #: A signal emitted when the tick count of the batch reaches zero
-    #: and the owner of the batch should consume the messages.
+    #: A signal emitted when the batch is flushed and the owner of the
+    #: batch should consume the messages.
     triggered = Signal()
 
+    #: The maximum time, in milliseconds, that a message waits in the
+    #: batch before it is flushed, or None to only flush when the event
+    #: queue is idle. This may be set on the class or on an instance.
+    max_latency = None
+
+    #: An optional statistics collector, such as a LayoutStats. If it
+    #: is set, the size of each flushed batch is recorded with the
+    #: 'batch_size' counter, and the time between the first message
+    #: and the flush with the 'flush_latency' timing.
+    stats = None
+
     def __init__(self):
         """ Initialize a DeferredMessageBatch.
 
         """
         self._messages = []
-        self._tick = 0
+        self._generation = 0
+        self._scheduled = False
+        self._started = 0.0
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
-    def _tick_down(self):
-        """ A private handler method which ticks down the batch.
+    def _flush(self, generation):
+        """ A private handler method which flushes the batch.
 
-        The tick down events are called in a deferred fashion to allow
-        for the aggregation of batch events. When the tick reaches
-        zero, the `triggered` signal will be emitted.
+        Both the idle flush and the max latency flush of a batch call
+        this method, and only the first of them emits the `triggered`
+        signal. A flush whose generation does not match the current
+        one belongs to a batch which was already flushed.
 
         """
-        self._tick -= 1
-        if self._tick == 0:
-            self.triggered.emit()
-        else:
-            deferred_call(self._tick_down)
+        if generation != self._generation or not self._scheduled:
+            return
+        self._scheduled = False
+        stats = self.stats
+        if stats is not None:
+            stats.add_count('batch_size', len(self._messages))
+            stats.add_time('flush_latency', time.time() - self._started)
+        self.triggered.emit()
 
     #--------------------------------------------------------------------------
     # Public API
@@ -82,8 +107,8 @@ class DeferredMessageBatch(object):
     def add_message(self, message):
         """ Add a message to the batch.
 
-        This will cause the batch to tick up and then start the tick
-        down process if necessary.
+        This will schedule the flush of the batch if one is not
+        already scheduled.
 
         Parameters
         ----------
@@ -92,9 +117,109 @@ class DeferredMessageBatch(object):
 
         """
         self._messages.append(message)
-        if self._tick == 0:
-            deferred_call(self._tick_down)
-        self._tick += 1
+        if not self._scheduled:
+            self._scheduled = True
+            self._generation += 1
+            generation = self._generation
+            self._started = time.time()
+            timed_call(0, self._flush, generation)
+            max_latency = self.max_latency
+            if max_latency is not None:
+                timed_call(max_latency, self._flush, generation)
+
+
+class CoalescedMessageQueue(object):
+    """ A class which collapses redundant messages within a tick.
+
+    Messages are keyed on their `(object_id, action)` pair. Adding a
+    message for a key which is already pending replaces the content of
+    the pending message, but leaves it in its original position in the
+    queue. This means that only the latest content is sent, while the
+    relative order of the messages for different keys is maintained.
+
+    The `triggered` signal is emitted on the next cycle of the event
+    loop after the first message is added to an empty queue.
+
+    """
+    #: A signal emitted when the pending messages should be consumed
+    #: by the owner of the queue.
+    triggered = Signal()
+
+    def __init__(self):
+        """ Initialize a CoalescedMessageQueue.
+
+        """
+        self._messages = OrderedDict()
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _on_tick(self):
+        """ A private handler method invoked on the next event cycle.
+
+        The `triggered` signal is only emitted if the messages were not
+        already released by the owner of the queue.
+
+        """
+        if self._messages:
+            self.triggered.emit()
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def pending(self):
+        """ Get whether or not the queue has pending messages.
+
+        Returns
+        -------
+        result : bool
+            True if there are messages waiting to be released, False
+            otherwise.
+
+        """
+        return len(self._messages) > 0
+
+    def release(self):
+        """ Release the messages that were added to the queue.
+
+        Returns
+        -------
+        result : list
+            The list of `(object_id, action, content, buffers)` tuples
+            for the pending messages, in the order they were first
+            added.
+
+        """
+        messages = self._messages
+        self._messages = OrderedDict()
+        return [key + value for key, value in messages.iteritems()]
+
+    def add_message(self, object_id, action, content, buffers=None):
+        """ Add a message to the queue.
+
+        If a message with the same object id and action is pending, its
+        content and buffers are replaced by the given values.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the client object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        buffers : list, optional
+            The list of binary buffers for the action, or None if the
+            action has no binary data.
+
+        """
+        messages = self._messages
+        if not messages:
+            deferred_call(self._on_tick)
+        messages[(object_id, action)] = (content, buffers)
 
 
 class Session(HasTraits):
@@ -129,15 +254,37 @@ class Session(HasTraits):
     #: should not normally be manipulated by user code.
     socket = Instance(ActionSocketInterface)
 
+    #: Whether or not to coalesce the `set_<attr>` actions sent by the
+    #: objects of this session. When enabled, repeated actions for the
+    #: same object and attribute within a single cycle of the event
+    #: loop are collapsed so that only the latest content is sent to
+    #: the client. The relative order of the messages for different
+    #: objects and actions is unchanged. The default is False.
+    coalesce_actions = Bool(False)
+
+    #: An optional statistics collector for the message batches of
+    #: this session, such as a LayoutStats. See DeferredMessageBatch.
+    #: This is a plain class attribute, not a trait.
+    batch_stats = None
+
     #: The private deferred message batch used for collapsing layout
     #: related messages into a single batch to send to the client
     #: session for more efficient handling.
     _batch = Instance(DeferredMessageBatch)
     def __batch_default(self):
         batch = DeferredMessageBatch()
+        batch.stats = self.batch_stats
         batch.triggered.connect(self._on_batch_triggered)
         return batch
 
+    #: The private message queue used for coalescing the `set_<attr>`
+    #: actions when `coalesce_actions` is enabled.
+    _queue = Instance(CoalescedMessageQueue)
+    def __queue_default(self):
+        queue = CoalescedMessageQueue()
+        queue.triggered.connect(self._flush_queue)
+        return queue
+
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
@@ -149,6 +296,30 @@ class Session(HasTraits):
         content = {'batch': self._batch.release()}
         self.send(self.session_id, 'message_batch', content)
 
+    def _flush_queue(self):
+        """ Send the pending coalesced messages to the client.
+
+        This is the handler for the `triggered` signal on the message
+        queue. It is also invoked directly before an uncoalesced action
+        is sent, so that the client sees the messages in order.
+
+        """
+        messages = self._queue.release()
+        socket = self.socket
+        if socket is not None:
+            for object_id, action, content, buffers in messages:
+                if buffers is None:
+                    socket.send(object_id, action, content)
+                else:
+                    socket.send_binary(object_id, action, content, buffers)
+
+    def _coalesce_actions_changed(self, new):
+        """ Send any pending messages when coalescing is disabled.
+
+        """
+        if not new and self._queue.pending():
+            self._flush_queue()
+
     #--------------------------------------------------------------------------
     # Abstract API
     #--------------------------------------------------------------------------
@@ -234,11 +405,15 @@ class Session(HasTraits):
         """
         return [obj.snapshot() for obj in self.objects]
 
-    def send(self, object_id, action, content):
+    def send(self, object_id, action, content, buffers=None):
         """ Send a message to a client object.
 
         This method is called by the `Object` instances owned by this
-        session to send messages to their client implementations.
+        session to send messages to their client implementations. If
+        `coalesce_actions` is enabled, `set_<attr>` actions are queued
+        and collapsed until the next cycle of the event loop. Any other
+        action sends the queued actions first, so that the client sees
+        property updates before the actions which follow them.
 
         Parameters
         ----------
@@ -251,13 +426,32 @@ class Session(HasTraits):
         content : dict
             The content dictionary for the action.
 
+        buffers : list, optional
+            A list of objects supporting the buffer protocol to send
+            on the binary channel of the socket along with the action.
+            The default is None and indicates there is no binary data.
+
         """
         socket = self.socket
         if socket is not None:
+            if self.coalesce_actions:
+                if action.startswith(COALESCE_PREFIX):
+                    self._queue.add_message(
+                        object_id, action, content, buffers
+                    )
+                    return
+                # Any other action may depend on the pending property
+                # updates, such as a relayout caused by a new text, so
+                # the updates are sent first.
+                if self._queue.pending():
+                    self._flush_queue()
             if action in BATCH_ACTIONS:
                 self._batch.add_message((object_id, action, content))
             else:
-                socket.send(object_id, action, content)
+                if buffers is None:
+                    socket.send(object_id, action, content)
+                else:
+                    socket.send_binary(object_id, action, content, buffers)
 
     def on_message(self, object_id, action, content):
         """ Receive a message sent to an object owned by this session.
@@ -3,6 +3,7 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 from abc import ABCMeta, abstractmethod
+from base64 import b64encode
 
 
 class ActionSocketInterface(object):
@@ -49,3 +50,38 @@ class ActionSocketInterface(object):
         """
         raise NotImplementedError
 
+    def send_binary(self, object_id, action, content, buffers):
+        """ Send an action with binary data to the client of an object.
+
+        The buffers are delivered to the receiving callback as a list
+        stored under the 'buffers' key of the content dictionary. A
+        socket which supports binary data should override this method.
+        An in-process socket should deliver the buffer objects
+        themselves, without copying or encoding them.
+
+        The default implementation base64 encodes the buffers into a
+        copy of the content, sets its 'buffer_encoding' key to 'base64',
+        and sends it with `send`.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id for the Object sending the message.
+
+        action : str
+            The action that should be take by the client object.
+
+        content : dict
+            The dictionary of content needed to perform the action.
+
+        buffers : list
+            The list of objects supporting the buffer protocol, such
+            as bytearrays or NumPy arrays, to send with the action.
+
+        """
+        content = dict(content)
+        content['buffers'] = [
+            b64encode(memoryview(buf).tobytes()) for buf in buffers
+        ]
+        content['buffer_encoding'] = 'base64'
+        self.send(object_id, action, content)
@@ -0,0 +1,169 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.application import Application
+
+
+class CycleApplication(Application):
+    """ An application which runs its deferred calls one event loop
+    cycle at a time.
+
+    """
+    def __init__(self):
+        super(CycleApplication, self).__init__([])
+        self.calls = []
+
+    def socket(self, session_id):
+        raise NotImplementedError
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def deferred_call(self, callback, *args, **kwargs):
+        self.calls.append((callback, args, kwargs))
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        self.calls.append((callback, args, kwargs))
+
+    def is_main_thread(self):
+        return True
+
+    def cycle(self):
+        """ Run the calls which were posted before this cycle.
+
+        """
+        calls, self.calls = self.calls, []
+        for callback, args, kwargs in calls:
+            callback(*args, **kwargs)
+        return len(calls)
+
+
+class TestTaskDraining(unittest.TestCase):
+
+    def setUp(self):
+        self.app = CycleApplication()
+        self.results = []
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def schedule(self, value, priority=0):
+        return self.app.schedule(self.results.append, (value,), None, priority)
+
+    def test_one_task_per_cycle(self):
+        app = self.app
+        app.task_budget = None
+        for value in range(3):
+            self.schedule(value)
+        self.assertEqual(len(app.calls), 1)
+        app.cycle()
+        self.assertEqual(self.results, [0])
+        app.cycle()
+        app.cycle()
+        self.assertEqual(self.results, [0, 1, 2])
+        self.assertTrue(app.has_pending_tasks() is False)
+
+    def test_batch_within_budget(self):
+        app = self.app
+        app.task_budget = 60.0
+        tasks = [self.schedule(value) for value in range(1000)]
+        self.assertTrue(app.has_pending_tasks())
+        app.cycle()
+        self.assertEqual(self.results, range(1000))
+        self.assertFalse(any(task.pending() for task in tasks))
+        self.assertEqual(app.calls, [])
+
+    def test_priority_within_batch(self):
+        app = self.app
+        app.task_budget = 60.0
+        def first():
+            self.results.append('first')
+            self.schedule('urgent', priority=10)
+        app.schedule(first)
+        self.schedule('low', priority=-1)
+        self.schedule('normal')
+        app.cycle()
+        self.assertEqual(self.results, ['first', 'urgent', 'normal', 'low'])
+
+    def test_failing_task_does_not_stall(self):
+        app = self.app
+        app.task_budget = 60.0
+        app.schedule(lambda: 1 / 0)
+        self.schedule('after')
+        self.assertRaises(ZeroDivisionError, app.cycle)
+        app.cycle()
+        self.assertEqual(self.results, ['after'])
+        self.assertEqual(app.calls, [])
+
+
+class TestKeyedTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.app = CycleApplication()
+        self.app.task_budget = 60.0
+        self.results = []
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def schedule(self, value, priority=0, key=None, merge=None):
+        return self.app.schedule(
+            self.results.append, (value,), None, priority, key, merge,
+        )
+
+    def test_replace_pending_task(self):
+        app = self.app
+        first = self.schedule(1, key='a')
+        second = self.schedule(2, key='a')
+        self.schedule(3, key='b')
+        self.assertTrue(first is second)
+        app.cycle()
+        self.assertEqual(self.results, [2, 3])
+        self.assertEqual(app._task_keys, {})
+
+    def test_merge_pending_task(self):
+        def merge(old_args, old_kwargs, args, kwargs):
+            return (old_args[0] + args[0],), kwargs
+        for value in ([1], [2], [3]):
+            self.schedule(value, key='a', merge=merge)
+        self.app.cycle()
+        self.assertEqual(self.results, [[1, 2, 3]])
+
+    def test_raise_priority(self):
+        app = self.app
+        self.schedule('low', key='a', priority=-1)
+        self.schedule('normal')
+        self.schedule('high', key='a', priority=5)
+        self.assertTrue(app.has_pending_tasks())
+        app.cycle()
+        self.assertEqual(self.results, ['high', 'normal'])
+        self.assertFalse(app.has_pending_tasks())
+        self.assertEqual(app._task_heap, [])
+
+    def test_key_released_when_run(self):
+        app = self.app
+        def task():
+            self.results.append('task')
+            if len(self.results) < 3:
+                app.schedule(task, key='a')
+        app.schedule(task, key='a')
+        app.cycle()
+        self.assertEqual(self.results, ['task'] * 3)
+
+    def test_unscheduled_task_is_not_reused(self):
+        first = self.schedule(1, key='a')
+        first.unschedule()
+        second = self.schedule(2, key='a')
+        self.assertFalse(first is second)
+        self.app.cycle()
+        self.assertEqual(self.results, [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
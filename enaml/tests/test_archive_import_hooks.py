@@ -0,0 +1,169 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+
+from enaml.bundle import compile_modules, module_name
+from enaml.core import import_hooks
+from enaml.core.archive_import_hooks import (
+    BundleEnamlImporter, ZipEnamlImporter, write_bundle
+)
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+
+
+SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Main(Declarative):
+    attr value = %d
+"""
+
+
+def cache_data(source, mode):
+    code = EnamlCompiler.compile(parse(source), 'view.enaml')
+    header = import_hooks.make_cache_header(source, None, mode)
+    return header + marshal.dumps(code)
+
+
+def cache_leaf(modname):
+    return '%s.%s.enamlc' % (modname, import_hooks.MAGIC_TAG)
+
+
+class ImporterTestCase(unittest.TestCase):
+
+    #: The module names imported by the test.
+    modules = ()
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.old_path = sys.path[:]
+
+    def tearDown(self):
+        sys.path[:] = self.old_path
+        for name in self.modules:
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.root)
+
+    def import_module(self, importer, name):
+        import_hooks.imports.add_importer(importer)
+        try:
+            with import_hooks.imports():
+                __import__(name)
+        finally:
+            import_hooks.imports.remove_importer(importer)
+        return sys.modules[name]
+
+
+class TestZipEnamlImporter(ImporterTestCase):
+
+    modules = ('zview', 'zcached', 'zpkg', 'zpkg.view', 'zonly', 'zbad')
+
+    def setUp(self):
+        super(TestZipEnamlImporter, self).setUp()
+        self.zip_path = os.path.join(self.root, 'app.zip')
+        stale = cache_data(SOURCE % 0, import_hooks.CHECKED_HASH)
+        hashed = cache_data(SOURCE % 3, import_hooks.UNCHECKED_HASH)
+        with zipfile.ZipFile(self.zip_path, 'w') as zf:
+            zf.writestr('zview.enaml', SOURCE % 1)
+            zf.writestr('__enamlcache__/' + cache_leaf('zview'), stale)
+            zf.writestr('zcached.enaml', SOURCE % 2)
+            zf.writestr('__enamlcache__/' + cache_leaf('zcached'), hashed)
+            zf.writestr('zpkg/__init__.py', '')
+            zf.writestr('zpkg/view.enaml', SOURCE % 4)
+            zf.writestr('__enamlcache__/' + cache_leaf('zonly'), hashed)
+            zf.writestr('__enamlcache__/' + cache_leaf('zbad'), 'garbage')
+        sys.path.insert(0, self.zip_path)
+
+    def tearDown(self):
+        ZipEnamlImporter.invalidate_caches()
+        super(TestZipEnamlImporter, self).tearDown()
+
+    def test_stale_cache_compiles_source(self):
+        mod = self.import_module(ZipEnamlImporter, 'zview')
+        self.assertEqual(mod.Main().value, 1)
+        path = os.path.join(self.zip_path, 'zview.enaml')
+        self.assertEqual(mod.__file__, path)
+
+    def test_current_cache(self):
+        mod = self.import_module(ZipEnamlImporter, 'zcached')
+        self.assertEqual(mod.Main().value, 3)
+
+    def test_package_in_archive(self):
+        mod = self.import_module(ZipEnamlImporter, 'zpkg.view')
+        self.assertEqual(mod.Main().value, 4)
+
+    def test_not_found(self):
+        self.assertTrue(ZipEnamlImporter.locate_module('missing') is None)
+
+    def test_cache_without_source(self):
+        mod = self.import_module(ZipEnamlImporter, 'zonly')
+        self.assertEqual(mod.Main().value, 3)
+
+    def test_invalid_cache_without_source(self):
+        with self.assertRaises(ImportError):
+            self.import_module(ZipEnamlImporter, 'zbad')
+
+
+class TestBundleEnamlImporter(ImporterTestCase):
+
+    modules = ('bview', 'bpkg', 'bpkg.view')
+
+    def setUp(self):
+        super(TestBundleEnamlImporter, self).setUp()
+        src = os.path.join(self.root, 'src')
+        os.makedirs(os.path.join(src, 'bpkg'))
+        self.write(os.path.join(src, 'bview.enaml'), SOURCE % 1)
+        self.write(os.path.join(src, 'bpkg', '__init__.py'), '')
+        self.write(os.path.join(src, 'bpkg', 'view.enaml'), SOURCE % 2)
+        # The package is importable, but its Enaml module is only
+        # available from the bundle.
+        pkg = os.path.join(self.root, 'lib', 'bpkg')
+        os.makedirs(pkg)
+        self.write(os.path.join(pkg, '__init__.py'), '')
+        files = [
+            os.path.join(src, 'bview.enaml'),
+            os.path.join(src, 'bpkg', 'view.enaml'),
+        ]
+        self.bundle_path = os.path.join(self.root, 'app.enamlbundle')
+        write_bundle(self.bundle_path, compile_modules(files))
+        shutil.rmtree(src)
+        sys.path.insert(0, os.path.join(self.root, 'lib'))
+        sys.path.insert(0, self.bundle_path)
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def test_module_name(self):
+        path = os.path.join(self.root, 'lib', 'bpkg', 'view.enaml')
+        name, filename = module_name(path)
+        self.assertEqual(name, 'bpkg.view')
+        self.assertEqual(filename, os.path.join('bpkg', 'view.enaml'))
+
+    def test_top_level_module(self):
+        mod = self.import_module(BundleEnamlImporter, 'bview')
+        self.assertEqual(mod.Main().value, 1)
+        path = os.path.join(self.bundle_path, 'bview.enaml')
+        self.assertEqual(mod.__file__, path)
+
+    def test_package_module(self):
+        mod = self.import_module(BundleEnamlImporter, 'bpkg.view')
+        self.assertEqual(mod.Main().value, 2)
+
+    def test_invalid_bundle_is_ignored(self):
+        with open(self.bundle_path, 'wb') as f:
+            f.write('not a bundle')
+        os.utime(self.bundle_path, (1, 1))
+        self.assertTrue(BundleEnamlImporter.locate_module('bview') is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import unittest
+
+from enaml.compileall import compile_all, find_enaml_files
+from enaml.core.import_hooks import CACHEDIR, EnamlImporter, make_file_info
+
+
+GOOD_SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Main(Declarative):
+    attr value = 42
+"""
+
+
+BAD_SOURCE = """
+enamldef Main(
+"""
+
+
+class TestCompileAll(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        package = os.path.join(self.root, 'package')
+        os.mkdir(package)
+        self.good = [
+            self.write(self.root, 'first.enaml', GOOD_SOURCE),
+            self.write(package, 'second.enaml', GOOD_SOURCE),
+        ]
+        self.bad = self.write(package, 'third.enaml', BAD_SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, dirname, filename, source):
+        path = os.path.join(dirname, filename)
+        with open(path, 'w') as f:
+            f.write(source)
+        return path
+
+    def check_results(self, results):
+        results = dict((r[0], r) for r in results)
+        self.assertEqual(sorted(results), sorted(self.good + [self.bad]))
+        for path in self.good:
+            _, compiled, elapsed, error = results[path]
+            self.assertTrue(compiled)
+            self.assertTrue(error is None)
+            importer = EnamlImporter(make_file_info(path))
+            self.assertTrue(importer.is_cache_current())
+        _, compiled, elapsed, error = results[self.bad]
+        self.assertFalse(compiled)
+        self.assertTrue('SyntaxError' in error)
+
+    def test_find_enaml_files(self):
+        os.mkdir(os.path.join(self.root, CACHEDIR))
+        self.write(os.path.join(self.root, CACHEDIR), 'x.enaml', '')
+        files = find_enaml_files(self.root)
+        self.assertEqual(files, sorted(self.good + [self.bad]))
+
+    def test_compile_serial(self):
+        files = find_enaml_files(self.root)
+        self.check_results(compile_all(files, jobs=1))
+
+    def test_compile_pool(self):
+        files = find_enaml_files(self.root)
+        self.check_results(compile_all(files, jobs=2))
+
+    def test_skip_current(self):
+        files = self.good
+        compile_all(files, jobs=1)
+        results = compile_all(files, jobs=1)
+        self.assertEqual([r[1] for r in results], [False, False])
+        results = compile_all(files, force=True, jobs=1)
+        self.assertEqual([r[1] for r in results], [True, True])
+
+    def test_cache_is_loadable(self):
+        path = self.good[0]
+        compile_all([path], jobs=1)
+        importer = EnamlImporter(make_file_info(path))
+        code, _ = importer.get_code()
+        ns = {}
+        exec code in ns
+        self.assertEqual(ns['Main']().value, 42)
+        cache_dir = os.path.dirname(importer.file_info.cache_path)
+        self.assertFalse(any(f.endswith('.tmp') for f in os.listdir(cache_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from casuarius import ConstraintVariable, Solver
+
+from enaml.layout.constraint_encoding import (
+    OPERATORS, STRENGTHS, constraint_keys, encode_constraints,
+    decode_constraints
+)
+from enaml.layout.layout_helpers import vbox
+from enaml.layout.layout_stats import LayoutStats
+from enaml.widgets.constraints_widget import ConstraintsWidget
+from enaml.widgets.container import Container
+from enaml.widgets.push_button import PushButton
+
+
+class VariableTable(object):
+    """ A variable resolver which creates casuarius variables on demand.
+
+    """
+    def __init__(self):
+        self.variables = {}
+
+    def __call__(self, owner_id, name):
+        key = (owner_id, name)
+        var = self.variables.get(key)
+        if var is None:
+            label = '%s|%s' % key
+            var = self.variables[key] = ConstraintVariable(label)
+        return var
+
+
+class TestConstraintEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.container = Container()
+        self.buttons = [PushButton(self.container) for i in range(2)]
+
+    def test_encode_normalizes_constraint(self):
+        button = self.buttons[0]
+        cn = (button.left + 10 == button.width - button.left) | 'strong' | 2.0
+        info = encode_constraints([cn])
+        self.assertEqual(info['owners'], [button.object_id])
+        names = info['vars'][1::2]
+        self.assertEqual(sorted(names), ['left', 'width'])
+        item = info['cns'][0]
+        self.assertEqual(OPERATORS[item[0]], '==')
+        self.assertEqual(STRENGTHS[item[1]], 'strong')
+        self.assertEqual(item[2:4], [2.0, 10.0])
+        coeffs = dict(
+            (names[item[idx]], item[idx + 1])
+            for idx in range(4, len(item), 2)
+        )
+        self.assertEqual(coeffs, {'left': 2.0, 'width': -1.0})
+
+    def test_encode_shares_variables(self):
+        first, second = self.buttons
+        cns = [first.width == 50, second.width == first.width]
+        info = encode_constraints(cns)
+        self.assertEqual(len(info['owners']), 2)
+        self.assertEqual(len(info['vars']), 4)
+
+    def test_encode_drops_cancelled_terms(self):
+        button = self.buttons[0]
+        info = encode_constraints([button.width + 5 >= button.width])
+        self.assertEqual(info['vars'], [])
+        self.assertEqual(info['cns'], [[2, 0, 1.0, 5.0]])
+
+    def test_decode_solves_layout(self):
+        container = self.container
+        first, second = self.buttons
+        container.constraints = [vbox(first, second)]
+        info = container._generate_constraints()
+        table = VariableTable()
+        cns = decode_constraints(info, table)
+        self.assertEqual(len(cns), len(info['cns']))
+
+        def var(item, name):
+            return table(item.object_id, name)
+
+        solver = Solver(autosolve=False)
+        for cn in cns:
+            solver.add_constraint(cn)
+        solver.add_constraint(var(container, 'contents_top') == 10)
+        solver.add_constraint(var(container, 'contents_left') == 10)
+        for button in self.buttons:
+            solver.add_constraint(var(button, 'height') == 20)
+        solver.autosolve = True
+        self.assertEqual(var(first, 'top').value, 10.0)
+        self.assertTrue(var(second, 'top').value >= 30.0)
+        self.assertEqual(var(first, 'left').value, 10.0)
+        self.assertEqual(var(second, 'left').value, 10.0)
+
+    def test_keys_are_structural(self):
+        first, second = self.buttons
+        cns = [first.width == 50, second.left >= first.right + 10]
+        keys = constraint_keys(encode_constraints(cns))
+        # A different variable table order produces the same keys.
+        other = constraint_keys(encode_constraints(cns[::-1]))
+        self.assertEqual(keys, other[::-1])
+        changed = [first.width == 60, second.left >= first.right + 10]
+        new_keys = constraint_keys(encode_constraints(changed))
+        self.assertNotEqual(keys[0], new_keys[0])
+        self.assertEqual(keys[1], new_keys[1])
+
+    def test_diff_matches_rebuild(self):
+        first, second = self.buttons
+        base = [first.left == 0, first.width == 50, second.width == 30]
+        old = base + [second.left == first.right + 10]
+        new = base + [second.left == first.right + 25]
+
+        def solve(table, cns):
+            solver = Solver(autosolve=False)
+            for cn in cns:
+                solver.add_constraint(cn)
+            solver.autosolve = True
+            return table(second.object_id, 'left').value
+
+        # Apply only the removed and added constraints to a live solver.
+        table = VariableTable()
+        old_info = encode_constraints(old)
+        old_map = dict(zip(
+            constraint_keys(old_info), decode_constraints(old_info, table)
+        ))
+        solver = Solver(autosolve=False)
+        for cn in old_map.itervalues():
+            solver.add_constraint(cn)
+        solver.autosolve = True
+        new_info = encode_constraints(new)
+        new_map = dict(zip(
+            constraint_keys(new_info), decode_constraints(new_info, table)
+        ))
+        removed = [cn for k, cn in old_map.iteritems() if k not in new_map]
+        added = [cn for k, cn in new_map.iteritems() if k not in old_map]
+        self.assertEqual((len(removed), len(added)), (1, 1))
+        solver.autosolve = False
+        for cn in removed:
+            solver.remove_constraint(cn)
+        for cn in added:
+            solver.add_constraint(cn)
+        solver.autosolve = True
+        value = table(second.object_id, 'left').value
+
+        rebuilt = VariableTable()
+        expected = solve(rebuilt, decode_constraints(new_info, rebuilt))
+        self.assertEqual(value, expected)
+        self.assertEqual(value, 75.0)
+
+    def test_generation_stats(self):
+        stats = ConstraintsWidget.layout_stats = LayoutStats('server')
+        try:
+            self.container._generate_constraints()
+        finally:
+            ConstraintsWidget.layout_stats = None
+        timings = stats.report()['timings']
+        self.assertEqual(sorted(timings), ['collect', 'encode', 'expand'])
+
+
+if __name__ == '__main__':
+    unittest.main()
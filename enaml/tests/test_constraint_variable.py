@@ -0,0 +1,56 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.layout.constraint_variable import (
+    ConstraintVariable, LinearExpression, Term,
+)
+
+
+class TestLinearExpression(unittest.TestCase):
+
+    def setUp(self):
+        self.a = ConstraintVariable('a', 'owner')
+        self.b = ConstraintVariable('b', 'owner')
+        self.c = ConstraintVariable('c', 'owner')
+
+    def coeffs(self, expr):
+        return dict((term.var.name, term.coeff) for term in expr.terms)
+
+    def test_chained_expression(self):
+        a, b, c = self.a, self.b, self.c
+        expr = a + 2 * b - c + 10
+        self.assertTrue(isinstance(expr, LinearExpression))
+        self.assertEqual(self.coeffs(expr), {'a': 1.0, 'b': 2.0, 'c': -1.0})
+        self.assertEqual(expr.constant, 10.0)
+        self.assertTrue(all(isinstance(t, Term) for t in expr.terms))
+
+    def test_cancelled_terms_are_removed(self):
+        a, b = self.a, self.b
+        expr = (a + b) - a
+        self.assertEqual(self.coeffs(expr), {'b': 1.0})
+        self.assertEqual(self.coeffs(0 * (a + b)), {})
+
+    def test_shared_expression_is_not_modified(self):
+        a, b, c = self.a, self.b, self.c
+        base = a + b
+        first = base + c
+        second = base - b
+        self.assertEqual(self.coeffs(base), {'a': 1.0, 'b': 1.0})
+        self.assertEqual(self.coeffs(first), {'a': 1.0, 'b': 1.0, 'c': 1.0})
+        self.assertEqual(self.coeffs(second), {'a': 1.0})
+
+    def test_constraint(self):
+        a, b = self.a, self.b
+        cn = (a + 10 <= b) | 'strong' | 2.0
+        self.assertEqual(cn.op, '<=')
+        self.assertEqual((cn.strength, cn.weight), ('strong', 2.0))
+        self.assertEqual(self.coeffs(cn.lhs), {'a': 1.0})
+        self.assertTrue(cn.rhs is b)
+        self.assertFalse(hasattr(cn, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from threading import Thread
+import unittest
+
+from enaml.deferred_queue import DeferredQueue
+
+
+class TestDeferredQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.wakes = []
+        self.queue = DeferredQueue(lambda: self.wakes.append(None))
+        self.results = []
+
+    def post(self, value):
+        self.queue.post(self.results.append, (value,), {})
+
+    def test_wake_once_per_batch(self):
+        queue = self.queue
+        for value in range(100):
+            self.post(value)
+        self.assertEqual(len(self.wakes), 1)
+        self.assertEqual(queue.pending(), 100)
+        self.assertEqual(queue.drain(), 100)
+        self.assertEqual(self.results, range(100))
+        self.post(100)
+        self.assertEqual(len(self.wakes), 2)
+
+    def test_posted_during_drain(self):
+        queue = self.queue
+        def repost():
+            self.results.append('repost')
+            self.post('next')
+        queue.post(repost, (), {})
+        self.post('first')
+        self.assertEqual(queue.drain(), 2)
+        self.assertEqual(self.results, ['repost', 'first'])
+        self.assertEqual(len(self.wakes), 2)
+        queue.drain()
+        self.assertEqual(self.results, ['repost', 'first', 'next'])
+
+    def test_failing_callback(self):
+        queue = self.queue
+        self.post(1)
+        queue.post(lambda: 1 / 0, (), {})
+        self.post(2)
+        self.assertRaises(ZeroDivisionError, queue.drain)
+        self.assertEqual(self.results, [1])
+        self.assertEqual(queue.pending(), 1)
+        self.assertEqual(len(self.wakes), 2)
+        queue.drain()
+        self.assertEqual(self.results, [1, 2])
+
+    def test_worker_threads(self):
+        queue = self.queue
+        def worker(base):
+            for value in xrange(base, base + 1000):
+                self.post(value)
+        threads = [Thread(target=worker, args=(i * 1000,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while queue.pending():
+            queue.drain()
+        self.assertEqual(sorted(self.results), range(4000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from traits.api import Int, List
+
+from enaml.core.dynamic_scope import DynamicScope, ScopeCache
+from enaml.core.object import Object
+
+
+class Holder(Object):
+
+    depth = Int
+
+
+class Leaf(Object):
+
+    pass
+
+
+class CountingLeaf(Leaf):
+    """ A leaf which counts the lookups of `depth` made on it.
+
+    """
+    counts = List
+
+    def __getattribute__(self, name):
+        if name == 'depth':
+            counts = Object.__getattribute__(self, 'counts')
+            counts.append(name)
+        return Object.__getattribute__(self, name)
+
+
+class TestScopeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Holder()
+        self.middle = Leaf(self.root)
+        self.leaf = Leaf(self.middle)
+        self.cache = ScopeCache()
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def scope(self, obj):
+        return DynamicScope(obj, {}, {}, None, self.cache)
+
+    def test_resolves_ancestor(self):
+        scope = self.scope(self.leaf)
+        self.assertEqual(scope['depth'], 0)
+        self.assertEqual(self.cache._depths, {'depth': 2})
+        self.root.depth = 3
+        self.assertEqual(scope['depth'], 3)
+
+    def test_caches_missing_names(self):
+        scope = self.scope(self.leaf)
+        self.assertRaises(KeyError, scope.__getitem__, 'len')
+        self.assertEqual(self.cache._depths, {'len': -1})
+        self.assertRaises(KeyError, scope.__getitem__, 'len')
+        self.assertFalse('len' in scope)
+
+    def test_reparent_invalidates(self):
+        scope = self.scope(self.leaf)
+        self.assertEqual(scope['depth'], 0)
+        generation = Object.parent_generation()
+        closer = Holder(self.root)
+        closer.depth = 1
+        self.leaf.set_parent(closer)
+        self.assertTrue(Object.parent_generation() > generation)
+        self.assertEqual(scope['depth'], 1)
+        self.assertEqual(self.cache._depths, {'depth': 1})
+
+    def test_reparent_ancestor_after_miss(self):
+        top = Leaf()
+        middle = Leaf(top)
+        leaf = Leaf(middle)
+        scope = self.scope(leaf)
+        try:
+            self.assertRaises(KeyError, scope.__getitem__, 'depth')
+            self.assertEqual(self.cache._depths, {'depth': -1})
+            middle.set_parent(self.root)
+            self.assertEqual(scope['depth'], 0)
+            self.assertEqual(self.cache._depths, {'depth': 2})
+        finally:
+            top.destroy()
+
+    def test_unrelated_reparent_keeps_cache(self):
+        scope = self.scope(self.leaf)
+        self.assertEqual(scope['depth'], 0)
+        other = Leaf()
+        other.set_parent(self.root)
+        depths = self.cache._depths
+        self.assertEqual(scope['depth'], 0)
+        self.assertIs(self.cache._depths, depths)
+        self.assertEqual(depths, {'depth': 2})
+        self.assertEqual(self.cache._generation, Object.parent_generation())
+
+    def test_skips_walk_on_hit(self):
+        leaf = CountingLeaf(self.middle)
+        scope = self.scope(leaf)
+        self.assertEqual(scope['depth'], 0)
+        self.assertEqual(len(leaf.counts), 1)
+        self.assertEqual(scope['depth'], 0)
+        self.assertEqual(len(leaf.counts), 1)
+
+    def test_matches_uncached_scope(self):
+        uncached = DynamicScope(self.leaf, {}, {}, None)
+        cached = self.scope(self.leaf)
+        for name in ('depth', 'name', 'parent', 'missing'):
+            self.assertEqual(name in uncached, name in cached)
+            if name in uncached:
+                self.assertEqual(uncached[name], cached[name])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from threading import Thread
+import types
+import unittest
+
+from traits.api import HasTraits, Int, Bool
+
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.api import InvalidationBatch
+from enaml.core.parser import parse
+
+
+SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Main(Declarative):
+    attr model
+    attr value << model.a if model.flag else model.b
+"""
+
+
+BATCH_SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Main(Declarative):
+    attr model
+    attr log = []
+    attr mixed << model.a + total
+    attr total << log.append((model.a, model.b)) or model.a + model.b
+    attr double << total * 2
+"""
+
+
+class Model(HasTraits):
+
+    a = Int(1)
+
+    b = Int(2)
+
+    flag = Bool(True)
+
+
+def compile_source(source):
+    module = types.ModuleType('__test__')
+    code = EnamlCompiler.compile(parse(source), '__enaml_test__')
+    exec code in module.__dict__
+    return module
+
+
+class TestSubscriptionExpression(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+        self.view = compile_source(SOURCE).Main(model=self.model)
+        self.assertEqual(self.view.value, 1)
+        self.expr = self.view._expressions['value']
+
+    def test_conditional_dependencies(self):
+        model = self.model
+        view = self.view
+        model.flag = False
+        self.assertEqual(view.value, 2)
+        # The `a` edge was detached, the `b` edge is live.
+        model.a = 10
+        model.b = 20
+        self.assertEqual(view.value, 20)
+        model.flag = True
+        self.assertEqual(view.value, 10)
+
+    def test_no_notifier_accumulation(self):
+        model = self.model
+        for i in range(100):
+            model.flag = not model.flag
+            self.view.value
+        # model, model.flag, and model.a or model.b
+        self.assertEqual(self.expr.subscription_count(), 3)
+        notifiers = model._trait('flag', 2)._notifiers(True)
+        self.assertEqual(len(notifiers), 1)
+
+
+class TestInvalidationBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+        self.view = compile_source(BATCH_SOURCE).Main(model=self.model)
+        self.assertEqual(self.view.double, 6)
+        self.assertEqual(self.view.mixed, 4)
+        del self.view.log[:]
+
+    def test_unbatched(self):
+        model = self.model
+        model.a = 10
+        model.b = 20
+        self.assertEqual(self.view.log, [(10, 2), (10, 20)])
+        self.assertEqual(self.view.double, 60)
+
+    def test_batched(self):
+        model = self.model
+        with InvalidationBatch() as batch:
+            model.a = 10
+            model.b = 20
+            self.assertEqual(self.view.log, [])
+        self.assertEqual(self.view.log, [(10, 20)])
+        self.assertEqual(self.view.double, 60)
+        self.assertEqual(self.view.mixed, 40)
+        # total and mixed are refreshed in dependency order, then the
+        # change to total refreshes double in a second round.
+        self.assertEqual(batch.evaluations(), 3)
+
+    def test_nested(self):
+        model = self.model
+        with InvalidationBatch():
+            with InvalidationBatch():
+                model.a = 10
+            model.b = 20
+            self.assertEqual(self.view.log, [])
+        self.assertEqual(self.view.log, [(10, 20)])
+        self.assertIsNone(InvalidationBatch.active_batch())
+
+    def test_thread_local(self):
+        model = self.model
+        seen = []
+        def worker():
+            seen.append(InvalidationBatch.active_batch())
+            model.b = 20
+            seen.append(list(self.view.log))
+        with InvalidationBatch() as batch:
+            thread = Thread(target=worker)
+            thread.start()
+            thread.join()
+            self.assertIs(InvalidationBatch.active_batch(), batch)
+        # The change made on the other thread was not deferred.
+        self.assertIsNone(seen[0])
+        self.assertEqual(seen[1], [(1, 20)])
+
+
+if __name__ == '__main__':
+    unittest.main()
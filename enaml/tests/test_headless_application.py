@@ -0,0 +1,96 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from threading import Thread
+import unittest
+
+from enaml.headless.headless_application import HeadlessApplication
+from enaml.session import Session
+from enaml.session_factory import SessionFactory
+from enaml.widgets.api import Window, Container, Field
+
+
+class FieldSession(Session):
+
+    def on_open(self):
+        window = Window()
+        container = Container(window)
+        self.field = Field(container)
+        self.objects = [window]
+
+
+class TestHeadlessApplication(unittest.TestCase):
+
+    def setUp(self):
+        factory = SessionFactory('field', 'A field', FieldSession)
+        self.app = HeadlessApplication([factory])
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_event_loop_order(self):
+        app = self.app
+        results = []
+        app.timed_call(0, results.append, 'timer')
+        app.deferred_call(results.append, 'first')
+        app.deferred_call(app.deferred_call, results.append, 'next')
+        self.assertEqual(app.process_events(), 3)
+        self.assertEqual(results, ['first', 'timer'])
+        app.process_events()
+        self.assertEqual(results, ['first', 'timer', 'next'])
+
+    def test_timed_call(self):
+        app = self.app
+        results = []
+        app.timed_call(20, results.append, 'later')
+        app.run_until_idle()
+        self.assertEqual(results, [])
+        app.run_until_idle(timeout=1.0)
+        self.assertEqual(results, ['later'])
+
+    def test_start_and_stop(self):
+        app = self.app
+        results = []
+        def worker():
+            results.append(app.is_main_thread())
+            app.deferred_call(results.append, app.is_main_thread)
+            app.timed_call(10, app.stop)
+        app.deferred_call(lambda: 1 / 0)
+        thread = Thread(target=worker)
+        thread.start()
+        app.start()
+        thread.join()
+        self.assertEqual(len(results), 2)
+        self.assertFalse(results[0])
+        self.assertTrue(results[1]())
+
+    def test_session_messages(self):
+        app = self.app
+        session_id = app.start_session('field')
+        field = app.session(session_id).field
+        client = app.client_socket(session_id)
+        received = []
+        client.on_message(lambda *args: received.append(args))
+        field.text = 'hello'
+        app.run_until_idle()
+        self.assertIn((field.object_id, 'set_text', {'text': 'hello'}), received)
+        client.send(field.object_id, 'submit_text', {'text': 'world'})
+        app.run_until_idle()
+        self.assertEqual(field.text, 'world')
+        app.end_session(session_id)
+        self.assertEqual(app._sockets, {})
+
+    def test_client_socket_invalid_session(self):
+        app = self.app
+        with self.assertRaises(ValueError):
+            app.client_socket('unknown')
+        session_id = app.start_session('field')
+        app.end_session(session_id)
+        with self.assertRaises(ValueError):
+            app.client_socket(session_id)
+        self.assertEqual(app._sockets, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import json
+import unittest
+
+from enaml.layout.headless_layout import HeadlessLayout, SizeHintTable
+from enaml.widgets.api import Window, Container, PushButton, Field
+
+
+def snapshot(widget):
+    """ Initialize a widget and snapshot it as a client would see it.
+
+    """
+    widget.initialize()
+    return json.loads(json.dumps(widget.snapshot()))
+
+
+class TestHeadlessLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.window = Window()
+        self.container = Container(self.window)
+        self.button = PushButton(self.container)
+        self.field = Field(self.container)
+        self.hints = SizeHintTable({
+            'PushButton': (80, 30), 'Field': (120, 25),
+        })
+
+    def engine(self):
+        return HeadlessLayout(snapshot(self.window), self.hints)
+
+    def test_layout(self):
+        rects = self.engine().layout((300, 200))
+        self.assertEqual(rects[self.container.object_id], (0, 0, 300, 200))
+        self.assertEqual(rects[self.button.object_id], (10, 10, 280, 30))
+        self.assertEqual(rects[self.field.object_id], (10, 50, 280, 25))
+
+    def test_sizes(self):
+        engine = self.engine()
+        self.assertEqual(engine.min_size(), (140, 85))
+        self.assertEqual(engine.best_size(), (140, 85))
+        self.assertEqual(engine.max_size(), (-1, -1))
+
+    def test_layout_batch(self):
+        engine = self.engine()
+        sizes = [(300, 200), (400, 300), (300, 200)]
+        rects = engine.layout_batch(sizes)
+        self.assertEqual(len(rects), 3)
+        self.assertEqual(rects[0], rects[2])
+        self.assertEqual(rects[1], engine.layout((400, 300)))
+        self.assertEqual(rects[1][self.button.object_id], (10, 10, 380, 30))
+
+    def test_nested_containers(self):
+        shared = Container(self.container, share_layout=True)
+        shared_button = PushButton(shared)
+        inner = Container(self.container)
+        inner_button = PushButton(inner)
+        rects = self.engine().layout((300, 400))
+        # Children are positioned relative to their parent, whether or
+        # not the parent shares its layout.
+        x, y, width, height = rects[shared.object_id]
+        self.assertEqual(rects[shared_button.object_id], (10, 10, 260, 30))
+        self.assertEqual(height, 50)
+        x, y, width, height = rects[inner.object_id]
+        self.assertEqual(
+            rects[inner_button.object_id], (10, 10, width - 20, 30),
+        )
+
+    def test_no_hints(self):
+        engine = HeadlessLayout(snapshot(self.window))
+        rects = engine.layout((300, 200))
+        self.assertEqual(len(rects), 3)
+
+    def test_no_container(self):
+        self.assertRaises(
+            ValueError, HeadlessLayout, snapshot(PushButton()), self.hints,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
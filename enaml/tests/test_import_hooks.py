@@ -2,7 +2,11 @@
 #  Copyright (c) 2011, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+import os
+import shutil
+import struct
 import sys
+import tempfile
 import unittest
 
 from enaml.core import import_hooks
@@ -49,3 +53,165 @@ class TestImportHooks(unittest.TestCase):
         self.assertEquals(counts[importer], 0)
         self.assertEquals(len(meta_path), 0)
 
+
+SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Main(Declarative):
+    attr value = %d
+"""
+
+
+class TestCacheValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'view.enaml')
+        self.write_source(1)
+        self.file_info = import_hooks.make_file_info(self.path)
+        self.importer = import_hooks.EnamlImporter(self.file_info)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write_source(self, value, mtime=1000000000):
+        with open(self.path, 'w') as f:
+            f.write(SOURCE % value)
+        os.utime(self.path, (mtime, mtime))
+
+    def load_value(self):
+        code, path = self.importer.get_code()
+        ns = {}
+        exec code in ns
+        return ns['Main']().value
+
+    def test_timestamp(self):
+        self.importer.compile_source(import_hooks.TIMESTAMP)
+        self.assertTrue(self.importer.is_cache_current())
+        os.utime(self.path, (1000000001, 1000000001))
+        self.assertFalse(self.importer.is_cache_current())
+
+    def test_checked_hash(self):
+        self.importer.compile_source(import_hooks.CHECKED_HASH)
+        os.utime(self.path, (1200000000, 1200000000))
+        self.assertTrue(self.importer.is_cache_current())
+        self.assertTrue(
+            self.importer.is_cache_current(import_hooks.CHECKED_HASH)
+        )
+        self.assertFalse(
+            self.importer.is_cache_current(import_hooks.TIMESTAMP)
+        )
+        self.write_source(2)
+        self.assertFalse(self.importer.is_cache_current())
+        self.assertEqual(self.load_value(), 2)
+
+    def test_unchecked_hash(self):
+        self.importer.compile_source(import_hooks.UNCHECKED_HASH)
+        self.write_source(2, 1200000000)
+        self.assertTrue(self.importer.is_cache_current())
+        self.assertEqual(self.load_value(), 1)
+
+    def test_same_mtime_size_change(self):
+        self.importer.compile_source(import_hooks.TIMESTAMP)
+        self.write_source(10)
+        self.assertFalse(self.importer.is_cache_current())
+        self.assertEqual(self.load_value(), 10)
+
+    def test_old_header_is_stale(self):
+        os.mkdir(self.file_info.cache_dir)
+        with open(self.file_info.cache_path, 'wb') as f:
+            f.write(import_hooks.MAGIC)
+            f.write(struct.pack('i', 2000000000))
+        self.assertFalse(self.importer.is_cache_current())
+        self.assertEqual(self.load_value(), 1)
+        self.assertTrue(self.importer.is_cache_current())
+
+    def test_get_code_uses_validation_mode(self):
+        importer = self.importer
+        importer.cache_validation = import_hooks.CHECKED_HASH
+        self.assertEqual(self.load_value(), 1)
+        self.assertTrue(importer.is_cache_current(import_hooks.CHECKED_HASH))
+        files = os.listdir(self.file_info.cache_dir)
+        self.assertEqual(len(files), 1)
+
+    def test_env_validation_mode(self):
+        old = os.environ.get('ENAML_CACHE_VALIDATION')
+        try:
+            os.environ['ENAML_CACHE_VALIDATION'] = import_hooks.CHECKED_HASH
+            mode = import_hooks.env_validation_mode()
+            self.assertEqual(mode, import_hooks.CHECKED_HASH)
+            os.environ['ENAML_CACHE_VALIDATION'] = 'checked_hash'
+            mode = import_hooks.env_validation_mode()
+            self.assertEqual(mode, import_hooks.TIMESTAMP)
+        finally:
+            if old is None:
+                del os.environ['ENAML_CACHE_VALIDATION']
+            else:
+                os.environ['ENAML_CACHE_VALIDATION'] = old
+
+
+class TestPathIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = import_hooks.PathIndex()
+        self.listdir = os.listdir
+        self.listed = []
+        def listdir(path):
+            self.listed.append(path)
+            return self.listdir(path)
+        import_hooks.os.listdir = listdir
+
+    def tearDown(self):
+        import_hooks.os.listdir = self.listdir
+        shutil.rmtree(self.root)
+
+    def touch(self, *parts):
+        path = os.path.join(self.root, *parts)
+        with open(path, 'w') as f:
+            f.write('')
+        return path
+
+    def bump_mtime(self, path, delta):
+        mtime = os.stat(path).st_mtime + delta
+        os.utime(path, (mtime, mtime))
+
+    def test_negative_lookups_are_cached(self):
+        self.touch('other.py')
+        for i in range(10):
+            self.assertTrue(self.index.find(self.root, 'view') is None)
+        self.assertEqual(self.listed, [self.root])
+
+    def test_source_file(self):
+        path = self.touch('view.enaml')
+        file_info = self.index.find(self.root, 'view')
+        self.assertEqual(file_info.src_path, path)
+
+    def test_new_file_invalidates(self):
+        self.assertTrue(self.index.find(self.root, 'view') is None)
+        self.touch('view.enaml')
+        self.bump_mtime(self.root, 1)
+        self.assertTrue(self.index.find(self.root, 'view') is not None)
+
+    def test_cache_only_module(self):
+        path = os.path.join(self.root, 'view.enaml')
+        file_info = import_hooks.make_file_info(path)
+        os.mkdir(file_info.cache_dir)
+        self.assertTrue(self.index.find(self.root, 'view') is None)
+        cache_name = os.path.basename(file_info.cache_path)
+        self.touch(import_hooks.CACHEDIR, cache_name)
+        self.bump_mtime(file_info.cache_dir, 1)
+        self.assertEqual(self.index.find(self.root, 'view'), file_info)
+
+    def test_missing_directory(self):
+        missing = os.path.join(self.root, 'missing')
+        self.assertTrue(self.index.find(missing, 'view') is None)
+        self.assertEqual(self.listed, [])
+
+    def test_locate_module(self):
+        self.touch('view.enaml')
+        importer = import_hooks.EnamlImporter
+        self.assertTrue(importer.locate_module('pkg.view', [self.root]))
+        missing = importer.locate_module('pkg.nope', [self.root])
+        self.assertTrue(missing is None)
+        self.assertTrue(importer.locate_module('pkg.view') is None)
@@ -0,0 +1,95 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.layout.layout_helpers import (
+    DeferredConstraintsFunction, expand_constraints, grid, hbox, spacer,
+    vbox,
+)
+from enaml.widgets.api import Container, Field, Form, Label
+
+
+class TestHelperCache(unittest.TestCase):
+
+    def setUp(self):
+        self.container = Container()
+        self.fields = [Field(self.container) for i in range(4)]
+
+    def expand(self, cns):
+        return list(expand_constraints(self.container, cns))
+
+    def test_unchanged_helper_is_cached(self):
+        first, second, third, fourth = self.fields
+        helper = grid([first, second], [third, fourth])
+        cns = self.expand([helper])
+        calls = []
+        helper._get_constraints = lambda component: calls.append(component)
+        again = self.expand([helper])
+        self.assertEqual(calls, [])
+        self.assertEqual(len(again), len(cns))
+        self.assertTrue(all(a is b for a, b in zip(cns, again)))
+
+    def test_nested_helpers_are_cached(self):
+        first, second, third, fourth = self.fields
+        inner = hbox(second, spacer, third)
+        helper = vbox(first, inner, fourth)
+        cns = self.expand([helper])
+        self.assertTrue(inner._constraints_cache is None)
+        again = self.expand([helper])
+        self.assertTrue(all(a is b for a, b in zip(cns, again)))
+        inner | 'weak'
+        weak = self.expand([helper])
+        self.assertFalse(all(a is b for a, b in zip(cns, weak)))
+
+    def test_config_change_invalidates(self):
+        first, second, third, fourth = self.fields
+        helper = hbox(first, second)
+        cns = self.expand([helper])
+        helper.spacing = 20
+        again = self.expand([helper])
+        self.assertEqual(len(again), len(cns))
+        self.assertFalse(any(a is b for a, b in zip(cns, again)))
+        helper | 'strong'
+        strong = self.expand([helper])
+        self.assertTrue(all(cn.strength == 'strong' for cn in strong))
+
+    def test_component_change_invalidates(self):
+        first, second, third, fourth = self.fields
+        helper = hbox(first, second)
+        cns = self.expand([helper])
+        other = list(expand_constraints(Container(), [helper]))
+        self.assertFalse(any(a is b for a, b in zip(cns, other)))
+
+    def test_function_is_not_cached(self):
+        calls = []
+        def func():
+            calls.append(None)
+            return []
+        helper = DeferredConstraintsFunction(func)
+        self.expand([helper])
+        self.expand([helper])
+        self.assertEqual(len(calls), 2)
+
+    def test_default_constraints_are_reused(self):
+        container = self.container
+        cns = container._collect_constraints()
+        self.assertTrue(cns[0] is container._collect_constraints()[0])
+        Field(container)
+        self.assertFalse(cns[0] is container._collect_constraints()[0])
+
+    def test_form_constraints_are_reused(self):
+        form = Form()
+        Label(form)
+        Field(form)
+        cns = form._collect_constraints()
+        again = form._collect_constraints()
+        self.assertTrue(all(a is b for a, b in zip(cns, again)))
+        form.layout_strength = 'weak'
+        again = form._collect_constraints()
+        self.assertFalse(cns[0] is again[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
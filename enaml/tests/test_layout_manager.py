@@ -0,0 +1,175 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from casuarius import CassowaryError, ConstraintVariable
+
+from enaml.layout.layout_manager import LayoutManager
+from enaml.layout.layout_stats import LayoutStats
+
+
+class TestLayoutCache(unittest.TestCase):
+
+    def setUp(self):
+        self.width = ConstraintVariable('width')
+        self.height = ConstraintVariable('height')
+        self.child = ConstraintVariable('child')
+        self.half = self.child == 0.5 * self.width
+        self.manager = LayoutManager(cache_size=2)
+        self.manager.initialize([
+            self.width >= 0, self.height >= 0, self.half,
+        ])
+        self.solved = []
+        self.replayed = []
+
+    def solve(self):
+        value = self.child.value
+        self.solved.append(value)
+        return value
+
+    def layout(self, size):
+        self.manager.layout(
+            self.solve, self.width, self.height, size,
+            replay=self.replayed.append,
+        )
+
+    def test_repeated_size_is_replayed(self):
+        self.layout((100, 50))
+        self.layout((100, 50))
+        self.assertEqual(self.solved, [50.0])
+        self.assertEqual(self.replayed, [50.0])
+
+    def test_least_recently_used_is_evicted(self):
+        self.layout((100, 50))
+        self.layout((200, 50))
+        self.layout((100, 50))
+        self.layout((300, 50))
+        # (200, 50) was the least recently used layout.
+        self.layout((200, 50))
+        self.layout((300, 50))
+        self.assertEqual(self.solved, [50.0, 100.0, 150.0, 100.0])
+        self.assertEqual(self.replayed, [50.0, 150.0])
+
+    def test_replace_constraints_invalidates(self):
+        generation = self.manager.generation
+        self.layout((100, 50))
+        third = self.child == 0.25 * self.width
+        self.manager.replace_constraints([self.half], [third])
+        self.assertEqual(self.manager.generation, generation + 1)
+        self.layout((100, 50))
+        self.assertEqual(self.solved, [50.0, 25.0])
+        self.assertEqual(self.replayed, [])
+
+    def test_no_replay_disables_cache(self):
+        for i in range(2):
+            self.manager.layout(
+                self.solve, self.width, self.height, (100, 50),
+            )
+        self.assertEqual(self.solved, [50.0, 50.0])
+
+
+class TestSizeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.width = ConstraintVariable('width')
+        self.height = ConstraintVariable('height')
+        self.min_width = self.width >= 100
+        self.manager = LayoutManager()
+        self.manager.initialize([
+            self.min_width, self.width <= 400, self.height >= 50,
+        ])
+
+    def test_sizes_are_memoized(self):
+        manager = self.manager
+        for i in range(3):
+            self.assertEqual(
+                manager.get_min_size(self.width, self.height), (100, 50),
+            )
+            self.assertEqual(
+                manager.get_max_size(self.width, self.height), (400, -1),
+            )
+        self.assertEqual((manager.size_hits, manager.size_misses), (4, 2))
+
+    def test_replace_constraints_invalidates(self):
+        manager = self.manager
+        manager.get_min_size(self.width, self.height)
+        manager.replace_constraints([self.min_width], [self.width >= 200])
+        size = manager.get_min_size(self.width, self.height)
+        self.assertEqual(size, (200, 50))
+        self.assertEqual((manager.size_hits, manager.size_misses), (0, 2))
+
+
+class TestLayoutStats(unittest.TestCase):
+
+    def setUp(self):
+        self.width = ConstraintVariable('width')
+        self.height = ConstraintVariable('height')
+        self.child = ConstraintVariable('child')
+        self.stats = LayoutStats('test')
+        self.manager = LayoutManager(stats=self.stats)
+        self.min_width = self.width >= 100
+        self.manager.initialize([
+            self.min_width, self.height >= 0, self.child == self.width - 10,
+        ])
+
+    def test_counts(self):
+        report = self.stats.report()
+        self.assertEqual(report['name'], 'test')
+        self.assertEqual(report['constraints'], 3)
+        self.assertEqual(report['variables'], 3)
+        self.manager.replace_constraints([self.min_width], [])
+        report = self.stats.report()
+        self.assertEqual(report['constraints'], 2)
+        self.assertEqual(report['variables'], 3)
+
+    def test_timings(self):
+        manager = self.manager
+        manager.layout(
+            lambda: 1, self.width, self.height, (200, 100),
+            replay=lambda result: None,
+        )
+        manager.layout(
+            lambda: 1, self.width, self.height, (200, 100),
+            replay=lambda result: None,
+        )
+        manager.get_min_size(self.width, self.height)
+        manager.get_max_size(self.width, self.height)
+        timings = self.stats.report()['timings']
+        self.assertEqual(
+            sorted(timings),
+            ['initialize', 'max_size', 'min_size', 'replay', 'solve'],
+        )
+        self.assertEqual(timings['solve']['calls'], 1)
+        self.assertEqual(timings['replay']['calls'], 1)
+
+    def test_pass_counts(self):
+        stats = self.stats
+        for moved in (3, 0, 1):
+            stats.add_count('moved', moved)
+        count = stats.report()['counts']['moved']
+        self.assertEqual(count['passes'], 3)
+        self.assertEqual(count['total'], 4)
+        self.assertEqual(count['max'], 3)
+        stats.reset()
+        self.assertEqual(stats.report()['counts'], {})
+
+    def test_conflict(self):
+        unrelated = self.height >= 10
+        self.manager.replace_constraints([], [unrelated])
+        conflict = self.child <= 50
+        self.assertRaises(
+            CassowaryError, self.manager.replace_constraints, [], [conflict],
+        )
+        conflicts = self.stats.report()['conflicts']
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['phase'], 'replace')
+        involved = conflicts[0]['constraints']
+        self.assertTrue(repr(self.min_width) in involved)
+        self.assertTrue(repr(conflict) in involved)
+        self.assertFalse(repr(unrelated) in involved)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.application import Application
+from enaml.layout.layout_stats import LayoutStats
+from enaml.session import Session
+from enaml.socket_interface import ActionSocketInterface
+
+
+class RecordingSocket(object):
+    """ An action socket which records the messages sent on it.
+
+    """
+    def __init__(self):
+        self.sent = []
+
+    def on_message(self, callback):
+        pass
+
+    def send(self, object_id, action, content):
+        self.sent.append((object_id, action, content))
+
+    def send_binary(self, object_id, action, content, buffers):
+        content = dict(content)
+        content['buffers'] = list(buffers)
+        self.sent.append((object_id, action, content))
+
+
+ActionSocketInterface.register(RecordingSocket)
+
+
+class ManualApplication(Application):
+    """ An application which runs deferred calls on demand.
+
+    """
+    def __init__(self):
+        super(ManualApplication, self).__init__([])
+        self.calls = []
+
+    def socket(self, session_id):
+        return RecordingSocket()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def deferred_call(self, callback, *args, **kwargs):
+        self.calls.append((callback, args, kwargs))
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        self.calls.append((callback, args, kwargs))
+
+    def is_main_thread(self):
+        return True
+
+    def process_events(self):
+        while self.calls:
+            callback, args, kwargs = self.calls.pop(0)
+            callback(*args, **kwargs)
+
+
+class EmptySession(Session):
+
+    def on_open(self):
+        pass
+
+
+class TestSessionCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ManualApplication()
+        self.socket = RecordingSocket()
+        self.session = EmptySession()
+        self.session.open('s_0', self.socket)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_uncoalesced_by_default(self):
+        session = self.session
+        session.send('o_1', 'set_value', {'value': 1})
+        session.send('o_1', 'set_value', {'value': 2})
+        self.assertEqual(len(self.socket.sent), 2)
+
+    def test_last_write_wins(self):
+        session = self.session
+        session.coalesce_actions = True
+        for value in range(100):
+            session.send('o_1', 'set_value', {'value': value})
+        self.assertEqual(self.socket.sent, [])
+        self.app.process_events()
+        self.assertEqual(self.socket.sent, [('o_1', 'set_value', {'value': 99})])
+
+    def test_order_preserved(self):
+        session = self.session
+        session.coalesce_actions = True
+        session.send('o_1', 'set_value', {'value': 1})
+        session.send('o_2', 'set_text', {'text': 'a'})
+        session.send('o_1', 'set_value', {'value': 2})
+        session.send('o_3', 'focus', {})
+        expected = [
+            ('o_1', 'set_value', {'value': 2}),
+            ('o_2', 'set_text', {'text': 'a'}),
+            ('o_3', 'focus', {}),
+        ]
+        self.assertEqual(self.socket.sent, expected)
+        self.app.process_events()
+        self.assertEqual(self.socket.sent, expected)
+
+    def test_batch_action_after_updates(self):
+        session = self.session
+        session.coalesce_actions = True
+        session.send('o_1', 'set_text', {'text': 'a'})
+        session.send('o_2', 'set_text', {'text': 'b'})
+        session.send('o_3', 'relayout', {})
+        session.send('o_1', 'set_text', {'text': 'c'})
+        self.app.process_events()
+        actions = [(oid, action) for oid, action, content in self.socket.sent]
+        self.assertEqual(actions, [
+            ('o_1', 'set_text'), ('o_2', 'set_text'),
+            ('o_1', 'set_text'), ('s_0', 'message_batch'),
+        ])
+        self.assertEqual(self.socket.sent[2][2], {'text': 'c'})
+
+    def test_binary_coalesced(self):
+        session = self.session
+        session.coalesce_actions = True
+        frames = [bytearray(16) for i in range(3)]
+        for frame in frames:
+            session.send('o_1', 'set_image', {'image': {}}, [frame])
+        self.app.process_events()
+        self.assertEqual(len(self.socket.sent), 1)
+        object_id, action, content = self.socket.sent[0]
+        self.assertIs(content['buffers'][0], frames[-1])
+
+
+class TestSessionBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ManualApplication()
+        self.socket = RecordingSocket()
+        self.session = EmptySession()
+        self.session.open('s_0', self.socket)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_buffers_by_reference(self):
+        frame = bytearray('\x00' * 64)
+        self.session.send('o_1', 'set_image', {'image': {}}, [frame])
+        object_id, action, content = self.socket.sent[0]
+        self.assertEqual(action, 'set_image')
+        self.assertIs(content['buffers'][0], frame)
+
+
+class TextSocket(ActionSocketInterface):
+    """ An action socket which does not support binary data.
+
+    """
+    def __init__(self):
+        self.sent = []
+
+    def on_message(self, callback):
+        pass
+
+    def send(self, object_id, action, content):
+        self.sent.append((object_id, action, content))
+
+
+class TestSendBinaryFallback(unittest.TestCase):
+
+    def test_base64_fallback(self):
+        socket = TextSocket()
+        content = {'image': {}}
+        socket.send_binary('o_1', 'set_image', content, [bytearray('abc')])
+        object_id, action, sent = socket.sent[0]
+        self.assertEqual(action, 'set_image')
+        self.assertEqual(sent['buffers'], ['YWJj'])
+        self.assertEqual(sent['buffer_encoding'], 'base64')
+        self.assertNotIn('buffers', content)
+
+
+class TestSessionBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ManualApplication()
+        self.socket = RecordingSocket()
+        self.session = EmptySession()
+        self.session.open('s_0', self.socket)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def batches(self):
+        return [
+            content['batch'] for object_id, action, content in
+            self.socket.sent if action == 'message_batch'
+        ]
+
+    def test_single_flush(self):
+        session = self.session
+        session.send('o_1', 'children_changed', {})
+        session.send('o_2', 'relayout', {})
+        session.send('o_1', 'relayout', {})
+        self.assertEqual(len(self.app.calls), 1)
+        self.app.process_events()
+        self.assertEqual(len(self.batches()), 1)
+        self.assertEqual(len(self.batches()[0]), 3)
+
+    def test_max_latency(self):
+        session = self.session
+        session._batch.max_latency = 50
+        session.send('o_1', 'relayout', {})
+        session.send('o_2', 'relayout', {})
+        self.assertEqual(len(self.app.calls), 2)
+        self.app.process_events()
+        session.send('o_3', 'relayout', {})
+        self.app.process_events()
+        self.assertEqual([len(b) for b in self.batches()], [2, 1])
+
+    def test_stats(self):
+        stats = LayoutStats('session')
+        self.session._batch.stats = stats
+        for idx in range(4):
+            self.session.send('o_%d' % idx, 'relayout', {})
+        self.app.process_events()
+        self.session.send('o_1', 'destroy', {})
+        self.app.process_events()
+        report = stats.report()
+        self.assertEqual(report['counts']['batch_size']['total'], 5)
+        self.assertEqual(report['counts']['batch_size']['max'], 4)
+        self.assertEqual(report['timings']['flush_latency']['calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
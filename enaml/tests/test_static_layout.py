@@ -0,0 +1,117 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import json
+import unittest
+
+from enaml.layout.headless_layout import HeadlessLayout, SizeHintTable
+from enaml.layout.layout_helpers import align, hbox, vbox
+from enaml.layout.static_layout import StaticLayout, export_static_layout
+from enaml.widgets.api import Window, Container, PushButton, Field
+
+
+def snapshot(widget):
+    """ Initialize a widget and snapshot it as a client would see it.
+
+    """
+    widget.initialize()
+    return json.loads(json.dumps(widget.snapshot()))
+
+
+class TestStaticLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.window = Window()
+        self.container = Container(self.window)
+        self.button = PushButton(self.container)
+        self.field = Field(self.container)
+        self.other = Field(self.container)
+        self.hints = SizeHintTable({
+            'PushButton': (80, 30), 'Field': (120, 25),
+        })
+
+    def check(self, sizes):
+        tree = snapshot(self.window)
+        info = json.loads(json.dumps(
+            export_static_layout(tree, self.hints, extent=512),
+        ))
+        engine = HeadlessLayout(tree, self.hints)
+        ids = engine.layout_table()
+        static = StaticLayout(info)
+        self.assertEqual(static.count, len(ids))
+        self.assertEqual(static.min_size, engine.min_size())
+        self.assertEqual(static.best_size, engine.best_size())
+        for size in sizes:
+            rects = engine.layout(size)
+            geometry = static.geometry(*size)
+            for idx, object_id in enumerate(ids):
+                expected = rects[object_id]
+                actual = tuple(geometry[4 * idx:4 * idx + 4])
+                for a, b in zip(expected, actual):
+                    self.assertAlmostEqual(a, b, delta=0.5)
+        return info
+
+    def test_default_layout(self):
+        self.check([(200, 105), (300, 200), (451, 333), (800, 600)])
+
+    def test_piecewise_layout(self):
+        button, field, other = self.button, self.field, self.other
+        self.container.constraints = [
+            vbox(hbox(button, field), other),
+            align('v_center', button, field),
+            field.width <= 200,
+        ]
+        info = self.check([(230, 85), (300, 100), (317, 250), (700, 400)])
+        # The field stops growing at a width of 200.
+        self.assertTrue(len(info['width']['breaks']) > 2)
+
+    def test_under_determined(self):
+        button, field, other = self.button, self.field, self.other
+        # The vertical position of the field in the row is not fixed.
+        self.container.constraints = [
+            vbox(hbox(button, field), other),
+        ]
+        tree = snapshot(self.window)
+        self.assertRaises(
+            ValueError, export_static_layout, tree, self.hints, extent=512,
+        )
+
+    def test_extrapolation(self):
+        self.check([(3000, 2000)])
+
+    def test_not_separable(self):
+        container, button = self.container, self.button
+        button.hug_height = 'weak'
+        container.constraints = [
+            vbox(button, self.field, self.other),
+            button.height >= 0.1 * container.width,
+        ]
+        tree = snapshot(self.window)
+        self.assertRaises(
+            ValueError, export_static_layout, tree, self.hints, extent=512,
+        )
+
+    def test_layout_info(self):
+        container = self.container
+        tree = snapshot(self.window)
+        info = export_static_layout(tree, self.hints, extent=512)
+        self.assertEqual(info['signature'], ['PushButton', 'Field', 'Field'])
+        container.static_layout = info
+        self.assertEqual(container._layout_info()['static_layout'], info)
+
+    def test_signature_mismatch(self):
+        container = self.container
+        tree = snapshot(self.window)
+        info = export_static_layout(tree, self.hints, extent=512)
+        container.static_layout = info
+        # An edited view with the same number of widgets.
+        self.other.set_parent(None)
+        PushButton(container)
+        self.assertIsNone(container._layout_info()['static_layout'])
+        container.static_layout = {'count': 3}
+        self.assertIsNone(container._layout_info()['static_layout'])
+
+
+if __name__ == '__main__':
+    unittest.main()
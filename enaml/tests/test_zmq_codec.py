@@ -0,0 +1,131 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import json
+from unittest import TestCase, main, skipUnless
+
+from enaml.zeromq import zmq_codec
+from enaml.zeromq.zmq_codec import (
+    CodecTable, JSONCodec, CODECS, PREFERRED_CODECS, json_header,
+    negotiate_codec,
+)
+
+
+CONTENT = {
+    'object_id': 'o_12',
+    'action': 'set_text',
+    'content': {
+        'text': u'h\xe9llo',
+        'values': [0, 1, -1, -32, -33, 127, 128, 2 ** 40, 1.5],
+        'flags': [True, False, None],
+        'bases': [u'Label', u'Control', u'Widget'],
+        'items': range(20),
+    },
+}
+
+
+@skipUnless(zmq_codec.msgpack is not None, 'msgpack is not installed')
+class TestMsgPackCodec(TestCase):
+
+    def test_round_trip(self):
+        codec = zmq_codec.MsgPackCodec()
+        data = codec.encode(CONTENT)
+        self.assertEqual(codec.decode(data), CONTENT)
+        self.assertTrue(len(data) < len(json.dumps(CONTENT)))
+
+    def test_preferred(self):
+        self.assertEqual(PREFERRED_CODECS[0], 'msgpack')
+
+
+class TestNegotiation(TestCase):
+
+    def test_default_is_json(self):
+        self.assertIsInstance(negotiate_codec(None), JSONCodec)
+        self.assertIsInstance(negotiate_codec(['unknown']), JSONCodec)
+
+    def test_preferred(self):
+        codec = negotiate_codec(['unknown', 'json'])
+        self.assertIsInstance(codec, JSONCodec)
+        codec = negotiate_codec(list(CODECS))
+        self.assertEqual(codec.name, PREFERRED_CODECS[0])
+
+    def test_json_header(self):
+        header = {'msg_type': 'discover', 'codecs': ['json']}
+        self.assertEqual(json_header(JSONCodec().encode(header)), header)
+        self.assertIsNone(json_header('{not json'))
+        self.assertIsNone(json_header('[1, 2]'))
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCodecTable(TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.table = CodecTable(idle_timeout=10.0, clock=self.clock)
+
+    def handshake(self, codecs):
+        return json.dumps({'msg_type': 'discover', 'codecs': codecs})
+
+    def test_negotiation(self):
+        table = self.table
+        codec, handshake = table.lookup('a', self.handshake(list(CODECS)))
+        self.assertTrue(handshake)
+        self.assertEqual(codec.name, PREFERRED_CODECS[0])
+        header = codec.encode({'msg_type': 'snapshot'})
+        same, handshake = table.lookup('a', header)
+        self.assertIs(same, codec)
+        self.assertFalse(handshake)
+        self.assertEqual(len(table), 1)
+
+    def test_reconnect_resets_codec(self):
+        table = self.table
+        first, handshake = table.lookup('a', self.handshake(['json']))
+        second, handshake = table.lookup('a', self.handshake(['json']))
+        self.assertTrue(handshake)
+        self.assertIsNot(first, second)
+
+    def test_json_without_handshake(self):
+        codec, handshake = self.table.lookup('a', '{"msg_type": "x"}')
+        self.assertTrue(handshake)
+        self.assertIsInstance(codec, JSONCodec)
+
+    def test_unknown_client(self):
+        self.assertRaises(ValueError, self.table.lookup, 'a', '\x82\xa1a')
+        self.assertEqual(len(self.table), 0)
+
+    def test_idle_clients_expire(self):
+        table = self.table
+        table.lookup('a', self.handshake(['json']))
+        self.clock.now = 6.0
+        table.lookup('b', self.handshake(['json']))
+        self.clock.now = 12.0
+        self.assertEqual(table.expire(), ['a'])
+        self.assertEqual(len(table), 1)
+        # A message from a client keeps it alive.
+        table.lookup('b', '{}')
+        self.clock.now = 20.0
+        self.assertEqual(table.expire(), [])
+        self.clock.now = 30.0
+        self.assertEqual(table.expire(), ['b'])
+        self.assertEqual(len(table), 0)
+
+    def test_discard(self):
+        table = self.table
+        table.lookup('a', self.handshake(['json']))
+        table.discard('a')
+        table.discard('a')
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.expire(), [])
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,10 @@
 #------------------------------------------------------------------------------
 from traits.api import Property, Enum, Instance, List
 
-from enaml.application import Application, ScheduledTask
+from enaml.application import Application
 from enaml.layout.ab_constrainable import ABConstrainable
 from enaml.layout.box_model import BoxModel
+from enaml.layout.constraint_encoding import encode_constraints
 from enaml.layout.layout_helpers import expand_constraints
 
 from .widget_component import WidgetComponent
@@ -102,8 +103,11 @@ class ConstraintsWidget(WidgetComponent):
     #: The default is 'strong' for height.
     resist_height = PolicyEnum('strong')
 
-    #: The private application task used to collapse layout messages.
-    _layout_task = Instance(ScheduledTask)
+    #: An optional enaml.layout.layout_stats.LayoutStats instance. If
+    #: it is set on this class, it collects the time spent collecting,
+    #: expanding, and encoding the constraints of every widget. This is
+    #: a plain class attribute, not a trait.
+    layout_stats = None
 
     #: The private storage the box model instance for this component.
     _box_model = Instance(BoxModel)
@@ -163,15 +167,13 @@ class ConstraintsWidget(WidgetComponent):
         if app is None:
             self.send_action('relayout', self._layout_info())
         else:
-            task = self._layout_task
-            if task is None:
-                def notifier(ignored):
-                    self._layout_task = None
-                def layout_task():
-                    self.send_action('relayout', self._layout_info())
-                task = app.schedule(layout_task)
-                task.notify(notifier)
-                self._layout_task = task
+            app.schedule(self._relayout_task, key=(self, 'relayout'))
+
+    def _relayout_task(self):
+        """ The scheduled task which sends the 'relayout' action.
+
+        """
+        self.send_action('relayout', self._layout_info())
 
     #--------------------------------------------------------------------------
     # Constraints Generation
@@ -197,22 +199,30 @@ class ConstraintsWidget(WidgetComponent):
         return info
 
     def _generate_constraints(self):
-        """ Creates a list of constraint info dictionaries.
+        """ Creates the encoded constraint info for the widget.
 
         This method converts the list of symbolic constraints returned
-        by the call to '_collect_constraints' into a list of constraint
-        info dictionaries which can be serialized and sent to clients.
+        by the call to '_collect_constraints' into the flat encoding
+        of enaml.layout.constraint_encoding, which can be serialized
+        and sent to clients.
 
         Returns
         -------
-        result : list of dicts
-            A list of dictionaries which are serializable versions of
-            the symbolic constraints defined for the widget.
+        result : dict
+            The serializable encoding of the symbolic constraints
+            defined for the widget.
 
         """
-        cns = self._collect_constraints()
-        cns = [cn.as_dict() for cn in expand_constraints(self, cns)]
-        return cns
+        stats = self.layout_stats
+        if stats is None:
+            cns = self._collect_constraints()
+            return encode_constraints(expand_constraints(self, cns))
+        with stats.timer('collect'):
+            cns = self._collect_constraints()
+        with stats.timer('expand'):
+            cns = list(expand_constraints(self, cns))
+        with stats.timer('encode'):
+            return encode_constraints(cns)
 
     def _collect_constraints(self):
         """ Creates a list of symbolic constraints for the component.
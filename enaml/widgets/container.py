@@ -2,16 +2,21 @@
 #  Copyright (c) 2011, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Property, Instance, Bool, cached_property
+from collections import deque
+import logging
+
+from traits.api import Property, Instance, Bool, Any, cached_property
 
 from enaml.core.trait_types import CoercingInstance
 from enaml.layout.box_model import ContentsBoxModel
 from enaml.layout.geometry import Box
-from enaml.layout.layout_helpers import vbox
+from enaml.layout.layout_helpers import DefaultSpacing, vbox
 
 from .constraints_widget import ConstraintsWidget, get_from_box_model
 
 
+logger = logging.getLogger(__name__)
+
 class Container(ConstraintsWidget):
     """ A ConstraintsWidget subclass that provides functionality for
     laying out constrainable children according to their system of
@@ -78,6 +83,15 @@ class Container(ConstraintsWidget):
     #: margin than what is specified by the padding.
     padding = CoercingInstance(Box, (10, 10, 10, 10))
 
+    #: An optional precomputed layout for the container, as created by
+    #: enaml.layout.static_layout.export_static_layout. When given, the
+    #: client applies this layout instead of building a constraints
+    #: solver for the container. It should only be used when the
+    #: constraints of the container and its children never change. It
+    #: is not sent to the client if its signature does not match the
+    #: widgets of the container, so that the client solves the layout.
+    static_layout = Any
+
     #: A read only property which returns this container's widgets.
     widgets = Property(depends_on='children')
 
@@ -93,6 +107,12 @@ class Container(ConstraintsWidget):
     def __box_model_default(self):
         return ContentsBoxModel(self.object_id)
 
+    #: The private cache of the default vbox helper, stored as a tuple
+    #: of (widgets, spacing, helper). The helper is reused as long as
+    #: the widgets and the default spacing are unchanged, so that its
+    #: expanded constraints are cached between relayouts.
+    _default_helper = Any
+
     #--------------------------------------------------------------------------
     # Initialization
     #--------------------------------------------------------------------------
@@ -101,7 +121,9 @@ class Container(ConstraintsWidget):
 
         """
         super(Container, self).bind()
-        self.on_trait_change(self._send_relayout, 'share_layout, padding')
+        self.on_trait_change(
+            self._send_relayout, 'share_layout, padding, static_layout',
+        )
 
     #--------------------------------------------------------------------------
     # Constraints Generation
@@ -114,15 +136,55 @@ class Container(ConstraintsWidget):
         layout = super(Container, self)._layout_info()
         layout['share_layout'] = self.share_layout
         layout['padding'] = self.padding
+        layout['static_layout'] = self._checked_static_layout()
         return layout
 
+    def _checked_static_layout(self):
+        """ Get the static layout if it matches the layout table.
+
+        """
+        static = self.static_layout
+        if static is None:
+            return None
+        signature = self._layout_signature()
+        if static.get('signature') != signature:
+            msg = ('The static layout of %s:%s does not match its widgets '
+                   'and is ignored.')
+            logger.warn(msg % (self.class_name, self.object_id))
+            return None
+        return static
+
+    def _layout_signature(self):
+        """ Get the class names of the widgets in the layout table.
+
+        The widgets are visited in the breadth first order of the layout
+        table of a client container, including the children of nested
+        containers which share their layout.
+
+        """
+        signature = []
+        queue = deque(self.children)
+        while queue:
+            child = queue.popleft()
+            if isinstance(child, ConstraintsWidget):
+                signature.append(child.class_name)
+                if isinstance(child, Container) and child.share_layout:
+                    queue.extend(child.children)
+        return signature
+
     def _default_constraints(self):
         """ Supplies a default vbox constraint to the constraints
         children of the container if other constraints are not given.
 
         """
         cns = super(Container, self)._default_constraints()
-        cns.append(vbox(*self.widgets))
+        widgets = self.widgets
+        spacing = (DefaultSpacing.ABUTMENT, DefaultSpacing.BOX_MARGINS)
+        cached = self._default_helper
+        if cached is None or cached[0] is not widgets or cached[1] != spacing:
+            cached = (widgets, spacing, vbox(*widgets))
+            self._default_helper = cached
+        cns.append(cached[2])
         return cns
 
     #--------------------------------------------------------------------------
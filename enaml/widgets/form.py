@@ -2,10 +2,10 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Instance, Str
+from traits.api import Any, Instance, Str
 
 from enaml.layout.constraint_variable import ConstraintVariable
-from enaml.layout.layout_helpers import align, hbox, vbox
+from enaml.layout.layout_helpers import DefaultSpacing, align, hbox, vbox
 
 from .container import  Container
 
@@ -38,10 +38,33 @@ class Form(Container):
     #: the height is desired.
     hug_height = 'strong'
 
+    #: The private cache of the form constraints, stored as a tuple of
+    #: (widgets, config, constraints). The constraints are reused as
+    #: long as the widgets and the config are unchanged, so that the
+    #: expanded constraints of the helpers are cached between relayouts.
+    _form_constraints = Any
+
     def _component_constraints(self):
         """ Supplies the constraints which layout the children in a
         two column form.
 
+        """
+        widgets = self.widgets
+        config = (
+            self.layout_strength, DefaultSpacing.ABUTMENT,
+            DefaultSpacing.ALIGNMENT, DefaultSpacing.BOX_MARGINS,
+        )
+        cached = self._form_constraints
+        if cached is None or cached[0] is not widgets or cached[1] != config:
+            cns = self._make_form_constraints()
+            cached = (widgets, config, cns)
+            self._form_constraints = cached
+        return list(cached[2])
+
+    def _make_form_constraints(self):
+        """ Creates the constraints which layout the children in a two
+        column form.
+
         """
         # FIXME: do something sensible when children are not visible.
         children = list(self.widgets)
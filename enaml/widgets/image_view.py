@@ -42,7 +42,8 @@ class ImageView(Control):
         snap['scale_to_fit'] = self.scale_to_fit
         snap['preserve_aspect_ratio'] = self.preserve_aspect_ratio
         snap['allow_upscaling'] = self.allow_upscaling
-        snap['image'] = self.image.as_dict()
+        image = self.image
+        snap['image'] = image.as_dict() if image is not None else None
         return snap
 
     def bind(self):
@@ -60,8 +61,16 @@ class ImageView(Control):
     # Message Handling
     #--------------------------------------------------------------------------
     def _send_image(self):
-        """ Sends the image data, encoded in a base64 format
+        """ Sends the image to the client.
+
+        The image data is sent on the binary channel of the socket,
+        which avoids a base64 encoded copy of the data.
 
         """
-        return
+        image = self.image
+        if image is None:
+            self.send_action('set_image', {'image': None})
+        else:
+            image_dict, buffers = image.as_binary()
+            self.send_action('set_image', {'image': image_dict}, buffers)
 
@@ -2,58 +2,13 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from casuarius import ConstraintVariable
+from enaml.layout.layout_box import (
+    LayoutBox, hard_constraints, size_hint_constraints
+)
 
 from .wx_widget_component import WxWidgetComponent
 
 
-class LayoutBox(object):
-    """ A class which encapsulates a layout box using casuarius
-    constraint variables.
-
-    The constraint variables are created on an as-needed basis, this
-    allows Enaml widgets to define new constraints and build layouts
-    with them, without having to specifically update this client
-    code.
-
-    """
-    def __init__(self, name, owner):
-        """ Initialize a LayoutBox.
-
-        Parameters
-        ----------
-        name : str
-            A name to use in the label for the constraint variables in
-            this layout box.
-
-        owner : str
-            The owner id to use in the label for the constraint variables
-            in this layout box.
-
-        """
-        self._name = name
-        self._owner = owner
-        self._primitives = {}
-
-    def primitive(self, name):
-        """ Returns a primitive casuarius constraint variable for the
-        given name.
-
-        Parameters
-        ----------
-        name : str
-            The name of the constraint variable to return.
-
-        """
-        primitives = self._primitives
-        if name in primitives:
-            res = primitives[name]
-        else:
-            label = '{0}|{1}|{2}'.format(self._name, self._owner, name)
-            res = primitives[name] = ConstraintVariable(label)
-        return res
-
-
 class WxConstraintsWidget(WxWidgetComponent):
     """ A Wx implementation of an Enaml ConstraintsWidget.
 
@@ -75,9 +30,9 @@ class WxConstraintsWidget(WxWidgetComponent):
     #: be called to trigger an appropriate relayout of the widget.
     _size_hint_cns = []
 
-    #: The list of constraint dictionaries defined by the user on
-    #: the server side Enaml widget.
-    _user_cns = []
+    #: The encoded constraints defined by the user on the server side
+    #: Enaml widget. See enaml.layout.constraint_encoding.
+    _user_cns = None
 
     #--------------------------------------------------------------------------
     # Setup Methods
@@ -188,31 +143,15 @@ class WxConstraintsWidget(WxWidgetComponent):
         """
         cns = self._size_hint_cns
         if not cns:
-            cns = self._size_hint_cns = []
-            push = cns.append
             hint = self.widget().GetBestSize()
             if hint.IsFullySpecified():
-                width_hint = hint.width
-                height_hint = hint.height
-                primitive = self.layout_box.primitive
-                width = primitive('width')
-                height = primitive('height')
-                hug_width, hug_height = self._hug
-                resist_width, resist_height = self._resist
-                if width_hint >= 0:
-                    if hug_width != 'ignore':
-                        cn = (width == width_hint) | hug_width
-                        push(cn)
-                    if resist_width != 'ignore':
-                        cn = (width >= width_hint) | resist_width
-                        push(cn)
-                if height_hint >= 0:
-                    if hug_height != 'ignore':
-                        cn = (height == height_hint) | hug_height
-                        push(cn)
-                    if resist_height != 'ignore':
-                        cn = (height >= height_hint) | resist_height
-                        push(cn)
+                hint = (hint.width, hint.height)
+            else:
+                hint = None
+            cns = size_hint_constraints(
+                self.layout_box, hint, self._hug, self._resist
+            )
+            self._size_hint_cns = cns
         return cns
 
     def size_hint_updated(self):
@@ -259,33 +198,27 @@ class WxConstraintsWidget(WxWidgetComponent):
         """
         cns = self._hard_cns
         if not cns:
-            primitive = self.layout_box.primitive
-            left = primitive('left')
-            top = primitive('top')
-            width = primitive('width')
-            height = primitive('height')
-            cns = [left >= 0, top >= 0, width >= 0, height >= 0]
-            self._hard_cns = cns
+            cns = self._hard_cns = hard_constraints(self.layout_box)
         return cns
 
     def user_constraints(self):
         """ Get the list of user constraints defined for this widget.
 
-        The default implementation returns the list of constraint
+        The default implementation returns the encoded constraint
         information sent by the server.
 
         Returns
         -------
-        result : list
-            The list of dictionaries which represent the user defined
-            linear constraints.
+        result : dict or None
+            The flat encoding of the user defined linear constraints as
+            created by `enaml.layout.constraint_encoding`, or None.
 
         """
         return self._user_cns
 
     def geometry_updater(self):
         """ A method which can be called to create a function which
-        will update the layout geometry of the underlying widget.
+        will compute the layout geometry of the underlying widget.
 
         The parameter and return values below describe the function
         that is returned by calling this method.
@@ -306,9 +239,12 @@ class WxConstraintsWidget(WxWidgetComponent):
 
         Returns
         -------
-        result : (x, y)
+        result : (x, y, geometry)
             The computed layout 'x' and 'y' amount, expressed in the
-            coordinates of the layout owner widget.
+            coordinates of the layout owner widget, and the computed
+            (x, y, width, height) dimensions of the widget. The
+            dimensions are applied by passing them as arguments to the
+            `set_geometry` attribute of the function.
 
         """
         # The return function is a hyper optimized (for Python) closure
@@ -325,10 +261,10 @@ class WxConstraintsWidget(WxWidgetComponent):
         def update_geometry(dx, dy):
             nx = x.value
             ny = y.value
-            setdims(nx - dx, ny - dy, width.value, height.value)
-            return nx, ny
+            return nx, ny, (nx - dx, ny - dy, width.value, height.value)
         # Store a reference to self on the updater, so that the layout
         # container can know the object on which the updater operates.
         update_geometry.item = self
+        update_geometry.set_geometry = setdims
         return update_geometry
 
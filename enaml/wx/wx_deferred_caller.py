@@ -4,12 +4,33 @@
 #------------------------------------------------------------------------------
 import wx
 
+from enaml.deferred_queue import DeferredQueue
+
 
 class wxDeferredCaller(object):
     """ A simple object which facilitates running callbacks on the main
     application thread.
 
+    Deferred calls are appended to a DeferredQueue, and a wx.CallAfter
+    is only posted when the queue becomes non-empty. The posted call
+    then runs all of the queued callbacks.
+
     """
+    def __init__(self):
+        """ Initialize a wxDeferredCaller.
+
+        """
+        self._queue = DeferredQueue(self._onWake)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _onWake(self):
+        """ Post a call to drain the deferred queue on the main thread.
+
+        """
+        wx.CallAfter(self._queue.drain)
+
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
@@ -26,7 +47,7 @@ class wxDeferredCaller(object):
             the callback.
 
         """
-        wx.CallAfter(callback, *args, **kwargs)
+        self._queue.post(callback, args, kwargs)
 
     def TimedCall(self, ms, callback, *args, **kwargs):
         """ Execute a callback on timer in the main gui thread.
@@ -45,6 +66,5 @@ class wxDeferredCaller(object):
             the callback.
 
         """
-        f = lambda: wx.CallLater(ms, callback, *args, **kwargs)
-        wx.CallAfter(f)
+        self._queue.post(wx.CallLater, (ms, callback) + args, kwargs)
 
@@ -0,0 +1,296 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Wire codecs for the frames of a multipart Enaml zmq message.
+
+A codec is chosen per connection during the handshake. A client lists
+the codecs it supports in the `codecs` field of the header of its first
+message, and the server picks the first entry of `PREFERRED_CODECS`
+which is supported by both ends. JSON is always available and is used
+when the client does not request a codec.
+
+"""
+from abc import ABCMeta, abstractmethod
+import json
+import time
+
+# msgpack is an optional dependency. When it is available, the fast C
+# implementation is offered to clients as the preferred codec.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Codec(object):
+    """ An abstract base class for wire codecs.
+
+    A codec instance is owned by a single connection, which allows a
+    codec to keep state between the frames it encodes and decodes.
+
+    """
+    __metaclass__ = ABCMeta
+
+    #: The name of the codec used during the handshake.
+    name = ''
+
+    @abstractmethod
+    def encode(self, obj):
+        """ Encode a frame object into a byte string.
+
+        Parameters
+        ----------
+        obj : object
+            The JSON-compatible object to encode.
+
+        Returns
+        -------
+        result : str
+            The encoded bytes for the frame.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode(self, data):
+        """ Decode a byte string into a frame object.
+
+        Parameters
+        ----------
+        data : str
+            The encoded bytes for the frame.
+
+        Returns
+        -------
+        result : object
+            The decoded frame object.
+
+        """
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """ A codec which encodes each frame as a JSON string.
+
+    """
+    name = 'json'
+
+    def encode(self, obj):
+        return json.dumps(obj)
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class MsgPackCodec(Codec):
+    """ A codec which encodes each frame with the msgpack library.
+
+    The codec is implemented in C. Its frames are smaller than JSON,
+    and are several times faster to encode and decode. It is only
+    available when the msgpack package is installed.
+
+    """
+    name = 'msgpack'
+
+    def encode(self, obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, data):
+        return msgpack.unpackb(bytes(data), raw=False)
+
+
+#------------------------------------------------------------------------------
+# Codec Registry
+#------------------------------------------------------------------------------
+#: The available codec classes, keyed by name.
+CODECS = {
+    JSONCodec.name: JSONCodec,
+}
+
+
+#: The codec names in the order of preference of the server. The C
+#: msgpack codec is preferred when available since it is the cheapest
+#: to encode.
+PREFERRED_CODECS = (JSONCodec.name,)
+
+
+if msgpack is not None:
+    CODECS[MsgPackCodec.name] = MsgPackCodec
+    PREFERRED_CODECS = (MsgPackCodec.name,) + PREFERRED_CODECS
+
+
+def negotiate_codec(requested):
+    """ Create the codec to use for a connection.
+
+    Parameters
+    ----------
+    requested : list of str or None
+        The names of the codecs supported by the client, or None if
+        the client did not request a codec.
+
+    Returns
+    -------
+    result : Codec
+        A new instance of the most preferred codec which is supported
+        by the client. A JSONCodec is returned if there is no match.
+
+    """
+    if requested:
+        for name in PREFERRED_CODECS:
+            if name in requested:
+                return CODECS[name]()
+    return JSONCodec()
+
+
+def json_header(data):
+    """ Get the header of a message if it is encoded as JSON.
+
+    A handshake message is always encoded as JSON, while the header of
+    a message encoded by the msgpack codec never starts with an opening
+    brace. This allows the server to recognize a handshake
+    from a client which reconnects with the identity of an existing
+    connection.
+
+    Parameters
+    ----------
+    data : str
+        The encoded header frame of a message.
+
+    Returns
+    -------
+    result : dict or None
+        The decoded header, or None if the frame is not a JSON object.
+
+    """
+    if not data.startswith('{'):
+        return None
+    try:
+        header = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(header, dict):
+        return None
+    return header
+
+
+class CodecTable(object):
+    """ The codecs negotiated with the clients of a server.
+
+    The table maps the routing id of a client to its codec. A client
+    is dropped from the table when it has not sent a message for the
+    idle timeout. The zmq router socket does not report which client
+    disconnected, so the timeout is what bounds the size of the table.
+    A client which is dropped must start over with a handshake.
+
+    """
+    #: The default number of seconds after which an idle client is
+    #: dropped from the table.
+    idle_timeout = 3600.0
+
+    def __init__(self, idle_timeout=None, clock=time.time):
+        """ Initialize a CodecTable.
+
+        Parameters
+        ----------
+        idle_timeout : float, optional
+            The number of seconds after which an idle client is
+            dropped. If not given, the class default is used.
+
+        clock : callable, optional
+            A callable which returns the current time in seconds. The
+            default is time.time.
+
+        """
+        self._codecs = {}
+        self._last_seen = {}
+        self._clock = clock
+        if idle_timeout is not None:
+            self.idle_timeout = idle_timeout
+
+    def __len__(self):
+        """ Get the number of clients in the table.
+
+        """
+        return len(self._codecs)
+
+    def lookup(self, routing_id, header_data):
+        """ Get the codec for a message received from a client.
+
+        A message is a handshake if the client is not in the table, or
+        if its header is a JSON object and the client either lists its
+        codecs in the header or has not negotiated a codec other than
+        JSON. A client which reconnects with the same identity starts
+        over with a handshake, which resets its codec, so that a
+        stateful codec starts from a clean state. The codec of a
+        handshake is negotiated from the 'codecs' field of the header.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq routing id of the client.
+
+        header_data : str
+            The encoded header frame of the message.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of the codec for the client and whether the
+            message is a handshake. A handshake message is encoded as
+            JSON, whatever the codec of the client.
+
+        Raises
+        ------
+        ValueError
+            The client is not in the table and the message is not a
+            JSON handshake.
+
+        """
+        codec = self._codecs.get(routing_id)
+        header = json_header(header_data)
+        if codec is None:
+            if header is None:
+                msg = 'A handshake is required from client `%r`'
+                raise ValueError(msg % routing_id)
+            handshake = True
+        else:
+            handshake = header is not None and (
+                'codecs' in header or codec.name != JSONCodec.name
+            )
+        if handshake:
+            codec = negotiate_codec(header.get('codecs'))
+            self._codecs[routing_id] = codec
+        self._last_seen[routing_id] = self._clock()
+        return codec, handshake
+
+    def discard(self, routing_id):
+        """ Drop a client from the table.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq routing id of the client.
+
+        """
+        self._codecs.pop(routing_id, None)
+        self._last_seen.pop(routing_id, None)
+
+    def expire(self):
+        """ Drop the clients which have been idle for longer than the
+        idle timeout.
+
+        Returns
+        -------
+        result : list
+            The routing ids of the clients which were dropped.
+
+        """
+        deadline = self._clock() - self.idle_timeout
+        expired = [
+            routing_id for routing_id, seen in self._last_seen.iteritems()
+            if seen < deadline
+        ]
+        for routing_id in expired:
+            self.discard(routing_id)
+        return expired
@@ -2,18 +2,22 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-import json
-
 import zmq
-from zmq.eventloop.ioloop import IOLoop
+from zmq.eventloop.ioloop import IOLoop, PeriodicCallback
 from zmq.eventloop.zmqstream import ZMQStream
 
 from enaml.message import Message
 from enaml.request import BaseRequest, BasePushHandler
 from enaml.utils import log_exceptions
 
+from .zmq_codec import CodecTable, JSONCodec
+
+
+#: The codec used for connections which have not completed a handshake.
+_json_codec = JSONCodec()
 
-def pack_message(routing_id, message):
+
+def pack_message(routing_id, message, codec=None):
     """ Pack a routing id and Message into a mutlipart zmq message.
 
     Parameters
@@ -24,14 +28,18 @@ def pack_message(routing_id, message):
     message : Message
         The Message object to serialized into the multipart message.
 
+    codec : Codec, optional
+        The codec to use for encoding the message frames. The default
+        is None and indicates that the frames are encoded as JSON.
+
     """
     multipart = [routing_id]
-    dumps = json.dumps
-    multipart.extend(dumps(part) for part in message)
+    encode = (codec or _json_codec).encode
+    multipart.extend(encode(part) for part in message)
     return multipart
 
 
-def unpack_message(multipart):
+def unpack_message(multipart, codec=None):
     """ Unpack a mutlipart Enaml message received by the server.
 
     Parameters
@@ -40,6 +48,10 @@ def unpack_message(multipart):
         The 5-element list representing the routing_id, header, 
         parent_header, metadata, and content of a client message.
 
+    codec : Codec, optional
+        The codec to use for decoding the message frames. The default
+        is None and indicates that the frames are decoded as JSON.
+
     Returns
     -------
     routing_id, message : str, Message
@@ -49,15 +61,16 @@ def unpack_message(multipart):
     if len(multipart) != 5:
         raise TypeError('Invalid wire message: %s' % multipart)
     routing_id = multipart[0]
-    loads = json.loads
-    return routing_id, Message(loads(part) for part in multipart[1:])
+    decode = (codec or _json_codec).decode
+    return routing_id, Message(decode(part) for part in multipart[1:])
 
 
 class ZMQRequest(BaseRequest):
     """ A concrete BaseRequest implementation for the ZMQServer.
 
     """
-    def __init__(self, message, routing_id, stream, ioloop):
+    def __init__(self, message, routing_id, stream, ioloop, codec=None,
+                 handshake=False):
         """ Initialize a ZMQRequest.
 
         Parameters
@@ -74,11 +87,22 @@ class ZMQRequest(BaseRequest):
         ioloop : IOLoop
             The zmq IOLoop instance for this request.
 
+        codec : Codec, optional
+            The codec negotiated for the client. The default is None
+            and indicates that JSON should be used.
+
+        handshake : bool, optional
+            Whether this request is the first request of the client. If
+            True, the reply is sent as JSON and the name of the codec is
+            added to the reply header. The default is False.
+
         """
         self._message = message
         self._routing_id = routing_id
         self._stream = stream
         self._ioloop = ioloop
+        self._codec = codec
+        self._handshake = handshake
         self._finished = False
 
     #--------------------------------------------------------------------------
@@ -132,7 +156,11 @@ class ZMQRequest(BaseRequest):
         """
         if self._finished:
             raise RuntimeError('Request already finished')
-        packed = pack_message(self._routing_id, message)
+        if self._handshake:
+            message.header['codec'] = self._codec.name
+            packed = pack_message(self._routing_id, message)
+        else:
+            packed = pack_message(self._routing_id, message, self._codec)
         self._stream.send_multipart(packed)
         self._finished = True
 
@@ -147,7 +175,9 @@ class ZMQRequest(BaseRequest):
             to this client, without the client initiating a request.
 
         """
-        return ZMQPushHandler(self._routing_id, self._stream, self._ioloop)
+        return ZMQPushHandler(
+            self._routing_id, self._stream, self._ioloop, self._codec,
+        )
 
 
 class ZMQPushHandler(BasePushHandler):
@@ -158,7 +188,7 @@ class ZMQPushHandler(BasePushHandler):
     this handler will silently drop the messages.
 
     """
-    def __init__(self, routing_id, stream, ioloop):
+    def __init__(self, routing_id, stream, ioloop, codec=None):
         """ Initialize a ZMQPushHandler.
 
         Parameters
@@ -172,10 +202,15 @@ class ZMQPushHandler(BasePushHandler):
         ioloop : IOLoop
             The zmq IOLoop instance for this push handler.
 
+        codec : Codec, optional
+            The codec negotiated for the client. The default is None
+            and indicates that JSON should be used.
+
         """
         self._routing_id = routing_id
         self._stream = stream
         self._ioloop = ioloop
+        self._codec = codec
 
     @log_exceptions
     def push_message(self, message):
@@ -187,7 +222,7 @@ class ZMQPushHandler(BasePushHandler):
             The Message instance that should be pushed to the client.
 
         """
-        packed = pack_message(self._routing_id, message)
+        packed = pack_message(self._routing_id, message, self._codec)
         self._stream.send_multipart(packed)
 
     def add_callback(self, callback):
@@ -214,7 +249,11 @@ class ZMQServer(object):
     """ An Enaml Application server which uses ZeroMQ sockets.
 
     """
-    def __init__(self, app, host, port):
+    #: The interval, in milliseconds, at which the codecs of idle
+    #: clients are expired. See CodecTable.
+    expire_interval = 60000
+
+    def __init__(self, app, host, port, idle_timeout=None):
         """ Initialize a ZMQServer.
 
         Parameters
@@ -229,15 +268,23 @@ class ZMQServer(object):
         port : int
             The host port to use for communication. e.g. 8888
 
+        idle_timeout : float, optional
+            The number of seconds after which the codec of a client
+            which has not sent a message is dropped. See CodecTable.
+
         """
         ctxt = zmq.Context()
         router = ctxt.socket(zmq.ROUTER)
         router.bind('tcp://%s:%s' % (host, port))
         self._app = app
+        self._codecs = CodecTable(idle_timeout)
         self._router = router
         self._stream = ZMQStream(router)
         self._stream.on_recv(self._on_recv)
         self._ioloop = IOLoop.instance()
+        self._expirer = PeriodicCallback(
+            self._codecs.expire, self.expire_interval, self._ioloop,
+        )
 
     #--------------------------------------------------------------------------
     # Private API
@@ -252,8 +299,20 @@ class ZMQServer(object):
             The multipart message received by the client.
 
         """
-        routing_id, message = unpack_message(multipart)
-        request = ZMQRequest(message, routing_id, self._stream, self._ioloop)
+        if len(multipart) != 5:
+            raise TypeError('Invalid wire message: %s' % multipart)
+        # A handshake message is always JSON encoded and may list the
+        # codecs supported by the client in its header. The chosen
+        # codec is announced in the reply.
+        codec, handshake = self._codecs.lookup(multipart[0], multipart[1])
+        if handshake:
+            routing_id, message = unpack_message(multipart)
+        else:
+            routing_id, message = unpack_message(multipart, codec)
+        request = ZMQRequest(
+            message, routing_id, self._stream, self._ioloop, codec,
+            handshake,
+        )
         self._app.handle_request(request)
 
     #--------------------------------------------------------------------------
@@ -264,6 +323,7 @@ class ZMQServer(object):
         the 'stop' method is called.
 
         """
+        self._expirer.start()
         self._ioloop.start()
 
     def stop(self):
@@ -271,5 +331,6 @@ class ZMQServer(object):
         to 'start' to return.
 
         """
+        self._expirer.stop()
         self._ioloop.stop()
 
@@ -49,6 +49,8 @@ setup(
     entry_points = dict(
         console_scripts=[
             'enaml-run = enaml.runner:main',
+            'enaml-compileall = enaml.compileall:main',
+            'enaml-bundle = enaml.bundle:main',
         ],
     ),
     ext_modules=ext_modules,